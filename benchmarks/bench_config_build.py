@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+'''Time config template loading and rendering.
+
+Compares the old approach of reading every file under ``tevmc/docker`` with
+the lazy ``TemplateRegistry``, cold and warm. With ``--full`` it also times
+complete ``perform_config_build`` runs against a scratch node directory,
+which needs a reachable docker daemon.
+'''
+
+import time
+import tempfile
+
+from string import Template
+from pathlib import Path
+
+import click
+
+from tevmc.config import local
+from tevmc.cmdline.init import (
+    TemplateRegistry, template_dir, touch_node_dir
+)
+from tevmc.cmdline.build import perform_config_build
+
+
+def load_every_file() -> dict:
+    templ = {}
+    for node in template_dir.glob('**/*'):
+        if node.is_file():
+            with open(node, 'r') as templ_file:
+                try:
+                    templ['/'.join(node.parts[-3:])] = Template(templ_file.read())
+                except UnicodeDecodeError:
+                    pass
+
+    return templ
+
+
+def timed(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+
+    return (time.perf_counter() - start) / iterations
+
+
+@click.command()
+@click.option(
+    '--iterations', default=50, type=int,
+    help='Runs per measurement.')
+@click.option(
+    '--full/--templates-only', default=False,
+    help='Also time complete perform_config_build runs (needs docker).')
+def bench(iterations, full):
+    # any value works for a placeholder, rendering cost is what matters
+    subst = {'timestamp': 'now'}
+    for name in TemplateRegistry().names:
+        for ident in Template.pattern.finditer(
+                (template_dir / name).read_text()):
+            key = ident['named'] or ident['braced']
+            if key:
+                subst[key] = '0'
+
+    def cold():
+        registry = TemplateRegistry()
+        for name in registry:
+            registry.render(name, subst)
+
+    warm_registry = TemplateRegistry()
+    def warm():
+        for name in warm_registry:
+            warm_registry.render(name, subst, volatile=['timestamp'])
+
+    results = {
+        'load every file': timed(load_every_file, iterations),
+        'registry cold': timed(cold, iterations),
+        'registry warm': timed(warm, iterations)
+    }
+
+    if full:
+        with tempfile.TemporaryDirectory() as tmp:
+            target_dir = Path(tmp)
+            touch_node_dir(target_dir, local.default_config, 'tevmc.json')
+            perform_config_build(target_dir, local.default_config)
+            results['perform_config_build'] = timed(
+                lambda: perform_config_build(target_dir, local.default_config),
+                iterations)
+
+    for name, elapsed in results.items():
+        click.echo(f'{name:>24}: {elapsed * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    bench()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+'''Replay a captured docker log stream through ``DockerLogDemuxer``.
+
+A capture is the raw body of a ``/containers/{name}/logs?follow=1`` request,
+for example:
+
+    curl --unix-socket /var/run/docker.sock \\
+        'http://localhost/containers/<name>/logs?stdout=1&stderr=1' > es.cap
+
+Pass ``--generate`` to synthesize a capture of the requested size instead.
+'''
+
+import time
+import random
+import struct
+
+from pathlib import Path
+
+import click
+
+from tevmc.utils import DockerLogDemuxer
+
+
+def generate_capture(path: Path, size_mb: int):
+    header = struct.Struct('>BxxxL')
+    target = size_mb * 1024 * 1024
+    written = 0
+    i = 0
+    with open(path, 'wb') as capture:
+        while written < target:
+            line = (
+                f'{{"@timestamp":"2024-01-01T00:00:00Z","level":"INFO",'
+                f'"message":"[{i}] ' + ('x' * random.randint(16, 400)) + '"}\n'
+            ).encode()
+
+            # split some lines across two frames, like docker does with
+            # long writes
+            cut = random.randint(0, len(line)) if i % 7 == 0 else len(line)
+            for part in (line[:cut], line[cut:]):
+                if part:
+                    frame = header.pack(1 + (i % 2), len(part)) + part
+                    capture.write(frame)
+                    written += len(frame)
+            i += 1
+
+
+@click.command()
+@click.argument('capture', type=click.Path(path_type=Path))
+@click.option(
+    '--generate', default=0, type=int,
+    help='Synthesize a capture of this many MiB first.')
+@click.option(
+    '--chunk-size', default=1024, type=int,
+    help='Bytes fed to the demuxer per call, mirrors iter_content.')
+def bench(capture, generate, chunk_size):
+    if generate:
+        click.echo(f'generating {generate} MiB capture at {capture}...')
+        generate_capture(capture, generate)
+
+    demuxer = DockerLogDemuxer()
+    total_bytes = 0
+    total_lines = 0
+
+    start = time.perf_counter()
+    with open(capture, 'rb') as stream:
+        while chunk := stream.read(chunk_size):
+            total_bytes += len(chunk)
+            total_lines += len(demuxer.feed(chunk))
+
+    total_lines += len(demuxer.flush())
+    elapsed = time.perf_counter() - start
+
+    mb = total_bytes / (1024 * 1024)
+    click.echo(
+        f'{mb:.2f} MiB, {total_lines} lines in {elapsed:.2f}s: '
+        f'{mb / elapsed:.2f} MiB/s, {total_lines / elapsed:.0f} lines/s')
+
+
+if __name__ == '__main__':
+    bench()
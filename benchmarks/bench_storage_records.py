@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+'''Time and memory of building Storage* records from ``_source`` dicts.
+
+Compares the ``__slots__`` records with lazy ``itxs`` against the previous
+``__dict__`` based ones, which are kept below as they were. Sources are
+built once in a pool and reused, so the reported memory is what the records
+themselves allocate on top of the values they point to.
+'''
+
+import gc
+import time
+import tracemalloc
+
+import click
+
+from tevmc.testing.database import StorageEosioAction, StorageEosioDelta
+
+
+# previous record classes, every field in a per instance __dict__ and itxs
+# built eagerly
+
+class LegacyStorageEosioDelta:
+    def __init__(self, obj: dict):
+        self.timestamp = obj.get('@timestamp')
+        self.block_num = obj.get('block_num')
+        self.global_block_num = obj.get('@global', {}).get('block_num')
+        self.block_hash = obj.get('@blockHash')
+        self.evm_block_hash = obj.get('@evmBlockHash')
+        self.evm_prev_block_hash = obj.get('@evmPrevBlockHash')
+        self.receipts_root_hash = obj.get('@receiptsRootHash')
+        self.transactions_root = obj.get('@transactionsRoot')
+        self.gas_used = obj.get('gasUsed')
+        self.gas_limit = obj.get('gasLimit')
+        self.size = obj.get('size')
+        self.code = obj.get('code')
+        self.table = obj.get('table')
+
+
+class LegacyInternalEvmTransaction:
+    def __init__(self, obj: dict):
+        self.call_type = obj.get('callType')
+        self.from_address = obj.get('from')
+        self.gas = obj.get('gas')
+        self.input = obj.get('input')
+        self.input_trimmed = obj.get('input_trimmed')
+        self.to = obj.get('to')
+        self.value = obj.get('value')
+        self.gas_used = obj.get('gasUsed')
+        self.output = obj.get('output')
+        self.subtraces = obj.get('subtraces')
+        self.trace_address = obj.get('traceAddress')
+        self.type = obj.get('type')
+        self.depth = obj.get('depth')
+        self.extra = obj.get('extra')
+
+
+class LegacyStorageEvmTransaction:
+    def __init__(self, obj: dict):
+        self.hash = obj.get('hash')
+        self.from_address = obj.get('from')
+        self.trx_index = obj.get('trx_index')
+        self.block = obj.get('block')
+        self.block_hash = obj.get('block_hash')
+        self.to = obj.get('to')
+        self.input_data = obj.get('input_data')
+        self.input_trimmed = obj.get('input_trimmed')
+        self.value = obj.get('value')
+        self.nonce = obj.get('nonce')
+        self.gas_price = obj.get('gas_price')
+        self.gas_limit = obj.get('gas_limit')
+        self.status = obj.get('status')
+        self.itxs = [LegacyInternalEvmTransaction(tx) for tx in obj.get('itxs', [])]
+        self.epoch = obj.get('epoch')
+        self.createdaddr = obj.get('createdaddr')
+        self.gasused = obj.get('gasused')
+        self.gasusedblock = obj.get('gasusedblock')
+        self.charged_gas_price = obj.get('charged_gas_price')
+        self.output = obj.get('output')
+        self.logs = obj.get('logs')
+        self.logs_bloom = obj.get('logsBloom')
+        self.errors = obj.get('errors')
+        self.value_d = obj.get('value_d')
+        self.raw = obj.get('raw')
+        self.v = obj.get('v')
+        self.r = obj.get('r')
+        self.s = obj.get('s')
+
+
+class LegacyStorageEosioAction:
+    def __init__(self, obj: dict):
+        self.timestamp = obj.get('@timestamp')
+        self.trx_id = obj.get('trx_id')
+        self.action_ordinal = obj.get('action_ordinal')
+        self.signatures = obj.get('signatures')
+        self.raw = LegacyStorageEvmTransaction(obj.get('@raw'))
+
+
+def delta_source(i: int) -> dict:
+    return {
+        '@timestamp': '2024-01-01T00:00:00.000',
+        'block_num': i,
+        '@global': {'block_num': i + 36},
+        '@blockHash': f'{i:064x}',
+        '@evmBlockHash': f'{i + 1:064x}',
+        '@evmPrevBlockHash': f'{i:064x}',
+        '@receiptsRootHash': f'{i + 2:064x}',
+        '@transactionsRoot': f'{i + 3:064x}',
+        'gasUsed': '21000',
+        'gasLimit': '0x7fffffff',
+        'size': '0x259',
+        'code': 'eosio',
+        'table': 'global'
+    }
+
+
+def action_source(i: int, itxs: int) -> dict:
+    return {
+        '@timestamp': '2024-01-01T00:00:00.000',
+        'trx_id': f'{i:064x}',
+        'action_ordinal': 1,
+        'signatures': [],
+        '@raw': {
+            'hash': f'0x{i:064x}',
+            'from': f'0x{i:040x}',
+            'to': f'0x{i + 1:040x}',
+            'block': i,
+            'trx_index': 0,
+            'value': '0xde0b6b3a7640000',
+            'gasused': '21000',
+            'charged_gas_price': '0x7a307efa80',
+            'itxs': [
+                {
+                    'callType': 'call',
+                    'from': f'0x{i:040x}',
+                    'to': f'0x{i + j:040x}',
+                    'gas': '0x5208',
+                    'input': '0x',
+                    'value': '0x0',
+                    'gasUsed': '0x5208',
+                    'output': '0x',
+                    'subtraces': 0,
+                    'traceAddress': [j],
+                    'type': 'call',
+                    'depth': '0'
+                }
+                for j in range(itxs)
+            ],
+            'logs': []
+        }
+    }
+
+
+def action_with_itxs(source: dict) -> StorageEosioAction:
+    # what readers that do look at the internal txs pay
+    action = StorageEosioAction(source)
+    action.raw.itxs
+    return action
+
+
+def measure(build, sources: list, records: int) -> tuple[float, int]:
+    '''Seconds to build ``records`` records and bytes they keep alive.'''
+    pool = len(sources)
+
+    gc.collect()
+    start = time.perf_counter()
+    built = [build(sources[i % pool]) for i in range(records)]
+    elapsed = time.perf_counter() - start
+    del built
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    built = [build(sources[i % pool]) for i in range(records)]
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del built
+
+    return elapsed, retained
+
+
+@click.command()
+@click.option(
+    '--records', default=1_000_000, type=int,
+    help='Records built per measurement.')
+@click.option(
+    '--pool', default=10_000, type=int,
+    help='Distinct _source dicts cycled through.')
+@click.option(
+    '--itxs', default=2, type=int,
+    help='Internal transactions per action.')
+def bench(records, pool, itxs):
+    deltas = [delta_source(i) for i in range(pool)]
+    actions = [action_source(i, itxs) for i in range(pool)]
+
+    cases = {
+        'delta dict': (LegacyStorageEosioDelta, deltas),
+        'delta slots': (StorageEosioDelta, deltas),
+        'action dict': (LegacyStorageEosioAction, actions),
+        'action slots': (StorageEosioAction, actions),
+        'action slots+itxs': (action_with_itxs, actions)
+    }
+
+    for name, (build, sources) in cases.items():
+        elapsed, retained = measure(build, sources, records)
+        click.echo(
+            f'{name:>18}: {elapsed:6.2f}s '
+            f'{records / elapsed:>12,.0f} records/s '
+            f'{retained / 2**20:>9,.1f} MiB '
+            f'{retained / records:>7,.0f} B/record'
+        )
+
+
+if __name__ == '__main__':
+    bench()
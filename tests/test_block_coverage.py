@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import random
+import threading
+
+from tevmc.config import local
+from tevmc.testing.database import BlockCoverage, ElasticDriver
+
+
+def test_coverage_matches_set():
+    rng = random.Random(0)
+    coverage = BlockCoverage()
+    blocks = set()
+
+    for _ in range(200):
+        op = rng.random()
+        if op < 0.5:
+            start = rng.randint(0, 1000)
+            end = start + rng.randint(0, 50)
+            coverage.add_range(start, end)
+            blocks.update(range(start, end + 1))
+
+        elif op < 0.9:
+            num = rng.randint(0, 1100)
+            coverage.add(num)
+            blocks.add(num)
+
+        else:
+            num = rng.randint(500, 1100)
+            coverage.discard_from(num)
+            blocks = {block for block in blocks if block < num}
+
+    assert len(coverage) == len(blocks)
+    assert all(
+        (num in coverage) == (num in blocks) for num in range(-1, 1200))
+
+    runs = coverage.runs
+    assert all(a[1] + 1 < b[0] for a, b in zip(runs, runs[1:]))
+
+    missing = [
+        num for start, end in coverage.missing(0, 1100)
+        for num in range(start, end + 1)
+    ]
+    assert missing == [num for num in range(1101) if num not in blocks]
+    assert coverage.count(200, 800) == len([b for b in blocks if 200 <= b <= 800])
+
+
+def test_coverage_persistence(tmp_path):
+    coverage = BlockCoverage([(100, 499), (600, 180_000_000)])
+
+    assert coverage.missing(0, 700) == [(0, 99), (500, 599)]
+    assert coverage.percent(100, 699) == 500 * 100 / 600
+
+    path = tmp_path / 'coverage' / 'test.cov'
+    coverage.save(path)
+    assert BlockCoverage.load(path) == coverage
+
+    path.write_bytes(b'garbage')
+    assert BlockCoverage.load(path) is None
+    assert BlockCoverage.load(tmp_path / 'missing.cov') is None
+
+
+def test_coverage_readable_while_scanning(tmp_path, monkeypatch):
+    elastic = ElasticDriver(local.default_config, node_dir=tmp_path)
+    scanning = threading.Event()
+    release = threading.Event()
+
+    def scan(coverage, lower=None):
+        scanning.set()
+        assert release.wait(timeout=5)
+        coverage.add_range(100, 199)
+
+    monkeypatch.setattr(elastic, 'get_indexed_range', lambda: (100, 199))
+    monkeypatch.setattr(elastic, '_scan_coverage', scan)
+
+    updater = threading.Thread(target=elastic.update_coverage)
+    updater.start()
+    assert scanning.wait(timeout=5)
+
+    # never built yet, readers get None right away instead of blocking
+    assert elastic.cached_coverage() is None
+
+    release.set()
+    updater.join(timeout=5)
+    assert elastic.cached_coverage().runs == [(100, 199)]
+
+    # a purge during a scan drops its result
+    scanning.clear()
+    release.clear()
+    updater = threading.Thread(target=elastic.update_coverage)
+    updater.start()
+    assert scanning.wait(timeout=5)
+
+    with elastic._coverage_lock:
+        elastic._coverage = None
+        elastic._coverage_generation += 1
+
+    release.set()
+    updater.join(timeout=5)
+    assert elastic._coverage is None
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+from copy import deepcopy
+
+import pytest
+
+from tevmc.config import mainnet
+from tevmc.cmdline.init import TemplateRegistry
+from tevmc.cmdline.build import (
+    config_hashes, perform_config_build, write_if_changed
+)
+
+
+def test_registry_lazy_render(tmp_path):
+    (tmp_path / 'svc' / 'config').mkdir(parents=True)
+    (tmp_path / 'svc' / 'config' / 'svc.conf').write_text('# $timestamp\nport $port\n')
+    (tmp_path / 'svc' / 'config' / 'contract.wasm').write_bytes(b'\x00\xff' * 64)
+
+    registry = TemplateRegistry(tmp_path, ['svc/config/svc.conf'])
+
+    assert 'svc/config/svc.conf' in registry
+    with pytest.raises(KeyError):
+        registry['svc/config/contract.wasm']
+
+    # nothing is read until first use
+    assert registry._templates == {}
+
+    first = registry.render(
+        'svc/config/svc.conf', {'timestamp': 't0', 'port': 6379}, volatile=['timestamp'])
+    assert first == '# t0\nport 6379\n'
+
+    # volatile keys alone don't trigger a new render
+    assert registry.render(
+        'svc/config/svc.conf', {'timestamp': 't1', 'port': 6379}, volatile=['timestamp']) == first
+
+    assert registry.render(
+        'svc/config/svc.conf', {'timestamp': 't2', 'port': 6380}) == '# t2\nport 6380\n'
+
+
+def test_write_if_changed(tmp_path):
+    path = tmp_path / 'config.ini'
+
+    assert write_if_changed(path, '# t0\na = 1\n', skip_header=True)
+    assert not write_if_changed(path, '# t1\na = 1\n', skip_header=True)
+    assert path.read_text() == '# t0\na = 1\n'
+
+    assert write_if_changed(path, '# t1\na = 2\n', skip_header=True)
+    assert path.read_text() == '# t1\na = 2\n'
+
+
+def test_config_hashes_are_per_service():
+    config = deepcopy(mainnet.default_config)
+    before = config_hashes(config)
+
+    config['telos-evm-rpc']['api_port'] += 1
+    after = config_hashes(config)
+
+    assert [s for s in before if before[s] != after[s]] == ['rpc']
+
+    config['nodeos']['ini']['http_addr'] = '0.0.0.0:8889'
+    changed = {s for s, h in config_hashes(config).items() if after[s] != h}
+
+    assert changed == {'nodeos', 'indexer', 'rpc'}
+
+    before = config_hashes(config)
+    config['beats']['tag'] += '-new'
+    after = config_hashes(config)
+
+    assert [s for s in before if before[s] != after[s]] == ['beats']
+
+
+def test_partial_config_build(tmp_path):
+    config = deepcopy(mainnet.default_config)
+    perform_config_build(tmp_path, config, services=['rpc'])
+
+    generated = [
+        str(path.relative_to(tmp_path / 'docker'))
+        for path in (tmp_path / 'docker').glob('**/*') if path.is_file()
+    ]
+    assert generated == ['telos-evm-rpc/config/config.json']
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import os
+import json
+
+import docker
+import pytest
+
+from tevmc.cmdline.build import OWNERSHIP_MARKER, fix_data_dir_ownership
+
+
+class FakeContainers:
+
+    def __init__(self):
+        self.runs = []
+
+    def run(self, image, command, **kwargs):
+        self.runs.append(command)
+
+
+@pytest.fixture
+def containers(monkeypatch):
+    containers = FakeContainers()
+    monkeypatch.setattr(
+        docker, 'from_env',
+        lambda: type('Client', (), {'containers': containers})())
+    return containers
+
+
+def test_owned_data_dir_skips_container(tmp_path, containers):
+    (tmp_path / 'nodes' / '0').mkdir(parents=True)
+    (tmp_path / 'nodes' / '0' / 'node.lock').touch()
+
+    assert fix_data_dir_ownership(tmp_path) == []
+    assert containers.runs == []
+
+    marker = json.loads((tmp_path / OWNERSHIP_MARKER).read_text())
+    assert marker['uid'] == os.getuid()
+
+    assert fix_data_dir_ownership(tmp_path) == []
+    assert containers.runs == []
+
+
+@pytest.mark.skipif(os.getuid() != 0, reason='needs root to chown')
+def test_only_foreign_subtrees_are_fixed(tmp_path, containers):
+    (tmp_path / 'nodes' / '0').mkdir(parents=True)
+    fix_data_dir_ownership(tmp_path)
+
+    # new index dir created by another user after the last check
+    index = tmp_path / 'nodes' / '0' / 'indices' / 'abc'
+    index.mkdir(parents=True)
+    (index / 'segment').touch()
+    os.chown(tmp_path / 'nodes' / '0' / 'indices', 1234, 1234)
+
+    assert fix_data_dir_ownership(tmp_path) == ['nodes/0/indices']
+    assert len(containers.runs) == 1
+    assert 'xargs -0 chown -R' in containers.runs[0]
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import struct
+
+from tevmc.utils import DockerLogDemuxer, split_docker_timestamp
+
+
+def frame(payload: bytes, stream: int = 1) -> bytes:
+    return struct.pack('>BxxxL', stream, len(payload)) + payload
+
+
+def test_demuxer_split_frames():
+    lines = [f'line {i} {"x" * i}\n' for i in range(200)]
+
+    raw = b''
+    for i, line in enumerate(lines):
+        data = line.encode()
+        cut = i % len(data)
+        # split every line across two frames
+        raw += frame(data[:cut]) + frame(data[cut:])
+
+    demuxer = DockerLogDemuxer()
+    result = []
+    for i in range(0, len(raw), 7):
+        result += demuxer.feed(raw[i:i + 7])
+
+    assert result == lines
+    assert demuxer.flush() == []
+
+
+def test_demuxer_interleaved_streams():
+    demuxer = DockerLogDemuxer()
+
+    result = demuxer.feed(
+        frame(b'out ', stream=1) +
+        frame(b'err\n', stream=2) +
+        frame(b'line\npartial', stream=1)
+    )
+
+    assert result == ['err\n', 'out line\n']
+    assert demuxer.flush() == ['partial']
+
+
+def test_split_docker_timestamp():
+    assert split_docker_timestamp('2024-01-01T00:00:01.5Z hello\n') == (
+        (1704067201, 500_000_000), 'hello\n')
+    assert split_docker_timestamp(
+        '2024-01-01T00:00:01.123456789Z hello\n')[0] == (1704067201, 123456789)
+    assert split_docker_timestamp('no stamp here\n') == (None, 'no stamp here\n')
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+import json
+
+from datetime import datetime
+
+import pytest
+
+from tevmc.testing.database import ElasticDriver, get_suffix
+
+from conftest import prepare_db_for_test
+
+
+pa = pytest.importorskip('pyarrow')
+ds = pytest.importorskip('pyarrow.dataset')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from tevmc.export import (
+    ColumnarExporter, ColumnarLoader, COLUMN_KINDS, DELTA_COLUMNS, export_schema
+)
+from tevmc.config import local
+
+
+FULL_ACTION = {
+    '@timestamp': '2024-01-01T00:00:00.000',
+    'trx_id': 'ab' * 32,
+    'action_ordinal': 1,
+    'signatures': ['SIG_K1_test'],
+    '@raw': {
+        'hash': '0x' + 'cd' * 32,
+        'trx_index': 0,
+        'block': 150,
+        'block_hash': '0x' + 'ee' * 32,
+        'from': '0x' + '11' * 20,
+        'to': '0x' + '22' * 20,
+        'input_data': '0x',
+        'input_trimmed': '0x',
+        'value': '0x00de0b6b3a7640000',
+        'value_d': '1.0000',
+        'nonce': 3,
+        'gas_price': '524799638144',
+        'gas_limit': '21000',
+        'status': 1,
+        'itxs': [{
+            'callType': 'call',
+            'from': '0x' + '11' * 20,
+            'to': '0x' + '22' * 20,
+            'gas': '0x5208',
+            'input': '0x',
+            'value': '0x0',
+            'gasUsed': '0x5208',
+            'output': '0x',
+            'subtraces': 0,
+            'traceAddress': [],
+            'type': 'call',
+            'depth': '0'
+        }],
+        'epoch': 1700000000,
+        'createdaddr': '',
+        'gasused': '21000',
+        'gasusedblock': '21000',
+        'charged_gas_price': '524799638144',
+        'output': '0x',
+        'logs': [{
+            'address': '0x' + '33' * 20,
+            'topics': ['0x' + '44' * 32],
+            'data': '0x01'
+        }],
+        'logsBloom': '00' * 256,
+        'errors': [],
+        'raw': '0xf86b',
+        'v': '0x4e',
+        'r': '0x1',
+        's': '0x2'
+    }
+}
+
+
+def test_export_schema():
+    schema = export_schema(pa, DELTA_COLUMNS)
+
+    assert schema.field('global_block_num').type == pa.uint64()
+    assert schema.field('evm_block_hash').type == pa.binary(32)
+    assert schema.field('timestamp').type == pa.timestamp('ms', tz='UTC')
+
+
+def test_fixed_width_columns():
+    for kind, size in (('address', 20), ('hash', 32)):
+        arrow_type, convert = COLUMN_KINDS[kind]
+        values = ['0x' + '11' * size, '0x', '', None, '0x1234', '11' * (size + 1)]
+
+        column = pa.array([convert(value) for value in values], type=arrow_type(pa))
+        assert column.to_pylist() == [b'\x11' * size] + [None] * 5
+
+
+def test_load_refuses_lossy_dump(tmp_path):
+    # a dump with only the typed columns can't rebuild the docs
+    (tmp_path / 'action').mkdir()
+    pq.write_table(
+        pa.table({'block': pa.array([1], type=pa.uint64())}),
+        tmp_path / 'action' / 'part-000.parquet')
+
+    loader = ColumnarLoader(ElasticDriver(local.default_config), tmp_path)
+    with pytest.raises(ValueError, match='full _source'):
+        loader.load()
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_export_range(tevmc_local, tmp_path, fmt):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 20_099), (10_000_000, 10_000_099)])
+    elastic.elastic.indices.refresh(index='*')
+
+    exporter = ColumnarExporter(
+        elastic, tmp_path, fmt=fmt, slices=3, batch_rows=1000)
+    stats = exporter.export(lower=15_000, upper=10_000_049, kinds=['delta'])
+
+    assert stats.blocks == 5_100 + 50
+    assert stats.blocks_per_sec > 0
+
+    table = ds.dataset(
+        tmp_path / 'delta',
+        format='parquet' if fmt == 'parquet' else 'ipc',
+        partitioning='hive'
+    ).to_table()
+
+    assert sorted(table['global_block_num'].to_pylist()) == (
+        list(range(15_000, 20_100)) + list(range(10_000_000, 10_000_050)))
+    assert set(table['suffix'].to_pylist()) == {0, 1}
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_load_export(tevmc_local, tmp_path):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    txs = [
+        {'@raw.block': 150 + i, '@raw.hash': f'0x{i:064x}', '@raw.value': hex(i)}
+        for i in range(10)
+    ]
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 20_099), (10_000_000, 10_000_099)],
+        txs=txs)
+    elastic.elastic.indices.refresh(index='*')
+
+    ColumnarExporter(elastic, tmp_path, slices=2).export()
+
+    elastic.elastic.indices.delete(index=f'{elastic.chain_name}-*')
+
+    loader = ColumnarLoader(elastic, tmp_path, workers=2, queue_size=100)
+    stats = loader.load()
+
+    assert stats.rows == {'delta': 20_100, 'action': 10}
+    assert stats.errors == 0
+
+    assert elastic.get_indexed_range() == (100, 10_000_099)
+    assert [index.suffix for index in elastic.catalog.indices('delta')] == [0, 1]
+
+    settings = elastic.elastic.indices.get_settings(
+        index=f'{elastic.chain_name}-delta-*', flat_settings=True)
+    for index in settings.values():
+        assert index['settings'].get('index.refresh_interval') != '-1'
+
+    action = elastic.tx_from_hash(txs[3]['@raw.hash'])
+    assert action.raw.block == 153
+    assert action.raw.value == '0x3'
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_load_export_keeps_source(tevmc_local, tmp_path):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    prepare_db_for_test(tevmc, datetime.now(), [(100, 200)])
+    action_index = (
+        f'{elastic.chain_name}-action-{elastic.index_version}-'
+        f'{get_suffix(150, elastic.docs_per_index)}')
+    elastic.elastic.index(index=action_index, document=FULL_ACTION, refresh=True)
+
+    ColumnarExporter(elastic, tmp_path).export()
+    elastic.elastic.indices.delete(index=f'{elastic.chain_name}-*')
+    ColumnarLoader(elastic, tmp_path).load()
+
+    hits = elastic.elastic.search(index=action_index)['hits']['hits']
+    assert [hit['_source'] for hit in hits] == [FULL_ACTION]
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_load_export_keeps_indices(tevmc_local, tmp_path):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 199), (10_000_000, 10_000_099)])
+
+    # deltas go by native block number, this one's global number alone
+    # would put it in the next index
+    first_delta = (
+        f'{elastic.chain_name}-delta-{elastic.index_version}-'
+        f'{get_suffix(0, elastic.docs_per_index)}')
+    elastic.elastic.index(
+        index=first_delta,
+        document={'@global': {'block_num': 10_000_005}, 'block_num': 9_999_995},
+        refresh=True)
+
+    def docs_by_index():
+        result = elastic.elastic.search(
+            index=f'{elastic.chain_name}-*', size=1000,
+            query={'match_all': {}})
+        docs = {}
+        for hit in result['hits']['hits']:
+            docs.setdefault(hit['_index'], []).append(hit['_source'])
+
+        key = lambda doc: json.dumps(doc, sort_keys=True)
+        return {index: sorted(sources, key=key) for index, sources in docs.items()}
+
+    before = docs_by_index()
+
+    ColumnarExporter(elastic, tmp_path, slices=2).export()
+    elastic.elastic.indices.delete(index=f'{elastic.chain_name}-*')
+    ColumnarLoader(elastic, tmp_path).load()
+
+    assert docs_by_index() == before
@@ -4,12 +4,12 @@ import time
 import random
 
 from eth_account import Account
-from elasticsearch import Elasticsearch
 
 from leap.sugar import random_string
 from leap.tokens import tlos_token
 from leap.protocol import Asset
 from tevmc.testing import open_web3
+from tevmc.testing.database import ElasticDriver
 
 from tevmc.utils import to_wei, to_int, from_wei, decode_hex
 
@@ -22,15 +22,7 @@ def test_integrity_elastic(tevmc_local):
     tevmc = tevmc_local
     local_w3 = open_web3(tevmc_local)
 
-    index = tevmc.config['telos-evm-rpc']['elastic_prefix'] + '-action-*'
-
-    es_config = tevmc.config['elasticsearch']
-    es = Elasticsearch(
-        f'{es_config["protocol"]}://{es_config["host"]}',
-        basic_auth=(
-            es_config['user'], es_config['pass']
-        )
-    )
+    elastic = ElasticDriver(tevmc.config)
 
     def get_elastic_balance(addr: str | Account):
         """Query all elasticsearch transactions to and from `addr`, then tally
@@ -41,36 +33,31 @@ def test_integrity_elastic(tevmc_local):
 
         addr = addr.lower()
 
-        result = es.search(
-            index=index,
+        balance_hex = 0
+
+        incoming = elastic.iter_actions(
+            fields=['@raw.value'],
             query={
                 'query_string': {
-                    'query': f'@raw.from: \"{addr}\"',
+                    'query': f'@raw.to: "{addr}"',
                 }
             }
         )
-        outgoing = result['hits']['hits']
+        for value, in incoming:
+            balance_hex += to_int(hexstr=value)
 
-        result = es.search(
-            index=index,
+        outgoing = elastic.iter_actions(
+            fields=['@raw.value', '@raw.gasused', '@raw.charged_gas_price'],
             query={
                 'query_string': {
-                    'query': f'@raw.to: \"{addr}\"',
+                    'query': f'@raw.from: "{addr}"',
                 }
             }
         )
-        incoming = result['hits']['hits']
-
-        balance_hex = 0
-
-        for transfer in incoming:
-            balance_hex += to_int(hexstr=transfer['_source']['@raw']['value'])
-
         total_payed_in_gas = 0
-        for transfer in outgoing:
-            balance_hex -= to_int(hexstr=transfer['_source']['@raw']['value'])
-            total_payed_in_gas += int(transfer[
-                '_source']['@raw']['gasused']) * int(transfer['_source']['@raw']['charged_gas_price'])
+        for value, gasused, charged_gas_price in outgoing:
+            balance_hex -= to_int(hexstr=value)
+            total_payed_in_gas += int(gasused) * int(charged_gas_price)
 
         total_payed_in_gas = from_wei(total_payed_in_gas, 'ether')
         balance_hex = from_wei(balance_hex, 'ether')
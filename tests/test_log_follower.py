@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+
+import pytest
+
+from docker.errors import DockerException
+
+from tevmc.logs import LogFollower, LogHub, LogStreamClosed
+
+
+def take(gen, amount):
+    return [next(gen) for _ in range(amount)]
+
+
+def test_follower_tail_and_resume(tmp_path):
+    log_path = tmp_path / 'nodeos.log'
+    with open(log_path, 'w') as log:
+        log.writelines(f'line {i}\n' for i in range(1000))
+
+    follower = LogFollower(log_path, poll_interval=0.1)
+
+    gen = follower.follow(lines=3, timeout=5)
+    assert take(gen, 3) == ['line 997\n', 'line 998\n', 'line 999\n']
+    gen.close()
+
+    with open(log_path, 'a') as log:
+        log.write('line 1000\nline 1001\n')
+
+    # resumes from last offset, not from the last 100 lines
+    gen = follower.follow(lines=100, timeout=5)
+    assert take(gen, 2) == ['line 1000\n', 'line 1001\n']
+    gen.close()
+
+    follower.close()
+
+
+def test_follower_waits_for_new_lines(tmp_path):
+    log_path = tmp_path / 'translator.log'
+    log_path.write_text('')
+
+    follower = LogFollower(log_path, poll_interval=0.1)
+
+    def writer():
+        with open(log_path, 'a') as log:
+            log.write('drained\n')
+
+    timer = threading.Timer(0.3, writer)
+    timer.start()
+
+    for line in follower.follow(lines=0, timeout=5):
+        if 'drained' in line:
+            break
+
+    timer.join()
+
+    with pytest.raises(TimeoutError):
+        for _ in follower.follow(lines=0, timeout=0.3):
+            ...
+
+    follower.close()
+
+
+def test_follower_truncation_and_rotation(tmp_path):
+    log_path = tmp_path / 'rpc.log'
+    log_path.write_text('a\nb\n')
+
+    follower = LogFollower(log_path, poll_interval=0.1)
+
+    gen = follower.follow(lines=10, timeout=5)
+    assert take(gen, 2) == ['a\n', 'b\n']
+
+    # truncate
+    log_path.write_text('c\n')
+    assert take(gen, 1) == ['c\n']
+
+    # rotate
+    os.rename(log_path, tmp_path / 'rpc.log.1')
+    log_path.write_text('d\n')
+    assert take(gen, 1) == ['d\n']
+
+    gen.close()
+    follower.close()
+
+
+def test_hub_fan_out(tmp_path):
+    log_path = tmp_path / 'nodeos.log'
+    log_path.write_text('old Produced block\n')
+
+    follower = LogFollower(log_path, poll_interval=0.1)
+    hub = LogHub.for_file('nodeos', follower)
+
+    produced = hub.subscribe(pattern=r'Produced', replay=None)
+    received = hub.subscribe(
+        predicate=lambda line: 'Received' in line, maxsize=2)
+    hub.start()
+
+    assert produced.wait(timeout=5) == 'old Produced block\n'
+
+    with open(log_path, 'a') as log:
+        log.writelines(f'Received block {i}\n' for i in range(5))
+        log.write('new Produced block\n')
+
+    assert produced.wait(timeout=5) == 'new Produced block\n'
+
+    # bounded queue keeps only the newest lines
+    assert received.get(timeout=5) == 'Received block 3\n'
+    assert received.get(timeout=5) == 'Received block 4\n'
+    assert received.dropped == 3
+
+    with pytest.raises(TimeoutError):
+        received.get(timeout=0.2)
+
+    produced.close()
+    received.close()
+
+    hub.stop()
+    follower.close()
+
+
+def test_hub_closed_source():
+    hub = LogHub('test', lambda stop: iter(['a\n', 'b\n']))
+    sub = hub.subscribe()
+    hub.start()
+
+    assert sub.get(timeout=5) == 'a\n'
+    assert sub.get(timeout=5) == 'b\n'
+
+    with pytest.raises(LogStreamClosed):
+        sub.get(timeout=5)
+
+
+def test_hub_stop_wakes_waiters():
+    release = threading.Event()
+
+    def source(stop):
+        # blocked on the source, like a docker stream with no output
+        release.wait(timeout=10)
+        return iter(())
+
+    hub = LogHub('test', source)
+    sub = hub.subscribe()
+    hub.start()
+    hub.stop(timeout=0)
+
+    with pytest.raises(LogStreamClosed):
+        sub.get(timeout=5)
+
+    release.set()
+
+
+def test_hub_last_match():
+    hub = LogHub('test', lambda stop: iter(['at 1\n', 'other\n', 'at 2\n', 'tail\n']))
+    sub = hub.subscribe()
+    hub.start()
+
+    for _ in range(4):
+        sub.get(timeout=5)
+
+    assert hub.last_match(r'at \d') == 'at 2\n'
+    assert hub.last_match(r'missing') is None
+
+
+def test_hub_container_reattach_since(monkeypatch):
+    attaches = []
+    streams = [
+        ['2024-01-01T00:00:01Z a\n', '2024-01-01T00:00:02Z b\n'],
+        # since is inclusive, b comes back along with what was missed
+        ['2024-01-01T00:00:02Z b\n', '2024-01-01T00:00:02Z c\n',
+         '2024-01-01T00:00:03Z d\n']
+    ]
+
+    def fake_stream(container, lines=0, since=None, timestamps=False):
+        attaches.append(since)
+        if not streams:
+            raise DockerException('container gone')
+
+        lines = streams.pop(0)
+        yield from lines
+        if streams:
+            raise ConnectionError('dropped')
+
+    monkeypatch.setattr('tevmc.logs.docker_stream_logs', fake_stream)
+
+    container = type('Container', (), {'id': 'c0'})()
+    hub = LogHub.for_container('rpc', container)
+    sub = hub.subscribe()
+    hub.start()
+
+    assert take(sub.lines(timeout=5), 4) == ['a\n', 'b\n', 'c\n', 'd\n']
+    with pytest.raises(LogStreamClosed):
+        sub.get(timeout=5)
+
+    assert attaches == [None, (1704067202, 0), (1704067203, 0)]
@@ -6,7 +6,9 @@ from datetime import datetime
 
 import pytest
 
-from tevmc.testing.database import ElasticDriver, ElasticDataIntegrityError
+from tevmc.testing.database import (
+    ElasticDriver, ElasticDataIntegrityError, ESHashChainBroken
+)
 
 from conftest import prepare_db_for_test
 
@@ -32,6 +34,23 @@ def test_python_elastic_integrity_tool(tevmc_local):
 
     assert 'Gap found! 121' in str(error)
 
+    # every gap is reported, not only the first
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 120), (122, 150), (160, 200)])
+
+    with pytest.raises(ElasticDataIntegrityError) as error:
+        elastic.full_integrity_check()
+
+    assert error.value.gaps == [(121, 121), (151, 159)]
+    assert list(elastic.find_gaps(100, 210)) == [
+        (121, 121), (151, 159), (201, 210)]
+
+    # a duplicate in the same bucket doesn't hide a missing block
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 120), (122, 200), (130, 130)])
+
+    assert list(elastic.find_gaps(100, 200)) == [(121, 121)]
+
     # whole index gap
     prepare_db_for_test(
         tevmc, datetime.now(), [(1, 1), (20_000_000, 20_000_000)])
@@ -63,3 +82,263 @@ def test_python_elastic_integrity_tool(tevmc_local):
         elastic.full_integrity_check()
 
     assert 'Duplicates found!' in str(error)
+
+    # duplicate by hash across action indices, far from their boundary
+    txs = [
+        {'@raw.block': 150, '@raw.hash': test_hash},
+        {'@raw.block': 10_000_050, '@raw.hash': test_hash}
+    ]
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 200), (10_000_000, 10_000_099)], txs=txs)
+
+    with pytest.raises(ElasticDataIntegrityError) as error:
+        elastic.verify_range(100, 10_000_099)
+
+    assert error.value.action_dups == [test_hash]
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_incremental_integrity_check(tevmc_local):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 200)])
+
+    elastic.integrity_check(full=True)
+    checkpoint = elastic.get_integrity_checkpoint()
+    assert (checkpoint['lower'], checkpoint['upper']) == (100, 200)
+
+    # gap behind the checkpoint, only the new tail plus overlap is verified
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 120), (122, 300)])
+
+    elastic.integrity_check(overlap=10)
+    assert elastic.get_integrity_checkpoint()['upper'] == 300
+
+    with pytest.raises(ElasticDataIntegrityError) as error:
+        elastic.integrity_check(full=True)
+
+    assert 'Gap found! 121' in str(error)
+
+    # purging rewinds the checkpoint
+    elastic.purge_newer_than(240, 250)
+    assert elastic.get_integrity_checkpoint()['upper'] == 249
+    assert elastic.get_indexed_range() == (100, 249)
+
+    # completed purges leave nothing to resume
+    assert elastic.get_pending_purge() is None
+    assert not elastic.resume_purge()
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_duplicates_past_first_page(tevmc_local):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    # way more than the 100 buckets a single terms aggregation returned
+    txs = [
+        {'@raw.block': block, '@raw.hash': sha256(str(block % 150).encode()).hexdigest()}
+        for block in range(100, 400)
+    ]
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 400), (100, 300)], txs=txs)
+
+    delta_dups, action_dups = elastic.find_duplicates(100, 400)
+
+    assert delta_dups == list(range(100, 301))
+    assert len(action_dups) == 150
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_cached_lookups(tevmc_local):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 200)])
+
+    block = elastic.block_from_evm_num(150)
+    assert block.block_num == 140
+    assert elastic.block_from_evm_num(150) is block
+
+    assert elastic.block_from_evm_num(300) is None
+
+    elastic.purge_newer_than(140, 150)
+    assert len(elastic.lookup_cache) == 0
+    assert elastic.block_from_evm_num(150) is None
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_bulk_lookups(tevmc_local):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+    elastic.msearch_chunk_size = 16
+
+    hashes = [sha256(str(block).encode()).hexdigest() for block in range(100, 200)]
+    txs = [
+        {'@raw.block': block, '@raw.hash': h}
+        for block, h in zip(range(100, 200), hashes)
+    ]
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 200)], txs=txs)
+
+    nums = list(range(250, 90, -1))
+    blocks = elastic.blocks_from_evm_nums(nums)
+    for num, block in zip(nums, blocks):
+        if 100 <= num <= 200:
+            assert block.global_block_num == num
+
+        else:
+            assert block is None
+
+    lookup = hashes[::-1] + ['00' * 32]
+    actions = elastic.txs_from_hashes(lookup)
+    assert [action.raw.hash for action in actions[:-1]] == hashes[::-1]
+    assert actions[-1] is None
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_index_catalog(tevmc_local):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 200), (10_000_000, 10_000_099)])
+    elastic.elastic.indices.refresh(index='*')
+
+    deltas = elastic.catalog.indices('delta')
+    assert [index.suffix for index in deltas] == [0, 1]
+    assert [index.docs for index in deltas] == [101, 100]
+
+    assert elastic.get_indexed_range() == (100, 10_000_099)
+    assert elastic.get_first_indexed_block().global_block_num == 100
+    assert elastic.get_last_indexed_block().global_block_num == 10_000_099
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_purge_by_reindex(tevmc_local):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 1000)])
+
+    index = elastic.get_ordered_delta_indices()[0]
+    elastic.elastic.indices.put_settings(
+        index=index, settings={'index.refresh_interval': '5s'})
+    before = elastic.elastic.indices.get_settings(
+        index=index, flat_settings=True)[index]['settings']
+
+    elastic.purge_newer_than(290, 300, mode='reindex')
+
+    assert elastic.get_indexed_range() == (100, 299)
+    assert not elastic.elastic.indices.exists(index=f'tevmc-rewind-{index}')
+    assert not elastic.elastic.indices.exists_alias(name=index)
+
+    after = elastic.elastic.indices.get_settings(
+        index=index, flat_settings=True)[index]['settings']
+    for key in (
+        'index.number_of_shards',
+        'index.number_of_replicas',
+        'index.refresh_interval'
+    ):
+        assert after[key] == before[key]
+
+    elastic.full_integrity_check()
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_streaming_cursor(tevmc_local):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 20_099), (10_000_000, 10_000_099)])
+    elastic.elastic.indices.refresh(index='*')
+
+    # spans both suffixes and more than one page
+    nums = [
+        num for num, in elastic.iter_deltas(
+            lower=15_000, upper=10_000_049,
+            fields=['@global.block_num'], page_size=1000)
+    ]
+    assert nums == list(range(15_000, 20_100)) + list(range(10_000_000, 10_000_050))
+
+    # closing early releases the point in time
+    cursor = elastic.iter_deltas(fields=['@global.block_num', 'block_num'])
+    assert next(cursor) == (100, 90)
+    cursor.close()
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_hash_chain(tevmc_local):
+    pytest.importorskip('numpy')
+
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config)
+    elastic.hash_chain_chunk_size = 500
+
+    elastic.elastic.indices.delete(index=f'{elastic.chain_name}-delta-*')
+
+    def block_hash(num):
+        return sha256(num.to_bytes(8, 'big')).hexdigest()
+
+    broken = {700: '00' * 32, 1000: block_hash(1)}
+
+    ops = []
+    for i in range(100, 2000):
+        ops.append({'index': {
+            '_index': f'{elastic.chain_name}-delta-v1.5-{i // 1000:08d}'}})
+        ops.append({
+            '@global': {'block_num': i},
+            'block_num': i - 10,
+            '@evmBlockHash': block_hash(i),
+            '@evmPrevBlockHash': broken.get(i, block_hash(i - 1))
+        })
+
+    elastic.elastic.bulk(operations=ops, refresh=True)
+
+    with pytest.raises(ESHashChainBroken) as info:
+        elastic.verify_hash_chain()
+
+    assert [link.global_block_num for link in info.value.links] == [700, 1000]
+    assert info.value.links[1].parent_hash == block_hash(999)
+
+    elastic.verify_hash_chain(100, 699)
+
+
+@pytest.mark.randomize(False)
+@pytest.mark.services('elastic', 'kibana')
+def test_block_coverage(tevmc_local, tmp_path):
+    tevmc = tevmc_local
+    elastic = ElasticDriver(tevmc.config, node_dir=tmp_path)
+
+    prepare_db_for_test(
+        tevmc, datetime.now(), [(100, 499), (600, 2499)])
+    elastic.elastic.indices.refresh(index='*')
+
+    assert elastic.missing_ranges(0, 3000) == [(0, 99), (500, 599), (2500, 3000)]
+    assert elastic.is_indexed(600)
+    assert not elastic.is_indexed(550)
+    assert elastic.coverage_percent(100, 2499) == 2300 * 100 / 2400
+    assert elastic.coverage_path.is_file()
+
+    # the persisted map is readable without querying elastic
+    cached = ElasticDriver(tevmc.config, node_dir=tmp_path).cached_coverage()
+    assert cached == elastic.get_coverage()
+
+    # a fresh driver picks the persisted map up and only scans the tail
+    elastic.purge_newer_than(2190, 2200, mode='delete')
+    elastic.elastic.indices.refresh(index='*')
+
+    elastic = ElasticDriver(tevmc.config, node_dir=tmp_path)
+    assert elastic.update_coverage().runs == [(100, 499), (600, 2199)]
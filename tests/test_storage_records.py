@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import pytest
+
+from tevmc.testing.database import (
+    StorageEosioAction, StorageEosioDelta, nest_source
+)
+
+
+def test_nest_source():
+    assert nest_source({'@raw.hash': '0x1', '@raw': {'block': 5}, 'a': 1}) == {
+        '@raw': {'hash': '0x1', 'block': 5}, 'a': 1}
+
+
+def test_records_from_partial_source():
+    delta = StorageEosioDelta.from_source(
+        {'@global.block_num': 110, 'block_num': 100})
+    assert delta.global_block_num == 110
+    assert delta.block_num == 100
+    assert delta.block_hash is None
+
+    action = StorageEosioAction.from_source(
+        {'@raw.hash': '0x1', '@raw.block': 5, 'trx_id': 'ab'})
+    assert action.raw.hash == '0x1'
+    assert action.raw.block == 5
+    assert action.raw.itxs == []
+
+    assert StorageEosioAction.from_source({'trx_id': 'ab'}).raw is None
+
+    # no per instance __dict__
+    with pytest.raises(AttributeError):
+        delta.extra = 1
+
+
+def test_lazy_itxs():
+    action = StorageEosioAction({
+        '@raw': {'itxs': [{'callType': 'call', 'traceAddress': [0]}]}})
+
+    assert action.raw._itxs is None
+
+    itxs = action.raw.itxs
+    assert itxs[0].call_type == 'call'
+    assert itxs[0].trace_address == [0]
+    assert action.raw.itxs is itxs
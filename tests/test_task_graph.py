@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+
+import pytest
+
+from tevmc.utils import run_task_graph
+
+
+def test_task_graph_order_and_concurrency():
+    events = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def task(name, sync=False):
+        def _run():
+            if sync:
+                # only passes if both independent tasks run at the same time
+                barrier.wait()
+            with lock:
+                events.append(name)
+        return _run
+
+    run_task_graph(
+        {
+            'elastic': task('elastic', sync=True),
+            'nodeos': task('nodeos', sync=True),
+            'indexer': task('indexer'),
+            'rpc': task('rpc')
+        },
+        {
+            'indexer': ['nodeos', 'elastic'],
+            'rpc': ['redis', 'indexer']
+        }
+    )
+
+    assert set(events[:2]) == {'elastic', 'nodeos'}
+    assert events[2:] == ['indexer', 'rpc']
+
+
+def test_task_graph_failure_stops_dependents():
+    ran = []
+
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError('nodeos failed')
+
+    with pytest.raises(RuntimeError, match='nodeos failed'):
+        run_task_graph(
+            {
+                'nodeos': fail,
+                'redis': lambda: ran.append('redis'),
+                'indexer': lambda: ran.append('indexer')
+            },
+            {'indexer': ['nodeos']}
+        )
+
+    assert ran == ['redis']
+
+
+def test_task_graph_failure_doesnt_wait_on_running():
+    cancel = threading.Event()
+    bailed = threading.Event()
+
+    def slow():
+        # a waiter honoring the cancel event
+        if cancel.wait(timeout=10):
+            bailed.set()
+
+    def fail():
+        raise RuntimeError('elastic failed')
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match='elastic failed'):
+        run_task_graph({'nodeos': slow, 'elastic': fail}, {}, cancel=cancel)
+
+    assert time.monotonic() - start < 5
+    assert cancel.is_set()
+    assert bailed.wait(timeout=5)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+from tevmc.progress import SyncProgressTracker, parse_translator_progress
+
+
+def pushed_line(block_num: int, evm_block_num: int) -> str:
+    return (
+        f'2024-01-01T00:00:00.000Z info: '
+        f'[{block_num:,}|{evm_block_num:,}] pushed, at 2024-01-01T00:00:00.000Z\n'
+    )
+
+
+def test_parse_translator_progress():
+    progress = parse_translator_progress(
+        pushed_line(180_698_860, 142_011_234), seen_at=1.0)
+
+    assert progress.block_num == 180_698_860
+    assert progress.evm_block_num == 142_011_234
+    assert progress.timestamp == '2024-01-01T00:00:00.000Z'
+    assert progress.seen_at == 1.0
+
+    assert parse_translator_progress(
+        'info: [NaN|NaN] pushed, at 2024-01-01T00:00:00.000Z') is None
+    assert parse_translator_progress('drained') is None
+
+
+def test_sync_progress_tracker():
+    tracker = SyncProgressTracker(window=10, stall_timeout=5)
+
+    for i in range(21):
+        tracker.update(parse_translator_progress(
+            pushed_line(1000 + i * 100, 900 + i * 100), seen_at=float(i)))
+
+    # window keeps the last ~10 seconds, 100 blocks per second
+    assert tracker.rate == 100.0
+    assert tracker.eta(3000 + 1000) == 10.0
+    assert tracker.eta(100) == 0.0
+
+    assert not tracker.stalled(now=22.0)
+    assert tracker.stalled(now=26.0)
+    assert tracker.stalled_for(now=26.0) == 6.0
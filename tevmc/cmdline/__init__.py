@@ -10,3 +10,5 @@ from .clean import clean
 from .stream import stream
 from .wait import wait_init, wait_tx
 from .repair import repair
+from .export import export
+from .load import load
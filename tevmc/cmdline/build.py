@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 
 from copy import deepcopy
+from hashlib import sha1
 import logging
 import os
 import json
+import time
 
 import docker
 from docker.types import Mount
@@ -20,10 +22,57 @@ DEFAULT_SERVICES = ['redis', 'elastic', 'kibana', 'nodeos', 'indexer', 'rpc']
 TEST_SERVICES = ['redis', 'elastic', 'kibana', 'nodeos', 'indexer', 'rpc']
 
 
+# config subtrees each service (alias) is generated and launched from, a
+# change anywhere else leaves its artifacts and container untouched
+SERVICE_CONFIG_KEYS = {
+    'redis': ['redis'],
+    'elastic': ['elasticsearch'],
+    'kibana': [
+        'kibana',
+        'elasticsearch.host', 'elasticsearch.user', 'elasticsearch.pass'
+    ],
+    'nodeos': ['nodeos', 'telos-evm-rpc.elastic_prefix'],
+    'indexer': [
+        'telosevm-translator',
+        'nodeos.ini.http_addr', 'nodeos.ini.history_endpoint',
+        'telos-evm-rpc.elastic_prefix', 'telos-evm-rpc.chain_id',
+        'telos-evm-rpc.indexer_websocket_host',
+        'telos-evm-rpc.indexer_websocket_port',
+        'elasticsearch.host'
+    ],
+    'rpc': [
+        'telos-evm-rpc',
+        'nodeos.chain_id', 'nodeos.ini.http_addr',
+        'telosevm-translator.evm_block_delta',
+        'telosevm-translator.elastic_docs_per_index',
+        'redis.host', 'redis.port',
+        'elasticsearch.host', 'elasticsearch.user', 'elasticsearch.pass'
+    ],
+    'beats': [
+        'beats',
+        'telos-evm-rpc.docker_path', 'telos-evm-rpc.logs_dir',
+        'kibana.port',
+        'elasticsearch.host', 'elasticsearch.user', 'elasticsearch.pass'
+    ]
+}
+
+
 class TEVMCBuildException(Exception):
     ...
 
 
+class PrefixedLogger(logging.LoggerAdapter):
+    '''Tag every message with a prefix, used to tell apart the output of
+    concurrent builds.
+    '''
+
+    def __init__(self, logger, prefix: str):
+        super().__init__(logger, {'prefix': prefix})
+
+    def process(self, msg, kwargs):
+        return f'[{self.extra["prefix"]}] {msg}', kwargs
+
+
 def patch_config(template_dict, current_dict):
     diffs = []
     new_dict = {}
@@ -51,13 +100,184 @@ def patch_config(template_dict, current_dict):
     return final_dict, diffs
 
 
-def perform_config_build(target_dir, config):
+def write_if_changed(path: Path, content: str, skip_header: bool = False) -> bool:
+    '''Write ``content`` to ``path`` unless it already holds the same text,
+    with ``skip_header`` the first line (autogenerated timestamp) is left out
+    of the comparison. Returns True if the file was written.
+    '''
+    path = Path(path)
+    try:
+        current = path.read_text()
+
+    except (FileNotFoundError, UnicodeDecodeError):
+        current = None
+
+    if current is not None:
+        if skip_header:
+            same = current.partition('\n')[2] == content.partition('\n')[2]
+        else:
+            same = current == content
+
+        if same:
+            return False
+
+    with open(path, 'w+') as target_file:
+        target_file.write(content)
+
+    return True
+
+
+# written at the root of a data dir once its ownership has been fixed
+OWNERSHIP_MARKER = '.tevmc-owner'
+
+
+def _find_foreign_owned(root: Path, uid: int, gid: int, since: float) -> list[str]:
+    '''Paths under ``root`` not owned by ``uid:gid``, relative to it.
+
+    Directories are always checked, a mismatched one is reported as a whole
+    and not descended into. Files are only checked in directories modified
+    after ``since``, anywhere else the set of entries hasn't changed since
+    the last fix.
+    '''
+    foreign = []
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        try:
+            dir_changed = current.stat().st_mtime >= since
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name == OWNERSHIP_MARKER and current == root:
+                        continue
+
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and not dir_changed:
+                        continue
+
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_uid != uid or stat.st_gid != gid:
+                        foreign.append(
+                            str(Path(entry.path).relative_to(root)))
+
+                    elif is_dir:
+                        pending.append(Path(entry.path))
+
+        except PermissionError:
+            # can't even list it, let the container handle all of it
+            foreign.append(str(current.relative_to(root)))
+
+    return foreign
+
+
+def fix_data_dir_ownership(host_dir: Path, logger=None) -> list[str]:
+    '''Make ``host_dir`` owned by the current user, only touching what
+    changed since the last call.
+
+    The top level directory and a marker file recording the owner and the
+    time of the last check decide whether a full recursive chown is needed,
+    otherwise only new or mismatched subtrees are chowned and no container
+    is launched at all if there are none. Returns the chowned paths.
+    '''
+    if not logger:
+        logger = logging.getLogger('config-build')
+
+    start = time.monotonic()
+    uid, gid = os.getuid(), os.getgid()
+    host_dir = Path(host_dir)
+    marker = host_dir / OWNERSHIP_MARKER
+    checked_at = time.time()
+
+    since = 0.0
+    try:
+        owner = json.loads(marker.read_text())
+        top = host_dir.stat()
+        if (owner['uid'], owner['gid']) == (uid, gid) == (top.st_uid, top.st_gid):
+            since = owner['checked_at']
+
+    except (FileNotFoundError, ValueError, KeyError):
+        ...
+
+    if since or host_dir.stat().st_uid == uid:
+        targets = _find_foreign_owned(host_dir, uid, gid, since)
+
+    else:
+        targets = ['.']
+
+    if targets:
+        # chown as root from a container, a partial fix passes its paths
+        # through a file to avoid argument size limits
+        list_path = host_dir / '.tevmc-chown'
+        if targets == ['.']:
+            cmd = f'chown -R {uid}:{gid} /root/target'
+
+        else:
+            list_path.write_text('\0'.join(targets) + '\0')
+            cmd = (
+                'cd /root/target && '
+                f'xargs -0 chown -R {uid}:{gid} -- < .tevmc-chown'
+            )
+
+        client = docker.from_env()
+        try:
+            client.containers.run(
+                'bash',
+                f'bash -c \"{cmd}\"',
+                remove=True,
+                mounts=[Mount('/root/target', str(host_dir), 'bind')]
+            )
+
+        finally:
+            list_path.unlink(missing_ok=True)
+
+    marker.write_text(json.dumps(
+        {'uid': uid, 'gid': gid, 'checked_at': checked_at}))
+
+    logger.info(
+        f'data dir ownership: {len(targets)} paths fixed in '
+        f'{time.monotonic() - start:.2f}s')
+
+    return targets
+
+
+def config_hashes(config: dict) -> dict[str, str]:
+    '''Per service hash of the config subtrees listed in
+    ``SERVICE_CONFIG_KEYS``, missing keys hash as null.
+    '''
+    hashes = {}
+    for service, keys in SERVICE_CONFIG_KEYS.items():
+        subtrees = {}
+        for key in keys:
+            try:
+                subtrees[key] = get_config(key, config)
+
+            except KeyError:
+                subtrees[key] = None
+
+        hashes[service] = sha1(
+            json.dumps(subtrees, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+    return hashes
+
+
+def perform_config_build(
+    target_dir,
+    config,
+    services: list[str] | None = None,
+    logger = None
+):
+    '''Render the generated config files of ``services`` (aliases as in
+    ``SERVICE_CONFIG_KEYS``), all of them if None.
+    '''
     target_dir = Path(target_dir).resolve()
     target_dir.mkdir(parents=True, exist_ok=True)
 
     docker_dir = target_dir / 'docker'
     docker_dir.mkdir(exist_ok=True)
 
+    if services is None:
+        services = list(SERVICE_CONFIG_KEYS.keys())
+
     # config build
     timestamp = {'timestamp': str(datetime.now())}
     docker_templates = load_docker_templates()
@@ -80,183 +300,179 @@ def perform_config_build(target_dir, config):
         return ndict
 
     def write_docker_template(file, subst: dict):
-        with open(docker_dir / file, 'w+') as conf_file:
-            conf_file.write(
-                docker_templates[file].substitute(**subst))
+        write_if_changed(
+            docker_dir / file, docker_templates.render(file, subst))
 
+    chain_name = config['telos-evm-rpc']['elastic_prefix']
+    elastic_conf = config['elasticsearch']
+    nodeos_conf = config['nodeos']
+    ini_conf = nodeos_conf['ini']
+    nodeos_http_port = int(ini_conf['http_addr'].split(':')[-1])
+    nodeos_ship_port = int(ini_conf['history_endpoint'].split(':')[-1])
 
     # redis
-    redis_conf = config['redis']
+    if 'redis' in services:
+        redis_conf = config['redis']
 
-    redis_dir = redis_conf['docker_path']
-    redis_build_dir = redis_dir + '/' + 'build'
-    redis_conf_dir = redis_dir + '/' +  redis_conf['conf_dir']
+        redis_dir = redis_conf['docker_path']
+        redis_conf_dir = redis_dir + '/' +  redis_conf['conf_dir']
 
-    subst = flatten('redis', config)
-    write_docker_template(f'{redis_conf_dir}/redis.conf', subst)
+        subst = flatten('redis', config)
+        write_docker_template(f'{redis_conf_dir}/redis.conf', subst)
 
     # elasticsearch
-    elastic_conf = config['elasticsearch']
+    if 'elastic' in services:
+        elastic_dir = elastic_conf['docker_path']
+        elastic_build_dir = elastic_dir + '/' + 'build'
+        elastic_data_dir = elastic_dir + '/' + elastic_conf['data_dir']
+        subst = {
+            'elasticsearch_port': config['elasticsearch']['host'].split(':')[-1]
+        }
+        write_docker_template(f'{elastic_build_dir}/elasticsearch.yml', subst)
+
+        host_dir = (docker_dir / elastic_data_dir)
+        host_dir.mkdir(parents=True, exist_ok=True)
 
-    elastic_dir = elastic_conf['docker_path']
-    elastic_build_dir = elastic_dir + '/' + 'build'
-    elastic_data_dir = elastic_dir + '/' + elastic_conf['data_dir']
-    subst = {
-        'elasticsearch_port': config['elasticsearch']['host'].split(':')[-1]
-    }
-    write_docker_template(f'{elastic_build_dir}/elasticsearch.yml', subst)
-
-    host_dir = (docker_dir / elastic_data_dir)
-    host_dir.mkdir(parents=True, exist_ok=True)
-
-    client = docker.from_env()
-    client.containers.run(
-        'bash',
-        f'bash -c \"chown -R {os.getuid()}:{os.getgid()} /root/target\"',
-        remove=True,
-        mounts=[Mount('/root/target', str(host_dir), 'bind')]
-    )
+        fix_data_dir_ownership(host_dir, logger=logger)
 
     # kibana
-    kibana_conf = config['kibana']
+    if 'kibana' in services:
+        kibana_conf = config['kibana']
 
-    kibana_dir = kibana_conf['docker_path']
-    kibana_build_dir = kibana_dir + '/' + 'build'
-    kibana_conf_dir  = kibana_dir + '/' + kibana_conf['conf_dir']
+        kibana_dir = kibana_conf['docker_path']
+        kibana_conf_dir  = kibana_dir + '/' + kibana_conf['conf_dir']
 
-    subst = flatten('kibana', config)
-    write_docker_template(f'{kibana_conf_dir}/kibana.yml', subst)
+        subst = flatten('kibana', config)
+        write_docker_template(f'{kibana_conf_dir}/kibana.yml', subst)
 
     # nodeos
-    chain_name = config['telos-evm-rpc']['elastic_prefix']
-    nodeos_conf = config['nodeos']
-    ini_conf = nodeos_conf['ini']
-
-    nodeos_dir = nodeos_conf['docker_path']
-    nodeos_conf_dir = nodeos_dir + '/' + nodeos_conf['conf_dir']
-    nodeos_build_dir = nodeos_dir + '/' + 'build'
-    nodeos_http_port = int(ini_conf['http_addr'].split(':')[-1])
-    nodeos_ship_port = int(ini_conf['history_endpoint'].split(':')[-1])
-
-    # nodeos.config.ini
-    subst = {}
-    subst.update(get_config('nodeos.ini', config))
-    subst.update(timestamp)
+    if 'nodeos' in services:
+        nodeos_dir = nodeos_conf['docker_path']
+        nodeos_conf_dir = nodeos_dir + '/' + nodeos_conf['conf_dir']
+
+        # nodeos.config.ini
+        subst = {}
+        subst.update(get_config('nodeos.ini', config))
+        subst.update(timestamp)
+
+        # normalize bools
+        for key, val in subst.items():
+            if isinstance(val, bool):
+                subst[key] = str(val).lower()
+
+        conf_str = docker_templates.render(
+            f'{nodeos_conf_dir}/nodeos.config.ini', subst, volatile=timestamp) + '\n'
+
+        if 'local' in chain_name:
+            conf_str += docker_templates.render(
+                f'{nodeos_conf_dir}/nodeos.local.config.ini', subst, volatile=timestamp) + '\n'
+
+        for plugin in subst['plugins']:
+            conf_str += f'plugin = {plugin}\n'
+
+        if 'subst' in subst:
+            conf_str += f'plugin = eosio::subst_plugin\n'
+            if ini_conf.get('subst_admin_apis', False):
+                conf_str += f'plugin = eosio::subst_api_plugin\n'
+            conf_str += '\n'
+            sinfo = subst['subst']
+            if isinstance(sinfo, str):
+                conf_str += f'subst-manifest = {sinfo}'
+
+            elif isinstance(sinfo, dict):
+                for skey, val in sinfo.items():
+                    conf_str += f'subst-by-name = {skey}:{val}'
 
-    # normalize bools
-    for key, val in subst.items():
-        if isinstance(val, bool):
-            subst[key] = str(val).lower()
-
-    conf_str = docker_templates[f'{nodeos_conf_dir}/nodeos.config.ini'].substitute(**subst) + '\n'
-
-    if 'local' in chain_name:
-        conf_str += docker_templates[f'{nodeos_conf_dir}/nodeos.local.config.ini'].substitute(**subst) + '\n'
-
-    for plugin in subst['plugins']:
-        conf_str += f'plugin = {plugin}\n'
-
-    if 'subst' in subst:
-        conf_str += f'plugin = eosio::subst_plugin\n'
-        if ini_conf.get('subst_admin_apis', False):
-            conf_str += f'plugin = eosio::subst_api_plugin\n'
         conf_str += '\n'
-        sinfo = subst['subst']
-        if isinstance(sinfo, str):
-            conf_str += f'subst-manifest = {sinfo}'
-
-        elif isinstance(sinfo, dict):
-            for skey, val in sinfo.items():
-                conf_str += f'subst-by-name = {skey}:{val}'
 
-    conf_str += '\n'
+        for peer in subst['peers']:
+            conf_str += f'p2p-peer-address = {peer}\n'
 
-    for peer in subst['peers']:
-        conf_str += f'p2p-peer-address = {peer}\n'
+        write_if_changed(
+            docker_dir / nodeos_conf_dir / 'config.ini', conf_str, skip_header=True)
 
-    with open(docker_dir / nodeos_conf_dir / 'config.ini', 'w+') as target_file:
-        target_file.write(conf_str)
-
-    # telosevm-translator
     rpc_conf = config['telos-evm-rpc']
     tevmi_conf = config['telosevm-translator']
-    tevmi_dir = tevmi_conf['docker_path']
-    tevmi_build_dir = tevmi_dir + '/' + 'build'
 
-    if 'testnet' in chain_name:
-        remote_endpoint = 'https://testnet.telos.net'
-    elif 'mainnet' in chain_name:
-        remote_endpoint = 'https://mainnet.telos.net'
-    else:
-        remote_endpoint = f'http://127.0.0.1:{nodeos_http_port}'
+    # telosevm-translator
+    if 'indexer' in services:
+        tevmi_dir = tevmi_conf['docker_path']
 
-    subst = jsonize({
-        'translator_log_level': tevmi_conf['log_level'],
-        'translator_reader_log_level': tevmi_conf['reader_log_level'],
+        if 'testnet' in chain_name:
+            remote_endpoint = 'https://testnet.telos.net'
+        elif 'mainnet' in chain_name:
+            remote_endpoint = 'https://mainnet.telos.net'
+        else:
+            remote_endpoint = f'http://127.0.0.1:{nodeos_http_port}'
+
+        subst = jsonize({
+            'translator_log_level': tevmi_conf['log_level'],
+            'translator_reader_log_level': tevmi_conf['reader_log_level'],
 
-        'translator_chain_name': rpc_conf['elastic_prefix'],
-        'translator_chain_id': rpc_conf['chain_id'],
+            'translator_chain_name': rpc_conf['elastic_prefix'],
+            'translator_chain_id': rpc_conf['chain_id'],
 
-        'nodeos_http_endpoint': f'http://127.0.0.1:{nodeos_http_port}',
-        'nodeos_remote_endpoint': remote_endpoint,
-        'nodeos_ws_endpoint': f'ws://127.0.0.1:{nodeos_ship_port}',
+            'nodeos_http_endpoint': f'http://127.0.0.1:{nodeos_http_port}',
+            'nodeos_remote_endpoint': remote_endpoint,
+            'nodeos_ws_endpoint': f'ws://127.0.0.1:{nodeos_ship_port}',
 
-        'translator_block_delta': tevmi_conf['evm_block_delta'],
-        'translator_prev_hash': tevmi_conf['prev_hash'],
-        'translator_validate_hash': tevmi_conf['evm_validate_hash'],
+            'translator_block_delta': tevmi_conf['evm_block_delta'],
+            'translator_prev_hash': tevmi_conf['prev_hash'],
+            'translator_validate_hash': tevmi_conf['evm_validate_hash'],
 
-        'translator_start_block': tevmi_conf['start_block'],
-        'translator_end_block': tevmi_conf['stop_block'],
-        'translator_irreversible_only': tevmi_conf['irreversible_only'],
-        'translator_block_hist_size': tevmi_conf['block_history_size'],
-        'translator_perf_stall_counter': tevmi_conf['stall_counter'],
-        'translator_perf_reader_workers': tevmi_conf['worker_amount'],
+            'translator_start_block': tevmi_conf['start_block'],
+            'translator_end_block': tevmi_conf['stop_block'],
+            'translator_irreversible_only': tevmi_conf['irreversible_only'],
+            'translator_block_hist_size': tevmi_conf['block_history_size'],
+            'translator_perf_stall_counter': tevmi_conf['stall_counter'],
+            'translator_perf_reader_workers': tevmi_conf['worker_amount'],
 
-        'elastic_endpoint': f'http://{elastic_conf["host"]}',
+            'elastic_endpoint': f'http://{elastic_conf["host"]}',
 
-        'translator_ws_host': rpc_conf['indexer_websocket_host'],
-        'translator_ws_port': rpc_conf['indexer_websocket_port']
-    })
+            'translator_ws_host': rpc_conf['indexer_websocket_host'],
+            'translator_ws_port': rpc_conf['indexer_websocket_port']
+        })
 
-    tevmi_conf_dir =  f'{tevmi_dir}/{tevmi_conf["conf_dir"]}'
-    (docker_dir / tevmi_conf_dir).mkdir(exist_ok=True, parents=True)
-    write_docker_template(f'{tevmi_conf_dir}/config.json', subst)
+        tevmi_conf_dir =  f'{tevmi_dir}/{tevmi_conf["conf_dir"]}'
+        (docker_dir / tevmi_conf_dir).mkdir(exist_ok=True, parents=True)
+        write_docker_template(f'{tevmi_conf_dir}/config.json', subst)
 
     # telos-evm-rpc
-    rpc_dir = rpc_conf['docker_path']
-
-    # rpc config.json gen
-    subst = jsonize({
-        'rpc_chain_id': rpc_conf['chain_id'],
-        'nodeos_chain_id': nodeos_conf['chain_id'],
-        'evm_block_delta': tevmi_conf['evm_block_delta'],
-        'rpc_debug': rpc_conf['debug'],
-        'rpc_host': rpc_conf['api_host'],
-        'rpc_api': rpc_conf['api_port'],
-        'rpc_nodeos_write': f'http://127.0.0.1:{nodeos_http_port}',
-        'rpc_nodeos_read': f'http://127.0.0.1:{nodeos_http_port}',
-        'rpc_signer_account': rpc_conf['signer_account'],
-        'rpc_signer_permission': rpc_conf['signer_permission'],
-        'rpc_signer_key': rpc_conf['signer_key'],
-        'rpc_contracts': rpc_conf['contracts'],
-        'rpc_indexer_websocket_host': rpc_conf['indexer_websocket_host'],
-        'rpc_indexer_websocket_port': rpc_conf['indexer_websocket_port'],
-        'rpc_indexer_websocket_uri': rpc_conf['indexer_websocket_uri'],
-        'rpc_websocket_host': rpc_conf['rpc_websocket_host'],
-        'rpc_websocket_port': rpc_conf['rpc_websocket_port'],
-        'redis_host': config['redis']['host'],
-        'redis_port': config['redis']['port'],
-        'rpc_elastic_node': f'http://{elastic_conf["host"]}',
-        'elasticsearch_user': elastic_conf['user'],
-        'elasticsearch_pass': elastic_conf['pass'],
-        'elasticsearch_prefix': rpc_conf['elastic_prefix'],
-        'elasticsearch_index_version': rpc_conf['elasitc_index_version'],
-        'elasticsearch_docs_per_index': tevmi_conf['elastic_docs_per_index']
-    })
-
-    rpc_conf_dir =  f'{rpc_dir}/{rpc_conf["conf_dir"]}'
-    (docker_dir / rpc_conf_dir).mkdir(exist_ok=True, parents=True)
-    write_docker_template(f'{rpc_conf_dir}/config.json', subst)
+    if 'rpc' in services:
+        rpc_dir = rpc_conf['docker_path']
+
+        # rpc config.json gen
+        subst = jsonize({
+            'rpc_chain_id': rpc_conf['chain_id'],
+            'nodeos_chain_id': nodeos_conf['chain_id'],
+            'evm_block_delta': tevmi_conf['evm_block_delta'],
+            'rpc_debug': rpc_conf['debug'],
+            'rpc_host': rpc_conf['api_host'],
+            'rpc_api': rpc_conf['api_port'],
+            'rpc_nodeos_write': f'http://127.0.0.1:{nodeos_http_port}',
+            'rpc_nodeos_read': f'http://127.0.0.1:{nodeos_http_port}',
+            'rpc_signer_account': rpc_conf['signer_account'],
+            'rpc_signer_permission': rpc_conf['signer_permission'],
+            'rpc_signer_key': rpc_conf['signer_key'],
+            'rpc_contracts': rpc_conf['contracts'],
+            'rpc_indexer_websocket_host': rpc_conf['indexer_websocket_host'],
+            'rpc_indexer_websocket_port': rpc_conf['indexer_websocket_port'],
+            'rpc_indexer_websocket_uri': rpc_conf['indexer_websocket_uri'],
+            'rpc_websocket_host': rpc_conf['rpc_websocket_host'],
+            'rpc_websocket_port': rpc_conf['rpc_websocket_port'],
+            'redis_host': config['redis']['host'],
+            'redis_port': config['redis']['port'],
+            'rpc_elastic_node': f'http://{elastic_conf["host"]}',
+            'elasticsearch_user': elastic_conf['user'],
+            'elasticsearch_pass': elastic_conf['pass'],
+            'elasticsearch_prefix': rpc_conf['elastic_prefix'],
+            'elasticsearch_index_version': rpc_conf['elasitc_index_version'],
+            'elasticsearch_docs_per_index': tevmi_conf['elastic_docs_per_index']
+        })
+
+        rpc_conf_dir =  f'{rpc_dir}/{rpc_conf["conf_dir"]}'
+        (docker_dir / rpc_conf_dir).mkdir(exist_ok=True, parents=True)
+        write_docker_template(f'{rpc_conf_dir}/config.json', subst)
 
 
 def service_alias_to_fullname(alias: str):
@@ -279,6 +495,31 @@ def build():
         'into \"tevmc up\" command.')
 
 
+def hash_build_context(target_dir: Path, service_name: str, config: dict) -> str:
+    '''Content hash of a service's docker build directory, Dockerfile
+    included, plus the image tag it gets built as.
+    '''
+    if service_name not in config:
+        service_name = service_alias_to_fullname(service_name)
+
+    chain_name = config['telos-evm-rpc']['elastic_prefix']
+    conf = config[service_name]
+    build_path = Path(target_dir) / 'docker' / conf['docker_path'] / 'build'
+
+    hasher = sha1(f'{conf["tag"]}-{chain_name}'.encode('utf-8'))
+    for root, dirs, files in os.walk(build_path):
+        dirs.sort()
+        for fname in sorted(files):
+            fpath = Path(root) / fname
+            rel_path = fpath.relative_to(build_path)
+            hasher.update(f'{rel_path}\0{fpath.stat().st_size}\0'.encode('utf-8'))
+            with open(fpath, 'rb') as file:
+                while chunk := file.read(1024 * 1024):
+                    hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
 def build_service(target_dir: Path, service_name: str, config: dict, logger = None, **kwargs):
     if not logger:
         logger = logging.getLogger(f'build-{service_name}')
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+from pathlib import Path
+
+import click
+
+from tevmc.config import load_config
+from tevmc.testing.database import ElasticDriver
+
+from .cli import cli
+
+
+@cli.command()
+@click.option(
+    '--config', default='tevmc.json',
+    help='Path to config file.')
+@click.option(
+    '--output', default='export', type=click.Path(file_okay=False),
+    help='Directory to write the partitioned files to.')
+@click.option(
+    '--lower', default=None, type=int,
+    help='First block to export, defaults to the first indexed one.')
+@click.option(
+    '--upper', default=None, type=int,
+    help='Last block to export, defaults to the last indexed one.')
+@click.option(
+    '--kind', 'kinds', multiple=True,
+    default=['delta', 'action'],
+    type=click.Choice(['delta', 'action']),
+    help='Which docs to export, can be passed more than once.')
+@click.option(
+    '--format', 'fmt', default='parquet',
+    type=click.Choice(['parquet', 'arrow']),
+    help='Parquet files or Arrow IPC files.')
+@click.option(
+    '--compression', default='zstd',
+    type=click.Choice(['zstd', 'lz4', 'none']),
+    help='Compression codec of the written files.')
+@click.option(
+    '--slices', default=4, type=int,
+    help='Parallel point in time scans per index.')
+@click.option(
+    '--workers', default=4, type=int,
+    help='Slices exported at the same time.')
+@click.option(
+    '--batch-rows', default=50_000, type=int,
+    help='Rows buffered per slice before writing a record batch.')
+def export(
+    config, output, lower, upper, kinds,
+    fmt, compression, slices, workers, batch_rows
+):
+    '''Export delta and action docs of a block range into typed, columnar
+    Parquet or Arrow files, elasticsearch must be up.
+    '''
+    try:
+        from tevmc.export import ColumnarExporter
+
+        config_path = Path(config)
+        root_pwd = config_path.parent.resolve()
+        config = load_config(str(root_pwd), config_path.name)
+
+        exporter = ColumnarExporter(
+            ElasticDriver(config), Path(output),
+            fmt=fmt,
+            compression=None if compression == 'none' else compression,
+            slices=slices,
+            workers=workers,
+            batch_rows=batch_rows
+        )
+
+    except ImportError as error:
+        raise click.ClickException(str(error))
+
+    stats = exporter.export(lower=lower, upper=upper, kinds=kinds)
+
+    for kind, rows in stats.rows.items():
+        click.echo(f'{kind}s: {rows:,}')
+
+    click.echo(f'files: {len(stats.files)}')
+    click.echo(
+        f'{stats.blocks:,} blocks in {stats.elapsed:.2f}s, '
+        f'{stats.blocks_per_sec:,.2f} blocks/s')
@@ -2,9 +2,11 @@
 
 import sys
 import json
+import threading
 
 from string import Template
-from typing import Dict
+from typing import Dict, Iterable
+from hashlib import sha1
 from pathlib import Path
 from distutils.dir_util import copy_tree
 
@@ -22,18 +24,89 @@ source_dir = Path(__file__).parent.parent
 template_dir = (source_dir / 'docker').resolve(strict=False)
 
 
-def load_docker_templates() -> Dict[str, Template]:
-    templ = {}
-    for node in (template_dir).glob('**/*'):
-        if node.is_file():
-            with open(node, 'r') as templ_file:
-                try:
-                    key = '/'.join(node.parts[-3:])
-                    templ[key] = Template(templ_file.read())
-                except UnicodeDecodeError:
-                    pass
+# files under the docker tree that hold ``string.Template`` placeholders,
+# everything else (Dockerfiles, scripts, contract binaries) is copied as is
+TEMPLATE_FILES = (
+    'redis/config/redis.conf',
+    'elasticsearch/build/elasticsearch.yml',
+    'kibana/config/kibana.yml',
+    'leap/config/nodeos.config.ini',
+    'leap/config/nodeos.local.config.ini',
+    'telosevm-translator/config/config.json',
+    'telos-evm-rpc/config/config.json'
+)
+
+
+class TemplateRegistry:
+    '''Lazily compiled docker config templates, keyed by their path relative
+    to the template root.
+
+    Each template is read and compiled the first time it is requested and
+    kept for the life of the process, ``render`` also remembers the last
+    output per template and only substitutes again if the inputs changed.
+    '''
+
+    def __init__(
+        self,
+        root: Path = template_dir,
+        names: Iterable[str] = TEMPLATE_FILES
+    ):
+        self.root = Path(root)
+        self.names = frozenset(names)
+
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Template] = {}
+        self._rendered: Dict[str, tuple[str, str]] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.names
+
+    def __iter__(self):
+        return iter(sorted(self.names))
+
+    def __getitem__(self, key: str) -> Template:
+        if key not in self.names:
+            raise KeyError(f'{key} is not a known template')
+
+        templ = self._templates.get(key)
+        if templ is None:
+            with self._lock:
+                templ = self._templates.get(key)
+                if templ is None:
+                    with open(self.root / key, 'r') as templ_file:
+                        templ = Template(templ_file.read())
+
+                    self._templates[key] = templ
+
+        return templ
+
+    def render(self, key: str, subst: dict, volatile: Iterable[str] = ()) -> str:
+        '''Substitute ``subst`` into template ``key``, keys in ``volatile``
+        (like a generation timestamp) don't count as an input change.
+        '''
+        inputs = {k: v for k, v in subst.items() if k not in volatile}
+        digest = sha1(
+            json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+        prev = self._rendered.get(key)
+        if prev and prev[0] == digest:
+            return prev[1]
+
+        result = self[key].substitute(**subst)
+        self._rendered[key] = (digest, result)
+        return result
+
+
+_registry = None
+
+
+def load_docker_templates() -> TemplateRegistry:
+    global _registry
+    if _registry is None:
+        _registry = TemplateRegistry()
 
-    return templ
+    return _registry
 
 
 def touch_node_dir(target_dir: Path, conf: dict, fname: str):
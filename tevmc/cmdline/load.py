@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+from pathlib import Path
+
+import click
+
+from tevmc.config import load_config
+from tevmc.testing.database import ElasticDriver
+
+from .cli import cli
+
+
+@cli.command()
+@click.option(
+    '--config', default='tevmc.json',
+    help='Path to config file.')
+@click.option(
+    '--input', 'input_dir', default='export',
+    type=click.Path(exists=True, file_okay=False),
+    help='Directory written by tevmc export.')
+@click.option(
+    '--kind', 'kinds', multiple=True,
+    default=['delta', 'action'],
+    type=click.Choice(['delta', 'action']),
+    help='Which docs to load, can be passed more than once.')
+@click.option(
+    '--format', 'fmt', default='parquet',
+    type=click.Choice(['parquet', 'arrow']),
+    help='Format the dump was exported as.')
+@click.option(
+    '--workers', default=4, type=int,
+    help='Parallel bulk workers.')
+@click.option(
+    '--batch-rows', default=10_000, type=int,
+    help='Rows read from the dump at a time.')
+@click.option(
+    '--queue-size', default=None, type=int,
+    help='Docs buffered for the bulk workers before reading stalls.')
+def load(config, input_dir, kinds, fmt, workers, batch_rows, queue_size):
+    '''Seed elasticsearch from a tevmc export dump, elasticsearch must be
+    up.
+    '''
+    try:
+        from tevmc.export import ColumnarLoader
+
+        config_path = Path(config)
+        root_pwd = config_path.parent.resolve()
+        config = load_config(str(root_pwd), config_path.name)
+
+        loader = ColumnarLoader(
+            ElasticDriver(config), Path(input_dir),
+            fmt=fmt,
+            workers=workers,
+            batch_rows=batch_rows,
+            queue_size=queue_size
+        )
+
+    except ImportError as error:
+        raise click.ClickException(str(error))
+
+    try:
+        stats = loader.load(kinds=kinds)
+
+    except ValueError as error:
+        raise click.ClickException(str(error))
+
+    for kind, rows in stats.rows.items():
+        click.echo(f'{kind}s: {rows:,}')
+
+    click.echo(f'rejected: {stats.errors:,}')
+    click.echo(
+        f'{stats.blocks:,} blocks in {stats.elapsed:.2f}s, '
+        f'{stats.blocks_per_sec:,.2f} blocks/s')
@@ -18,7 +18,7 @@ from tevmc.testing.database import ElasticDataEmptyError, ElasticDriver
 from .cli import cli
 
 
-def perform_data_repair(config_path, progress=True):
+def perform_data_repair(config_path, progress=True, purge_mode='auto'):
     from tevmc.tevmc import TEVMController
 
     root_pwd = config_path.parent.resolve()
@@ -40,8 +40,8 @@ def perform_data_repair(config_path, progress=True):
     with TEVMController(
         config, root_pwd=root_pwd, services=['elastic']):
         time.sleep(5)
-        es = ElasticDriver(config)
-        last_valid_nums = es.repair_data()
+        es = ElasticDriver(config, node_dir=root_pwd)
+        last_valid_nums = es.repair_data(purge_mode=purge_mode)
 
     logging.info(f'done, last valid blocks {last_valid_nums}')
     logging.info('downloading closest snapshot...')
@@ -90,9 +90,14 @@ def perform_data_repair(config_path, progress=True):
 @click.option(
     '--config', default='tevmc.json',
     help='Path to config file.')
-def repair(config):
+@click.option(
+    '--purge-mode', default='auto',
+    type=click.Choice(['auto', 'delete', 'reindex']),
+    help='How to drop docs past the last valid block: delete by query, '
+         'reindex the rest into a fresh index or pick by amount removed.')
+def repair(config, purge_mode):
     try:
-        perform_data_repair(Path(config))
+        perform_data_repair(Path(config), purge_mode=purge_mode)
 
     except ElasticDataEmptyError:
         logging.info('no data to repair')
@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+
+import time
+import json
+import queue
+import logging
+import threading
+
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from elasticsearch import helpers
+
+from .testing.database import ElasticDriver, source_field
+
+
+def load_pyarrow():
+    '''pyarrow is an optional dependency only needed for exports and
+    loads.
+    '''
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+
+    except ImportError as error:
+        raise ImportError(
+            'columnar exports and loads need pyarrow, install it with '
+            '`pip install pyarrow` or the `export` extra'
+        ) from error
+
+    return pyarrow
+
+
+def _to_int(value) -> Optional[int]:
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, str):
+        return int(value, 16) if value.startswith('0x') else int(value)
+
+    return int(value)
+
+
+def _to_bytes(value) -> Optional[bytes]:
+    if not value:
+        return None
+
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def _to_fixed_bytes(size: int) -> Callable:
+    '''Converter for fixed width columns, values of any other length
+    (like an empty ``0x``) are left out of the typed column, they are still
+    in the exported ``_source``.
+    '''
+    def convert(value) -> Optional[bytes]:
+        value = _to_bytes(value)
+        return value if value is not None and len(value) == size else None
+
+    return convert
+
+
+def _to_uint256(value) -> Optional[bytes]:
+    value = _to_int(value)
+    return None if value is None else value.to_bytes(32, 'big')
+
+
+def _to_timestamp(value) -> Optional[datetime]:
+    if value is None:
+        return None
+
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+    return timestamp
+
+
+# column kind -> (arrow type factory, _source value converter)
+COLUMN_KINDS: dict[str, tuple[Callable, Callable]] = {
+    'uint8': (lambda pa: pa.uint8(), _to_int),
+    'uint32': (lambda pa: pa.uint32(), _to_int),
+    'uint64': (lambda pa: pa.uint64(), _to_int),
+    # wei amounts don't fit any arrow integer, stored as big endian bytes
+    'uint256': (lambda pa: pa.binary(32), _to_uint256),
+    'hash': (lambda pa: pa.binary(32), _to_fixed_bytes(32)),
+    'address': (lambda pa: pa.binary(20), _to_fixed_bytes(20)),
+    'bytes': (lambda pa: pa.binary(), _to_bytes),
+    'string': (lambda pa: pa.string(), lambda value: value),
+    'timestamp': (lambda pa: pa.timestamp('ms', tz='UTC'), _to_timestamp)
+}
+
+
+class ExportColumn(NamedTuple):
+    name: str
+    field: str
+    kind: str
+
+
+DELTA_COLUMNS = [
+    ExportColumn('global_block_num', '@global.block_num', 'uint64'),
+    ExportColumn('block_num', 'block_num', 'uint64'),
+    ExportColumn('timestamp', '@timestamp', 'timestamp'),
+    ExportColumn('block_hash', '@blockHash', 'hash'),
+    ExportColumn('evm_block_hash', '@evmBlockHash', 'hash'),
+    ExportColumn('evm_prev_block_hash', '@evmPrevBlockHash', 'hash'),
+    ExportColumn('receipts_root_hash', '@receiptsRootHash', 'hash'),
+    ExportColumn('transactions_root', '@transactionsRoot', 'hash'),
+    ExportColumn('gas_used', 'gasUsed', 'uint64'),
+    ExportColumn('gas_limit', 'gasLimit', 'uint64'),
+    ExportColumn('size', 'size', 'uint64')
+]
+
+ACTION_COLUMNS = [
+    ExportColumn('block', '@raw.block', 'uint64'),
+    ExportColumn('timestamp', '@timestamp', 'timestamp'),
+    ExportColumn('trx_id', 'trx_id', 'hash'),
+    ExportColumn('action_ordinal', 'action_ordinal', 'uint32'),
+    ExportColumn('hash', '@raw.hash', 'hash'),
+    ExportColumn('trx_index', '@raw.trx_index', 'uint32'),
+    ExportColumn('from', '@raw.from', 'address'),
+    ExportColumn('to', '@raw.to', 'address'),
+    ExportColumn('value', '@raw.value', 'uint256'),
+    ExportColumn('nonce', '@raw.nonce', 'uint64'),
+    ExportColumn('gas_price', '@raw.gas_price', 'uint64'),
+    ExportColumn('charged_gas_price', '@raw.charged_gas_price', 'uint64'),
+    ExportColumn('gas_limit', '@raw.gas_limit', 'uint64'),
+    ExportColumn('gas_used', '@raw.gasused', 'uint64'),
+    ExportColumn('gas_used_block', '@raw.gasusedblock', 'uint64'),
+    ExportColumn('status', '@raw.status', 'uint8'),
+    ExportColumn('created_address', '@raw.createdaddr', 'address'),
+    ExportColumn('input_data', '@raw.input_data', 'bytes'),
+    ExportColumn('epoch', '@raw.epoch', 'uint64')
+]
+
+EXPORT_COLUMNS = {
+    'delta': DELTA_COLUMNS,
+    'action': ACTION_COLUMNS
+}
+
+# hive partition holding the suffix of the index a doc was exported from,
+# loads write it back to the same one
+PARTITION_COLUMN = 'suffix'
+
+# whole _source of every doc as compact JSON, the typed columns are a lossy
+# projection for analytics, loads rebuild docs from this one only
+SOURCE_COLUMN = 'source'
+
+FILE_EXTENSIONS = {
+    'parquet': 'parquet',
+    'arrow': 'arrow'
+}
+
+
+def export_schema(pa, columns: list[ExportColumn]):
+    return pa.schema([
+        pa.field(column.name, COLUMN_KINDS[column.kind][0](pa))
+        for column in columns
+    ] + [pa.field(SOURCE_COLUMN, pa.large_string())])
+
+
+class ExportStats:
+    '''Rows and files written by an export, shared by its scan threads.'''
+
+    def __init__(self):
+        self.rows: dict[str, int] = {}
+        self.files: list[Path] = []
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add_rows(self, kind: str, amount: int):
+        with self._lock:
+            self.rows[kind] = self.rows.get(kind, 0) + amount
+
+    def add_file(self, path: Path):
+        with self._lock:
+            self.files.append(path)
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at or time.monotonic()
+        return end - self.started_at
+
+    @property
+    def blocks(self) -> int:
+        # one delta doc per block
+        return self.rows.get('delta', 0)
+
+    @property
+    def blocks_per_sec(self) -> float:
+        elapsed = self.elapsed
+        return self.blocks / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        rows = ', '.join(f'{kind}s: {amount:,}' for kind, amount in self.rows.items())
+        return (
+            f'{rows}, files: {len(self.files)}, '
+            f'elapsed: {self.elapsed:.2f}s, '
+            f'rate: {self.blocks_per_sec:,.2f} blocks/s'
+        )
+
+
+@contextmanager
+def report_progress(stats: ExportStats, logger, interval: float, what: str):
+    '''Log ``stats`` every ``interval`` seconds while the block runs, then
+    mark them finished.
+    '''
+    done = threading.Event()
+
+    def report():
+        while not done.wait(interval):
+            logger.info(f'{what} progress, {stats.summary()}')
+
+    reporter = threading.Thread(target=report, daemon=True)
+    reporter.start()
+
+    try:
+        yield
+
+    finally:
+        done.set()
+        reporter.join()
+        stats.finished_at = time.monotonic()
+
+
+class ColumnarExporter:
+    '''Streams delta and action docs out of elasticsearch into typed
+    Parquet or Arrow IPC files, next to the typed columns every row keeps
+    its whole ``_source`` as JSON so dumps can be loaded back losslessly.
+
+    Every index is scanned with ``slices`` parallel point in time scans,
+    each slice writes its own file under
+    ``<output>/<kind>/suffix=<suffix>/part-<slice>.<ext>`` in record batches
+    of ``batch_rows``, so memory stays bounded to ``workers`` batches no
+    matter the range size.
+    '''
+
+    # seconds between progress log lines
+    progress_interval = 10.0
+
+    def __init__(
+        self,
+        driver: ElasticDriver,
+        output: Path,
+        fmt: str = 'parquet',
+        compression: Optional[str] = 'zstd',
+        slices: int = 4,
+        workers: int = 4,
+        batch_rows: int = 50_000,
+        logger=None
+    ):
+        if fmt not in FILE_EXTENSIONS:
+            raise ValueError(f'unknown export format {fmt}')
+
+        self.pa = load_pyarrow()
+        self.driver = driver
+        self.output = Path(output)
+        self.fmt = fmt
+        self.compression = compression
+        self.slices = slices
+        self.workers = workers
+        self.batch_rows = batch_rows
+
+        if not logger:
+            logger = logging.getLogger()
+
+        self.logger = logger
+
+    def _open_writer(self, path: Path, schema):
+        if self.fmt == 'parquet':
+            return self.pa.parquet.ParquetWriter(
+                path, schema, compression=self.compression or 'none')
+
+        return self.pa.ipc.new_file(
+            path, schema,
+            options=self.pa.ipc.IpcWriteOptions(compression=self.compression))
+
+    def _export_slice(
+        self,
+        stats: ExportStats,
+        kind: str,
+        index,
+        slice_id: int,
+        lower: Optional[int],
+        upper: Optional[int]
+    ):
+        pa = self.pa
+        columns = EXPORT_COLUMNS[kind]
+        converters = [COLUMN_KINDS[column.kind][1] for column in columns]
+        schema = export_schema(pa, columns)
+
+        scan = (
+            self.driver.iter_deltas if kind == 'delta'
+            else self.driver.iter_actions
+        )
+        records = scan(
+            lower=lower, upper=upper,
+            fields=None,
+            index=index.name,
+            slice=(slice_id, self.slices)
+        )
+
+        path = (
+            self.output / kind / f'{PARTITION_COLUMN}={index.suffix:08d}' /
+            f'part-{slice_id:03d}.{FILE_EXTENSIONS[self.fmt]}'
+        )
+        writer = None
+        buffers = [[] for _ in schema]
+
+        def flush():
+            nonlocal writer
+            if not buffers[0]:
+                return
+
+            if writer is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                writer = self._open_writer(path, schema)
+                stats.add_file(path)
+
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [
+                    pa.array(values, type=field.type)
+                    for values, field in zip(buffers, schema)
+                ],
+                schema=schema
+            ))
+            stats.add_rows(kind, len(buffers[0]))
+
+            for values in buffers:
+                values.clear()
+
+        try:
+            for source in records:
+                for values, convert, column in zip(buffers, converters, columns):
+                    values.append(convert(source_field(source, column.field)))
+
+                buffers[-1].append(json.dumps(source, separators=(',', ':')))
+
+                if len(buffers[0]) >= self.batch_rows:
+                    flush()
+
+            flush()
+
+        finally:
+            records.close()
+            if writer is not None:
+                writer.close()
+
+    def export(
+        self,
+        lower: Optional[int] = None,
+        upper: Optional[int] = None,
+        kinds: Iterable[str] = ('delta', 'action')
+    ) -> ExportStats:
+        '''Export docs in ``[lower, upper]`` (``@global.block_num`` for
+        deltas, ``@raw.block`` for actions) of each of ``kinds``.
+        '''
+        stats = ExportStats()
+
+        self.driver.catalog.invalidate()
+        tasks = [
+            (kind, index, slice_id)
+            for kind in kinds
+            for index in self.driver.catalog.indices(
+                kind, version=self.driver.index_version)
+            if index.docs > 0
+            for slice_id in range(self.slices)
+        ]
+
+        self.logger.info(
+            f'exporting {len(tasks)} slices of {self.slices} per index '
+            f'to {self.output} as {self.fmt}')
+
+        with report_progress(
+            stats, self.logger, self.progress_interval, 'export'
+        ), ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(
+                    self._export_slice,
+                    stats, kind, index, slice_id, lower, upper)
+                for kind, index, slice_id in tasks
+            ]
+            try:
+                for future in futures:
+                    future.result()
+
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        self.logger.info(f'export done, {stats.summary()}')
+
+        return stats
+
+
+class LoadStats(ExportStats):
+    '''Docs sent by a load, ``errors`` counts the ones elasticsearch
+    rejected.
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.errors = 0
+
+    def add_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def summary(self) -> str:
+        return f'{super().summary()}, errors: {self.errors:,}'
+
+
+class ColumnarLoader:
+    '''Bulk indexes dumps written by ``ColumnarExporter`` back into
+    elasticsearch.
+
+    Files are read in record batches of ``batch_rows`` and every doc is
+    rebuilt from its exported ``_source``, never from the typed columns,
+    and written to ``<chain>-<kind>-<version>-<suffix>`` with the suffix
+    of the partition it was exported in, the index it came from. Docs are handed through a queue of ``queue_size``
+    to ``workers`` threads each running a streaming bulk, so reading stalls
+    while indexing lags behind and rejected (429) chunks are retried with
+    backoff.
+
+    Refresh and replicas are disabled on the target indices during the
+    load and their previous settings restored afterwards.
+    '''
+
+    # docs per bulk request
+    chunk_size = 1000
+
+    # retries of rejected bulk chunks, backoff doubles from initial_backoff
+    max_retries = 8
+    initial_backoff = 2
+
+    # seconds between progress log lines
+    progress_interval = 10.0
+
+    # rejected docs logged in full, the rest are only counted
+    logged_errors = 10
+
+    def __init__(
+        self,
+        driver: ElasticDriver,
+        input: Path,
+        fmt: str = 'parquet',
+        workers: int = 4,
+        batch_rows: int = 10_000,
+        queue_size: Optional[int] = None,
+        logger=None
+    ):
+        if fmt not in FILE_EXTENSIONS:
+            raise ValueError(f'unknown export format {fmt}')
+
+        self.pa = load_pyarrow()
+        self.driver = driver
+        self.elastic = driver.elastic
+        self.input = Path(input)
+        self.fmt = fmt
+        self.workers = workers
+        self.batch_rows = batch_rows
+        self.queue_size = queue_size or workers * self.chunk_size * 2
+
+        if not logger:
+            logger = logging.getLogger()
+
+        self.logger = logger
+
+    def _dataset(self, kind: str):
+        path = self.input / kind
+        if not path.is_dir():
+            return None
+
+        return self.pa.dataset.dataset(
+            path,
+            format='parquet' if self.fmt == 'parquet' else 'ipc',
+            partitioning='hive'
+        )
+
+    def _index_name(self, kind: str, suffix: int) -> str:
+        return (
+            f'{self.driver.chain_name}-{kind}-'
+            f'{self.driver.index_version}-{str(suffix).zfill(8)}'
+        )
+
+    def _target_indices(self, datasets: dict) -> list[str]:
+        '''Indices the load writes to, only reads the partition column.'''
+        pc = self.pa.compute
+        indices = set()
+        for kind, dataset in datasets.items():
+            for batch in dataset.to_batches(columns=[PARTITION_COLUMN]):
+                suffixes = pc.unique(batch.column(0))
+                indices.update(
+                    self._index_name(kind, suffix)
+                    for suffix in suffixes.to_pylist())
+
+        return sorted(indices)
+
+    def _prepare_indices(self, indices: list[str]) -> dict:
+        '''Create missing ``indices``, index templates still apply, and
+        disable their refresh and replicas. Returns the previous settings.
+        '''
+        for index in indices:
+            if not self.elastic.indices.exists(index=index):
+                self.elastic.indices.create(index=index)
+
+        current = self.elastic.indices.get_settings(
+            index=','.join(indices), flat_settings=True)
+
+        previous = {}
+        for index in indices:
+            settings = current.get(index, {}).get('settings', {})
+            previous[index] = {
+                # unset refresh_interval means the default, null restores it
+                'index.refresh_interval': settings.get('index.refresh_interval'),
+                'index.number_of_replicas': settings.get('index.number_of_replicas')
+            }
+
+        self.elastic.indices.put_settings(
+            index=','.join(indices),
+            settings={
+                'index.refresh_interval': '-1',
+                'index.number_of_replicas': 0
+            }
+        )
+
+        return previous
+
+    def _restore_indices(self, previous: dict):
+        for index, settings in previous.items():
+            self.elastic.indices.put_settings(index=index, settings=settings)
+
+        self.elastic.indices.refresh(index=','.join(previous))
+
+    def _iter_docs(self, kind: str, dataset) -> Iterator[tuple[str, dict]]:
+        for batch in dataset.to_batches(
+            columns=[PARTITION_COLUMN, SOURCE_COLUMN],
+            batch_size=self.batch_rows
+        ):
+            for suffix, source in zip(*(array.to_pylist() for array in batch.columns)):
+                yield self._index_name(kind, suffix), json.loads(source)
+
+    def load(self, kinds: Iterable[str] = ('delta', 'action')) -> LoadStats:
+        stats = LoadStats()
+
+        datasets = {
+            kind: dataset for kind in kinds
+            if (dataset := self._dataset(kind)) is not None
+        }
+        for kind, dataset in datasets.items():
+            if SOURCE_COLUMN not in dataset.schema.names:
+                raise ValueError(
+                    f'{self.input / kind} has no {SOURCE_COLUMN} column, dumps '
+                    f'without the full _source can not be loaded losslessly')
+
+            if PARTITION_COLUMN not in dataset.schema.names:
+                raise ValueError(
+                    f'{self.input / kind} is not partitioned by '
+                    f'{PARTITION_COLUMN}, the source indices are unknown')
+        indices = self._target_indices(datasets)
+        if not indices:
+            self.logger.info(f'nothing to load from {self.input}')
+            return stats
+
+        self.logger.info(
+            f'loading {", ".join(datasets)} from {self.input} into '
+            f'{len(indices)} indices with {self.workers} bulk workers')
+
+        actions = queue.Queue(maxsize=self.queue_size)
+        failed = threading.Event()
+        failures = []
+
+        def put(item):
+            while not failed.is_set():
+                try:
+                    actions.put(item, timeout=0.1)
+                    return
+
+                except queue.Full:
+                    ...
+
+            raise failures[0]
+
+        def drain():
+            while True:
+                try:
+                    action = actions.get(timeout=0.1)
+
+                except queue.Empty:
+                    # another worker failed, the producer stopped feeding us
+                    if failed.is_set():
+                        return
+
+                    continue
+
+                if action is None:
+                    return
+
+                yield action
+
+        def bulk_worker():
+            try:
+                for ok, item in helpers.streaming_bulk(
+                    self.elastic, drain(),
+                    chunk_size=self.chunk_size,
+                    max_retries=self.max_retries,
+                    initial_backoff=self.initial_backoff,
+                    raise_on_error=False,
+                    yield_ok=False
+                ):
+                    stats.add_error()
+                    if stats.errors <= self.logged_errors:
+                        self.logger.error(f'rejected doc: {item}')
+
+            except BaseException as error:
+                failures.append(error)
+                failed.set()
+
+        previous = self._prepare_indices(indices)
+        try:
+            with report_progress(
+                stats, self.logger, self.progress_interval, 'load'
+            ):
+                workers = [
+                    threading.Thread(
+                        target=bulk_worker, name=f'bulk-{i}', daemon=True)
+                    for i in range(self.workers)
+                ]
+                for worker in workers:
+                    worker.start()
+
+                try:
+                    for kind, dataset in datasets.items():
+                        for index, doc in self._iter_docs(kind, dataset):
+                            put({'_index': index, '_source': doc})
+                            stats.add_rows(kind, 1)
+
+                finally:
+                    # one sentinel per worker, if one failed the rest stop
+                    # on their own
+                    try:
+                        for _ in workers:
+                            put(None)
+
+                    except BaseException:
+                        ...
+
+                    for worker in workers:
+                        worker.join()
+
+            if failures:
+                raise failures[0]
+
+        finally:
+            self._restore_indices(previous)
+            self.driver.catalog.invalidate()
+
+        self.logger.info(f'load done, {stats.summary()}')
+
+        return stats
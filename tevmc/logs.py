@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+
+import re
+import os
+import sys
+import time
+import queue
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+
+from pathlib import Path
+from collections import deque
+from typing import Callable, Iterator
+
+from docker.errors import DockerException
+
+from .utils import docker_stream_logs, split_docker_timestamp
+
+
+class _Inotify:
+    '''Minimal ctypes wrapper around linux inotify, watches a directory and
+    reports if any event touched a given file name.
+    '''
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (
+        IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM |
+        IN_MOVED_TO | IN_CREATE | IN_DELETE
+    )
+
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        wd = libc.inotify_add_watch(
+            self.fd, str(directory).encode(), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch failed on {directory}')
+
+    def wait(self, name: str, timeout: float) -> bool:
+        '''Block up to ``timeout`` seconds, return True if an event for
+        ``name`` was received.
+        '''
+        target = name.encode()
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+
+            try:
+                data = os.read(self.fd, 64 * 1024)
+
+            except BlockingIOError:
+                continue
+
+            pos = 0
+            while pos < len(data):
+                _, _, _, length = self.EVENT_HEADER.unpack_from(data, pos)
+                pos += self.EVENT_HEADER.size
+                if data[pos:pos + length].rstrip(b'\0') == target:
+                    return True
+                pos += length
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LogFollower:
+    '''In process replacement for ``tail -n N -f`` over a log file.
+
+    Remembers the byte offset where the last ``follow`` call stopped, so
+    consecutive waits on the same file only read what was appended since,
+    unless that is further back than the requested amount of lines.
+
+    Detects truncation (file shrank below our offset) and rotation (path
+    now points to a different inode), in the later case the old file is
+    drained before switching over.
+
+    Blocks on inotify where available and falls back to polling.
+    '''
+
+    def __init__(
+        self,
+        path: Path,
+        poll_interval: float = 1.0,
+        block_size: int = 64 * 1024,
+        logger=None
+    ):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.block_size = block_size
+
+        if logger is None:
+            logger = logging.getLogger()
+        self.logger = logger
+
+        self._file = None
+        self._inode = None
+        self._offset = None
+
+        self._inotify = None
+        if 'linux' in sys.platform:
+            try:
+                self._inotify = _Inotify(self.path.parent)
+
+            except OSError as e:
+                self.logger.warning(
+                    f'inotify unavailable for {self.path}, polling: {e}')
+
+    def _open(self) -> bool:
+        try:
+            self._file = open(self.path, 'rb')
+
+        except FileNotFoundError:
+            return False
+
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        return True
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+
+        self._file = None
+        self._inode = None
+
+    def _tail_offset(self, lines: int) -> int:
+        '''Seek backwards from the end of file until ``lines`` newlines are
+        found, return the offset of the first byte of the oldest line.
+        '''
+        file = self._file
+        end = os.fstat(file.fileno()).st_size
+        if lines <= 0:
+            return end
+
+        pos = end
+        found = 0
+
+        # a trailing newline terminates the last line, doesn't start one
+        if end > 0:
+            file.seek(end - 1)
+            if file.read(1) == b'\n':
+                pos -= 1
+
+        while pos > 0:
+            start = max(0, pos - self.block_size)
+            file.seek(start)
+            block = file.read(pos - start)
+
+            idx = len(block)
+            while True:
+                idx = block.rfind(b'\n', 0, idx)
+                if idx == -1:
+                    break
+
+                found += 1
+                if found == lines:
+                    return start + idx + 1
+
+            pos = start
+
+        return 0
+
+    def _rotated(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+
+        except FileNotFoundError:
+            return True
+
+        return stat.st_ino != self._inode
+
+    def _read_available(self) -> Iterator[str]:
+        file = self._file
+        if os.fstat(file.fileno()).st_size < self._offset:
+            self.logger.info(f'{self.path} truncated, reading from start')
+            self._offset = 0
+
+        while True:
+            file.seek(self._offset)
+            amount = self.block_size
+            while True:
+                data = file.read(amount)
+                end = data.rfind(b'\n') + 1
+                if end or len(data) < amount:
+                    break
+
+                # line longer than block, retry with a bigger read
+                file.seek(self._offset)
+                amount *= 2
+
+            if not end:
+                # nothing new or only an incomplete trailing line
+                return
+
+            # offset advances per line so a consumer that stops iterating
+            # mid block resumes at the next unseen line on the next call
+            for line in data[:end].split(b'\n')[:-1]:
+                self._offset += len(line) + 1
+                yield line.decode('utf-8', errors='replace') + '\n'
+
+    def _wait(self, timeout: float):
+        if self._inotify:
+            self._inotify.wait(self.path.name, timeout)
+
+        else:
+            time.sleep(timeout)
+
+    def follow(
+        self,
+        lines: int | None = 100,
+        timeout: float = 60
+    ) -> Iterator[str]:
+        '''Yield lines from the log, starting from either where the last
+        call left off or the last ``lines`` lines, whichever is newer.
+        Passing ``lines=None`` resumes strictly from the last offset.
+
+        Raises:
+            TimeoutError: after ``timeout`` seconds, if the consumer didn't
+                stop iterating before.
+        '''
+        deadline = time.monotonic() + timeout
+
+        while self._file is None and not self._open():
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f'{self.path} not found')
+
+            self._wait(min(self.poll_interval, deadline - time.monotonic()))
+
+        if self._offset is None or lines is not None:
+            tail_offset = self._tail_offset(lines or 0)
+            if self._offset is None or self._offset < tail_offset:
+                self._offset = tail_offset
+
+        while True:
+            if self._file is not None:
+                yield from self._read_available()
+
+                if self._rotated():
+                    # drain whatever was written to the old file then move over
+                    yield from self._read_available()
+                    self.logger.info(f'{self.path} rotated, reopening')
+                    self._close_file()
+
+            if self._file is None and self._open():
+                self._offset = 0
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f'stopped following {self.path} after {timeout}s')
+
+            self._wait(min(self.poll_interval, remaining))
+
+    def close(self):
+        self._close_file()
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+
+class LogStreamClosed(Exception):
+    ...
+
+
+_CLOSED = object()
+
+
+class LogSubscription:
+    '''Receiving end of a ``LogHub``, only lines accepted by ``matcher`` are
+    queued.  The queue is bounded, on overflow the oldest line is dropped
+    and counted in ``dropped``.
+    '''
+
+    def __init__(
+        self,
+        hub: 'LogHub',
+        matcher: Callable[[str], bool],
+        maxsize: int,
+        echo: bool
+    ):
+        self.hub = hub
+        self.matcher = matcher
+        self.echo = echo
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def _push(self, line):
+        while True:
+            try:
+                self._queue.put_nowait(line)
+                return
+
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+
+                except queue.Empty:
+                    ...
+
+    def get(self, timeout: float | None = None) -> str:
+        '''Pop next matching line.
+
+        Raises:
+            TimeoutError: no line arrived within ``timeout`` seconds.
+            LogStreamClosed: the hub's source ended.
+        '''
+        try:
+            line = self._queue.get(timeout=timeout)
+
+        except queue.Empty:
+            raise TimeoutError(
+                f'no matching {self.hub.name} log line in {timeout}s')
+
+        if line is _CLOSED:
+            # leave the marker for other getters
+            self._push(_CLOSED)
+            raise LogStreamClosed(f'{self.hub.name} log stream closed')
+
+        return line
+
+    def lines(self, timeout: float | None = None) -> Iterator[str]:
+        '''Yield matching lines, ``timeout`` is the max time between lines.'''
+        while True:
+            yield self.get(timeout=timeout)
+
+    def wait(self, timeout: float | None = None) -> str:
+        '''Return the first matching line, ``timeout`` is the total time.'''
+        return self.get(timeout=timeout)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class LogHub:
+    '''Single reader thread per log source which splits lines once and fans
+    them out to any number of subscribers.
+
+    Keeps the last ``history`` lines around so new subscribers can replay
+    recent output, this is how ``tail -n N`` semantics are kept, and why
+    waiters that subscribe right after a container starts don't miss its
+    first lines.
+    '''
+
+    def __init__(
+        self,
+        name: str,
+        source: Callable[[threading.Event], Iterator[str]],
+        source_id: str | None = None,
+        history: int = 1000,
+        logger=None
+    ):
+        self.name = name
+        self.source = source
+        self.source_id = source_id
+
+        if logger is None:
+            logger = logging.getLogger()
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._subs: list[LogSubscription] = []
+        self._history = deque(maxlen=history)
+        self._closed = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f'log-hub-{name}', daemon=True)
+
+    @staticmethod
+    def for_file(
+        name: str,
+        follower: LogFollower,
+        exclude: re.Pattern | None = None,
+        **kwargs
+    ) -> 'LogHub':
+        def source(stop: threading.Event):
+            lines = kwargs.get('history', 1000)
+            while not stop.is_set():
+                try:
+                    for line in follower.follow(lines=lines, timeout=1.0):
+                        if exclude and exclude.search(line):
+                            continue
+                        yield line
+                        if stop.is_set():
+                            return
+
+                except TimeoutError:
+                    ...
+
+                lines = None
+
+        return LogHub(name, source, source_id=str(follower.path), **kwargs)
+
+    @staticmethod
+    def for_container(name: str, container, **kwargs) -> 'LogHub':
+        logger = kwargs.get('logger') or logging.getLogger()
+
+        def source(stop: threading.Event):
+            # timestamp of the last line seen and the lines seen with it,
+            # docker's ``since`` is inclusive so those come back on re-attach
+            since = None
+            seen_at_since: set[str] = set()
+            while not stop.is_set():
+                try:
+                    for stamped in docker_stream_logs(
+                        container, lines=0, since=since, timestamps=True
+                    ):
+                        stamp, line = split_docker_timestamp(stamped)
+                        if stamp is not None:
+                            if since is not None and stamp < since:
+                                continue
+
+                            if stamp == since:
+                                if line in seen_at_since:
+                                    continue
+
+                            else:
+                                since = stamp
+                                seen_at_since = set()
+
+                            seen_at_since.add(line)
+
+                        yield line
+                        if stop.is_set():
+                            return
+
+                except DockerException:
+                    # container stopped or removed
+                    return
+
+                except Exception as e:
+                    # read timeout or dropped connection, re-attach from the
+                    # last line seen so nothing logged meanwhile is lost
+                    logger.warning(
+                        f'{name} log stream dropped ({e}), re-attaching...')
+
+        return LogHub(name, source, source_id=container.id, **kwargs)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+        # the reader may still be blocked on its source, wake waiters now
+        self._close_subscribers()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and not self._stop.is_set()
+
+    def subscribe(
+        self,
+        pattern: str | re.Pattern | None = None,
+        predicate: Callable[[str], bool] | None = None,
+        replay: int | None = 0,
+        maxsize: int = 1024,
+        echo: bool = False
+    ) -> LogSubscription:
+        '''Register a new subscriber.
+
+        Args:
+            pattern: regex searched on each line.
+            predicate: callable receiving each line, used if no pattern.
+            replay: amount of history lines to replay, None means all.
+            maxsize: queue bound for this subscriber.
+            echo: log every line from the source while subscribed.
+        '''
+        if pattern is not None:
+            if isinstance(pattern, str):
+                pattern = re.compile(pattern)
+            matcher = lambda line: pattern.search(line) is not None
+
+        elif predicate is not None:
+            matcher = predicate
+
+        else:
+            matcher = lambda line: True
+
+        sub = LogSubscription(self, matcher, maxsize, echo)
+        with self._lock:
+            backlog = list(self._history)
+            if replay is not None:
+                backlog = backlog[-replay:] if replay > 0 else []
+
+            for line in backlog:
+                if matcher(line):
+                    sub._push(line)
+
+            if self._closed:
+                sub._push(_CLOSED)
+
+            self._subs = self._subs + [sub]
+
+        return sub
+
+    def last_match(self, pattern: str | re.Pattern) -> str | None:
+        '''Most recent history line matching ``pattern``, if any.'''
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+
+        with self._lock:
+            backlog = list(self._history)
+
+        for line in reversed(backlog):
+            if pattern.search(line):
+                return line
+
+        return None
+
+    def unsubscribe(self, sub: LogSubscription):
+        with self._lock:
+            self._subs = [s for s in self._subs if s is not sub]
+
+    def _dispatch(self, line: str):
+        with self._lock:
+            self._history.append(line)
+            subs = self._subs
+
+        echo = False
+        for sub in subs:
+            echo = echo or sub.echo
+            if sub.matcher(line):
+                sub._push(line)
+
+        if echo:
+            self.logger.info(line.rstrip())
+
+    def _run(self):
+        try:
+            for line in self.source(self._stop):
+                if self._stop.is_set():
+                    break
+
+                self._dispatch(line)
+
+        except Exception as e:
+            self.logger.warning(f'{self.name} log hub reader error: {e}')
+
+        finally:
+            self._close_subscribers()
+
+    def _close_subscribers(self):
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            subs = self._subs
+
+        for sub in subs:
+            sub._push(_CLOSED)
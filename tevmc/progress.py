@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import re
+import time
+
+from typing import NamedTuple
+from collections import deque
+
+
+# translator logs pushed blocks as `...: [native|evm] pushed, at <timestamp>`
+# with thousands separators on the block numbers, see format_block_numbers
+TRANSLATOR_PROGRESS_PATTERN = re.compile(
+    r': \[(?P<block_num>[\d,]+|NaN)\|(?P<evm_block_num>[\d,]+|NaN)\] '
+    r'pushed, at (?P<timestamp>.*?)\s*$'
+)
+
+
+class TranslatorProgress(NamedTuple):
+    block_num: int
+    evm_block_num: int | None
+    timestamp: str
+    seen_at: float
+
+
+def parse_translator_progress(
+    line: str,
+    seen_at: float | None = None
+) -> TranslatorProgress | None:
+    '''Parse a translator "pushed" line, returns None for any other line or
+    if the native block number is not known yet (NaN).
+    '''
+    match = TRANSLATOR_PROGRESS_PATTERN.search(line)
+    if not match:
+        return None
+
+    block_num = match['block_num']
+    if block_num == 'NaN':
+        return None
+
+    evm_block_num = match['evm_block_num']
+    evm_block_num = (
+        None if evm_block_num == 'NaN'
+        else int(evm_block_num.replace(',', ''))
+    )
+
+    return TranslatorProgress(
+        int(block_num.replace(',', '')),
+        evm_block_num,
+        match['timestamp'],
+        time.monotonic() if seen_at is None else seen_at
+    )
+
+
+class SyncProgressTracker:
+    '''Rolling sync metrics over translator progress events.
+
+    Args:
+        window: seconds of history used to compute the block rate.
+        stall_timeout: seconds without a new block before ``stalled`` is set.
+    '''
+
+    def __init__(self, window: float = 60.0, stall_timeout: float = 120.0):
+        self.window = window
+        self.stall_timeout = stall_timeout
+        self.last: TranslatorProgress | None = None
+        self._samples: deque[tuple[float, int]] = deque()
+        self._last_advance: float = time.monotonic()
+
+    def update(self, progress: TranslatorProgress):
+        if self.last is None or progress.block_num > self.last.block_num:
+            self._last_advance = progress.seen_at
+
+        self.last = progress
+        self._samples.append((progress.seen_at, progress.block_num))
+
+        horizon = progress.seen_at - self.window
+        while len(self._samples) > 2 and self._samples[0][0] < horizon:
+            self._samples.popleft()
+
+    @property
+    def rate(self) -> float:
+        '''Blocks per second over the rolling window.'''
+        if len(self._samples) < 2:
+            return 0.0
+
+        (t0, b0), (t1, b1) = self._samples[0], self._samples[-1]
+        if t1 <= t0:
+            return 0.0
+
+        return max(0.0, (b1 - b0) / (t1 - t0))
+
+    def eta(self, remote_head: int) -> float | None:
+        '''Seconds until ``remote_head`` is reached at the current rate.'''
+        if self.last is None:
+            return None
+
+        remaining = remote_head - self.last.block_num
+        if remaining <= 0:
+            return 0.0
+
+        rate = self.rate
+        if rate <= 0:
+            return None
+
+        return remaining / rate
+
+    def stalled_for(self, now: float | None = None) -> float:
+        '''Seconds since the last new block.'''
+        if now is None:
+            now = time.monotonic()
+
+        return now - self._last_advance
+
+    def stalled(self, now: float | None = None) -> bool:
+        return self.stalled_for(now) > self.stall_timeout
+
+    def summary(self, remote_head: int) -> str:
+        if self.last is None:
+            return 'no progress reported yet'
+
+        eta = self.eta(remote_head)
+        if eta is None:
+            eta_str = 'unknown'
+
+        else:
+            hours, rem = divmod(int(eta), 3600)
+            minutes, seconds = divmod(rem, 60)
+            eta_str = f'{hours}h{minutes:02d}m{seconds:02d}s'
+
+        return (
+            f'block: {self.last.block_num}, '
+            f'evm block: {self.last.evm_block_num}, '
+            f'delta: {remote_head - self.last.block_num}, '
+            f'rate: {self.rate:.2f} blocks/s, eta: {eta_str}'
+        )
@@ -5,7 +5,6 @@ import time
 from flask import request, jsonify
 
 from tevmc.cmdline.build import build_service
-from tevmc.testing.database import ElasticDataIntegrityError, ElasticDriver
 
 
 def add_routes(tevmc: 'TEVMController'):
@@ -52,6 +51,18 @@ def add_routes(tevmc: 'TEVMController'):
         return jsonify(success=True), 200
 
 
+    @app.route('/reload', methods=['POST'])
+    def reload():
+        if not tevmc.start_reload():
+            return jsonify(error='reload already in progress'), 409
+
+        return jsonify(tevmc.reload_status), 202
+
+    @app.route('/reload', methods=['GET'])
+    def reload_status():
+        return jsonify(tevmc.reload_status)
+
+
     @app.route('/patch', methods=['POST'])
     def patch():
         pf_path = request.json.get('path', None)
@@ -80,11 +91,55 @@ def add_routes(tevmc: 'TEVMController'):
 
     @app.route('/check', methods=['GET'])
     def check():
+        full = request.args.get('full', 'false').lower() in ('1', 'true')
+        hashes = request.args.get('hashes', 'false').lower() in ('1', 'true')
+
+        # full and hash chain checks take too long for a request
+        if full or hashes:
+            if not tevmc.start_integrity_check(full=full, hashes=hashes):
+                return jsonify(error='integrity check already in progress'), 409
+
+            return jsonify(tevmc.check_status), 202
+
         try:
-            ElasticDriver(tevmc.config).full_integrity_check()
-            status = 'healthy'
+            status = tevmc.check_integrity()
 
-        except ElasticDataIntegrityError as e:
-            status = f'unhealthy: {e}'
+        except ImportError as e:
+            return jsonify(error=str(e)), 501
+
+        if status is None:
+            return jsonify(error='integrity check already in progress'), 409
 
         return jsonify({'status': status})
+
+    @app.route('/check/status', methods=['GET'])
+    def check_status():
+        return jsonify(tevmc.check_status)
+
+    @app.route('/coverage', methods=['GET'])
+    def coverage():
+        blocks = tevmc.elastic_driver.cached_coverage()
+        if blocks is None:
+            return jsonify(error='coverage map not built yet'), 503
+
+        if blocks.lower is None:
+            return jsonify(error='no blocks indexed'), 404
+
+        lower = request.args.get('lower', blocks.lower, type=int)
+        upper = request.args.get('upper', blocks.upper, type=int)
+        limit = request.args.get('limit', 100, type=int)
+
+        missing = blocks.missing(lower, upper)
+        return jsonify({
+            'lower': lower,
+            'upper': upper,
+            'indexed': blocks.count(lower, upper),
+            'coverage': blocks.percent(lower, upper),
+            'missing_ranges': len(missing),
+            'missing': missing[:limit]
+        })
+
+    @app.route('/coverage', methods=['POST'])
+    def refresh_coverage():
+        tevmc.request_coverage_refresh()
+        return jsonify(success=True), 202
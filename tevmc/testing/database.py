@@ -1,14 +1,32 @@
+import os
 import time
 import json
-import math
+import zlib
 import locale
+import queue
+import struct
 import logging
-from typing import List, Optional
+import threading
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
 from elasticsearch import Elasticsearch, NotFoundError
 
 import traceback
 
+try:
+    import numpy as np
+
+except ImportError:
+    # only needed by verify_hash_chain
+    np = None
+
 
 locale.setlocale(locale.LC_ALL, 'en_US.UTF-8')
 
@@ -22,11 +40,40 @@ def get_suffix(block_num, docs_per_index):
     return str(block_num // docs_per_index).zfill(8)
 
 
+def nest_source(source: dict) -> dict:
+    '''Expand literally dotted keys of a ``_source`` into nested objects,
+    ``{'@raw.hash': h}`` becomes ``{'@raw': {'hash': h}}``.
+    '''
+    if not any('.' in key for key in source):
+        return source
+
+    nested = {}
+    for key, value in source.items():
+        node = nested
+        *parents, leaf = key.split('.')
+        for parent in parents:
+            node = node.setdefault(parent, {})
+
+        if isinstance(value, dict) and isinstance(node.get(leaf), dict):
+            node[leaf].update(nest_source(value))
+
+        else:
+            node[leaf] = nest_source(value) if isinstance(value, dict) else value
+
+    return nested
+
+
 class StorageEosioDelta:
+    __slots__ = (
+        'timestamp', 'block_num', 'global_block_num', 'block_hash',
+        'evm_block_hash', 'evm_prev_block_hash', 'receipts_root_hash',
+        'transactions_root', 'gas_used', 'gas_limit', 'size', 'code', 'table'
+    )
+
     def __init__(self, obj: dict):
         self.timestamp = obj.get('@timestamp')
         self.block_num = obj.get('block_num')
-        self.global_block_num = obj.get('@global', {}).get('block_num')
+        self.global_block_num = (obj.get('@global') or {}).get('block_num')
         self.block_hash = obj.get('@blockHash')
         self.evm_block_hash = obj.get('@evmBlockHash')
         self.evm_prev_block_hash = obj.get('@evmPrevBlockHash')
@@ -38,11 +85,24 @@ class StorageEosioDelta:
         self.code = obj.get('code')
         self.table = obj.get('table')
 
+    @classmethod
+    def from_source(cls, source: dict) -> 'StorageEosioDelta':
+        '''Build from a search hit ``_source``, which may only hold some of
+        the fields and may have them indexed with dotted keys.
+        '''
+        return cls(nest_source(source))
+
     def block_nums_to_string(self):
         return format_block_numbers(self.block_num, self.global_block_num)
 
 
 class InternalEvmTransaction:
+    __slots__ = (
+        'call_type', 'from_address', 'gas', 'input', 'input_trimmed', 'to',
+        'value', 'gas_used', 'output', 'subtraces', 'trace_address', 'type',
+        'depth', 'extra'
+    )
+
     def __init__(self, obj: dict):
         self.call_type = obj.get('callType')
         self.from_address = obj.get('from')
@@ -61,6 +121,15 @@ class InternalEvmTransaction:
 
 
 class StorageEvmTransaction:
+    __slots__ = (
+        'hash', 'from_address', 'trx_index', 'block', 'block_hash', 'to',
+        'input_data', 'input_trimmed', 'value', 'nonce', 'gas_price',
+        'gas_limit', 'status', 'epoch', 'createdaddr', 'gasused',
+        'gasusedblock', 'charged_gas_price', 'output', 'logs', 'logs_bloom',
+        'errors', 'value_d', 'raw', 'v', 'r', 's',
+        '_itxs', '_itxs_source'
+    )
+
     def __init__(self, obj: dict):
         self.hash = obj.get('hash')
         self.from_address = obj.get('from')
@@ -75,13 +144,16 @@ class StorageEvmTransaction:
         self.gas_price = obj.get('gas_price')
         self.gas_limit = obj.get('gas_limit')
         self.status = obj.get('status')
-        self.itxs = [InternalEvmTransaction(tx) for tx in obj.get('itxs', [])]
+        # built on first access, most readers never look at them
+        self._itxs = None
+        self._itxs_source = obj.get('itxs')
         self.epoch = obj.get('epoch')
         self.createdaddr = obj.get('createdaddr')
         self.gasused = obj.get('gasused')
         self.gasusedblock = obj.get('gasusedblock')
         self.charged_gas_price = obj.get('charged_gas_price')
         self.output = obj.get('output')
+        # kept as the raw log dicts, nothing is decoded from them
         self.logs = obj.get('logs')
         self.logs_bloom = obj.get('logsBloom')
         self.errors = obj.get('errors')
@@ -91,13 +163,92 @@ class StorageEvmTransaction:
         self.r = obj.get('r')
         self.s = obj.get('s')
 
+    @property
+    def itxs(self) -> List['InternalEvmTransaction']:
+        if self._itxs is None:
+            self._itxs = [
+                InternalEvmTransaction(tx) for tx in self._itxs_source or []]
+            self._itxs_source = None
+
+        return self._itxs
+
+
 class StorageEosioAction:
+    __slots__ = ('timestamp', 'trx_id', 'action_ordinal', 'signatures', 'raw')
+
     def __init__(self, obj: dict):
         self.timestamp = obj.get('@timestamp')
         self.trx_id = obj.get('trx_id')
         self.action_ordinal = obj.get('action_ordinal')
         self.signatures = obj.get('signatures')
-        self.raw = StorageEvmTransaction(obj.get('@raw'))
+        raw = obj.get('@raw')
+        self.raw = StorageEvmTransaction(raw) if raw is not None else None
+
+    @classmethod
+    def from_source(cls, source: dict) -> 'StorageEosioAction':
+        '''See ``StorageEosioDelta.from_source``, ``raw`` is None if the
+        ``_source`` has no ``@raw`` fields.
+        '''
+        return cls(nest_source(source))
+
+
+# _source fields read by StorageEosioDelta and StorageEosioAction, lookups
+# only fetch these
+DELTA_SOURCE_FIELDS = [
+    '@timestamp', 'block_num', '@global.block_num', '@blockHash',
+    '@evmBlockHash', '@evmPrevBlockHash', '@receiptsRootHash',
+    '@transactionsRoot', 'gasUsed', 'gasLimit', 'size', 'code', 'table'
+]
+
+ACTION_SOURCE_FIELDS = [
+    '@timestamp', 'trx_id', 'action_ordinal', 'signatures', '@raw'
+]
+
+
+def source_field(source: dict, path: str):
+    '''Value at dotted ``path`` in a ``_source``, whether it was indexed
+    with nested objects or with literally dotted keys.
+    '''
+    if path in source:
+        return source[path]
+
+    head, _, rest = path.partition('.')
+    value = source.get(head, None)
+    if not rest or not isinstance(value, dict):
+        return value if not rest else None
+
+    return source_field(value, rest)
+
+
+class LookupCache:
+    '''Thread safe LRU cache holding up to ``maxsize`` lookup results.'''
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key, None)
+            if value is not None:
+                self._entries.move_to_end(key)
+
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 def index_to_suffix_num(index: str) -> int:
@@ -106,6 +257,15 @@ def index_to_suffix_num(index: str) -> int:
     return int(suffix)
 
 
+class BrokenLink(NamedTuple):
+    global_block_num: int
+    block_num: int
+    # @evmPrevBlockHash of the block and @evmBlockHash of the one before,
+    # None if missing
+    prev_hash: Optional[str]
+    parent_hash: Optional[str]
+
+
 class ElasticDataEmptyError(BaseException):
     ...
 
@@ -131,20 +291,431 @@ class ESGapFound(ElasticDataIntegrityError):
     def __init__(
         self,
         message: str,
-        start: int
+        start: int,
+        gaps: Optional[List[Tuple[int, int]]] = None
     ):
         super().__init__(message)
         self.start = start
+        self.gaps = gaps or []
+
+
+
+class BlockCoverage:
+    '''Set of block numbers kept as sorted, disjoint runs ``[start, end]``,
+    the same run length encoding roaring bitmaps use for dense ranges.
+    Indexed blocks are almost always contiguous, so millions of them fit in
+    a handful of runs and lookups are a bisect away.
+    '''
+
+    MAGIC = b'TEVMCOV1'
+    HEADER = struct.Struct('<8sQ')
+
+    def __init__(self, runs: Iterator[Tuple[int, int]] = ()):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        # blocks in all runs before each one, built on demand
+        self._prefix: Optional[List[int]] = None
+
+        for start, end in runs:
+            self.add_range(start, end)
+
+    def __len__(self) -> int:
+        prefix = self._get_prefix()
+        return prefix[-1] if prefix else 0
+
+    def __contains__(self, num: int) -> bool:
+        i = bisect_right(self._starts, num) - 1
+        return i >= 0 and num <= self._ends[i]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BlockCoverage) and self.runs == other.runs
+
+    @property
+    def runs(self) -> List[Tuple[int, int]]:
+        return list(zip(self._starts, self._ends))
+
+    @property
+    def lower(self) -> Optional[int]:
+        return self._starts[0] if self._starts else None
+
+    @property
+    def upper(self) -> Optional[int]:
+        return self._ends[-1] if self._ends else None
+
+    def _get_prefix(self) -> List[int]:
+        if self._prefix is None:
+            self._prefix = list(accumulate(
+                (end - start + 1 for start, end in zip(self._starts, self._ends)),
+                initial=0
+            ))
+
+        return self._prefix
+
+    def add(self, num: int):
+        # fast path for blocks streamed in order
+        if self._ends and num == self._ends[-1] + 1:
+            self._ends[-1] = num
+            self._prefix = None
+            return
+
+        self.add_range(num, num)
+
+    def add_range(self, start: int, end: int):
+        if start > end:
+            return
+
+        self._prefix = None
+        if not self._ends or start > self._ends[-1] + 1:
+            self._starts.append(start)
+            self._ends.append(end)
+            return
+
+        # first and last runs touching or adjacent to [start, end]
+        lo = bisect_right(self._ends, start - 2)
+        hi = bisect_right(self._starts, end + 1)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def discard_from(self, num: int):
+        '''Drop every block from ``num`` on.'''
+        i = bisect_right(self._starts, num - 1)
+        del self._starts[i:]
+        del self._ends[i:]
+        if self._ends and self._ends[-1] >= num:
+            self._ends[-1] = num - 1
+
+        self._prefix = None
+
+    def count(self, lower: int, upper: int) -> int:
+        '''Blocks in ``[lower, upper]``.'''
+        if lower > upper or not self._starts:
+            return 0
+
+        prefix = self._get_prefix()
+
+        def covered_before(num: int) -> int:
+            # blocks < num
+            i = bisect_right(self._starts, num - 1)
+            if i == 0:
+                return 0
+
+            return prefix[i] - max(0, self._ends[i - 1] - num + 1)
+
+        return covered_before(upper + 1) - covered_before(lower)
+
+    def percent(self, lower: int, upper: int) -> float:
+        if lower > upper:
+            return 0.0
+
+        return self.count(lower, upper) * 100 / (upper - lower + 1)
+
+    def missing(self, lower: int, upper: int) -> List[Tuple[int, int]]:
+        '''Every range of blocks in ``[lower, upper]`` not in the set.'''
+        gaps = []
+        cursor = lower
+        i = max(0, bisect_right(self._starts, lower) - 1)
+        while cursor <= upper and i < len(self._starts):
+            start, end = self._starts[i], self._ends[i]
+            if start > upper:
+                break
+
+            if start > cursor:
+                gaps.append((cursor, start - 1))
+
+            cursor = max(cursor, end + 1)
+            i += 1
+
+        if cursor <= upper:
+            gaps.append((cursor, upper))
+
+        return gaps
+
+    def to_bytes(self) -> bytes:
+        # runs as deltas from the previous value, small numbers compress well
+        deltas = array('Q')
+        prev = 0
+        for start, end in zip(self._starts, self._ends):
+            deltas.append(start - prev)
+            deltas.append(end - start)
+            prev = end
+
+        return (
+            self.HEADER.pack(self.MAGIC, len(self._starts)) +
+            zlib.compress(deltas.tobytes())
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BlockCoverage':
+        magic, amount = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError('not a block coverage map')
+
+        deltas = array('Q')
+        deltas.frombytes(zlib.decompress(data[cls.HEADER.size:]))
+        if len(deltas) != amount * 2:
+            raise ValueError('truncated block coverage map')
+
+        coverage = cls()
+        prev = 0
+        for i in range(0, len(deltas), 2):
+            start = prev + deltas[i]
+            prev = start + deltas[i + 1]
+            coverage._starts.append(start)
+            coverage._ends.append(prev)
+
+        return coverage
+
+    def save(self, path: Path):
+        '''Write atomically, a crash leaves the previous map in place.'''
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_bytes(self.to_bytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['BlockCoverage']:
+        try:
+            return cls.from_bytes(path.read_bytes())
+
+        except FileNotFoundError:
+            return None
+
+        except (ValueError, struct.error, zlib.error) as error:
+            logging.warning(f'ignoring unreadable coverage map {path}: {error}')
+            return None
+
+
+class IndexInfo(NamedTuple):
+    name: str
+    kind: str
+    version: str
+    suffix: int
+    docs: int
+
+
+class IndexCatalog:
+    '''Delta and action indices of a chain with their suffix number and
+    doc count, listed with a single ``cat.indices`` request and reused for
+    ``ttl`` seconds.
+    '''
+
+    def __init__(self, elastic: Elasticsearch, chain_name: str, ttl: float = 30.0):
+        self.elastic = elastic
+        self.chain_name = chain_name
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._indices: Optional[List[IndexInfo]] = None
+        self._loaded_at = 0.0
+
+    def refresh(self) -> List[IndexInfo]:
+        rows = self.elastic.cat.indices(
+            index=f'{self.chain_name}-*',
+            format='json',
+            h='index,docs.count'
+        )
+
+        indices = []
+        prefix = f'{self.chain_name}-'
+        for row in rows:
+            name = row['index']
+            # <chain>-<kind>-<version>-<suffix>
+            kind, _, rest = name[len(prefix):].partition('-')
+            version, _, suffix = rest.rpartition('-')
+            if kind not in ('delta', 'action') or not suffix.isdigit():
+                continue
+
+            indices.append(IndexInfo(
+                name, kind, version, int(suffix), int(row.get('docs.count') or 0)))
+
+        indices.sort(key=lambda index: index.suffix)
+
+        with self._lock:
+            self._indices = indices
+            self._loaded_at = time.monotonic()
+
+        return indices
+
+    def invalidate(self):
+        with self._lock:
+            self._indices = None
+
+    def indices(self, kind: str, version: Optional[str] = None) -> List[IndexInfo]:
+        '''Indices of ``kind`` ('delta' or 'action'), ordered by suffix.'''
+        with self._lock:
+            indices = self._indices
+            if time.monotonic() - self._loaded_at > self.ttl:
+                indices = None
+
+        if indices is None:
+            indices = self.refresh()
+
+        return [
+            index for index in indices
+            if index.kind == kind and (version is None or index.version == version)
+        ]
+
+
+class ESHashChainBroken(ElasticDataIntegrityError):
+
+    def __init__(
+        self,
+        message: str,
+        links: List[BrokenLink]
+    ):
+        super().__init__(message)
+        self.links = links
+
+
+ZERO_HASH = '00' * 32
+
+# index settings assigned by elastic, can't be set when creating an index
+REWIND_SKIP_SETTINGS = (
+    'index.uuid',
+    'index.creation_date',
+    'index.provided_name',
+    'index.version.',
+    'index.history.uuid',
+    'index.resize.',
+    'index.shrink.',
+    'index.routing.allocation.initial_recovery.',
+    'index.blocks.',
+    'index.verified_before_close'
+)
+
+# left off the rewound copy while it's built, applied to the swapped in index
+REWIND_DEFERRED_SETTINGS = (
+    'index.number_of_replicas',
+    'index.refresh_interval',
+    'index.lifecycle.'
+)
+
+# elastic's defaults for the deferred settings, the clone would otherwise
+# inherit the copy's values when the original didn't set them
+REWIND_DEFAULT_SETTINGS = {
+    'index.number_of_replicas': '1',
+    'index.refresh_interval': '1s'
+}
+
+
+def _hash_words(values: list) -> Tuple['np.ndarray', 'np.ndarray']:
+    '''Hex hashes as an ``(n, 4)`` uint64 array, 32 bytes per row, plus a
+    mask of the ones missing or malformed.
+    '''
+    hexes = [
+        value[2:] if value and value.startswith('0x') else value or ZERO_HASH
+        for value in values
+    ]
+    missing = np.fromiter(
+        (not value for value in values), dtype=bool, count=len(values))
+
+    joined = ''.join(hexes)
+    try:
+        if len(joined) != 64 * len(hexes):
+            raise ValueError
+
+        raw = bytes.fromhex(joined)
+
+    except ValueError:
+        # at least one malformed hash, convert one by one
+        rows = []
+        for i, value in enumerate(hexes):
+            try:
+                row = bytes.fromhex(value)
+                if len(row) != 32:
+                    raise ValueError
+
+            except ValueError:
+                row = bytes(32)
+                missing[i] = True
+
+            rows.append(row)
+
+        raw = b''.join(rows)
+
+    return np.frombuffer(raw, dtype=np.uint64).reshape(-1, 4), missing
 
 
+def _same_hash(a: Optional[str], b: Optional[str]) -> bool:
+    if not a or not b:
+        return False
+
+    return a.removeprefix('0x').lower() == b.removeprefix('0x').lower()
+
 
 class ElasticDriver:
 
-    def __init__(self, config: dict):
+    # width of the histogram buckets used by the gap scanner, a bucket with
+    # fewer distinct blocks than it spans is drilled into block by block,
+    # distinct counts are only exact up to 40000
+    gap_scan_interval = 10_000
+
+    # max buckets returned per composite aggregation request
+    composite_page_size = 10_000
+
+    # blocks before the last verified one that incremental checks re-verify
+    integrity_overlap = 1000
+
+    # threads used to verify indices concurrently
+    integrity_workers = 4
+
+    # searches per _msearch request and threads used by bulk lookups
+    msearch_chunk_size = 500
+    lookup_workers = 4
+
+    # seconds the index catalog is reused before listing indices again
+    catalog_ttl = 30.0
+
+    # fraction of an index's docs a purge has to remove before rewinding it
+    # by reindexing the rest is cheaper than deleting
+    reindex_threshold = 0.4
+
+    # docs per page, pages fetched ahead and point in time keep alive of
+    # iter_deltas / iter_actions scans
+    scan_page_size = 5000
+    scan_prefetch = 2
+    pit_keep_alive = '2m'
+
+    # rows per NumPy chunk of verify_hash_chain scans
+    hash_chain_chunk_size = 1_000_000
+
+    # blocks below the last covered one rescanned on coverage updates, in
+    # case the newest ones became searchable out of order
+    coverage_overlap = 1000
+
+    # seconds between progress polls of background tasks
+    task_poll_interval = 5.0
+
+    # verified ranges and pending purges, keyed per chain prefix and index
+    # version
+    checkpoint_index = 'tevmc-integrity'
+
+    def __init__(self, config: dict, node_dir: Optional[Path] = None):
         self.config = config
         self.chain_name = config['telos-evm-rpc']['elastic_prefix']
+        self.index_version = config['telos-evm-rpc']['elasitc_index_version']
         self.docs_per_index = 10_000_000
 
+        # coverage map is only persisted if the node directory is known
+        self.node_dir = Path(node_dir) if node_dir else None
+        self._coverage: Optional[BlockCoverage] = None
+        # only held to swap the map in, scans run outside of it
+        self._coverage_lock = threading.Lock()
+        # one scan at a time
+        self._coverage_update_lock = threading.Lock()
+        # bumped by purges, a scan that overlapped one is dropped
+        self._coverage_generation = 0
+
+        self.lookup_cache = LookupCache()
+
+        # aggregation requests issued so far, for reporting
+        self.request_count = 0
+        self._stats_lock = threading.Lock()
+
         es_config = config['elasticsearch']
         self.elastic = Elasticsearch(
             f'{es_config["protocol"]}://{es_config["host"]}',
@@ -152,32 +723,31 @@ class ElasticDriver:
                 es_config['user'], es_config['pass']
             )
         )
+        self.catalog = IndexCatalog(
+            self.elastic, self.chain_name, ttl=self.catalog_ttl)
 
     def tx_from_hash(self, h: str):
+        key = ('tx', h)
+        cached = self.lookup_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
             result = self.elastic.search(
                 index=f'{self.chain_name}-action-*',
                 size=1,
-                query={
-                    'match': {
-                        '@raw.hash': h
-                    }
-                }
+                query={'term': {'@raw.hash': h}},
+                source=ACTION_SOURCE_FIELDS
             )
+            logging.debug(f'tx_from_hash: {h}, took {result.get("took")}ms')
 
-            logging.info(f'tx_from_hash: {h}')
-            logging.info(result)
-
-            if 'hits' not in result:
+            hits = result.get('hits', {}).get('hits', [])
+            if len(hits) == 0:
                 return None
 
-            if 'hits' not in result['hits']:
-                return None
-
-            if len(result['hits']['hits']) == 0:
-                return None
-
-            return StorageEosioAction(result['hits']['hits'][0]['_source'])
+            action = StorageEosioAction.from_source(hits[0]['_source'])
+            self.lookup_cache.put(key, action)
+            return action
 
         except BaseException as error:
             logging.error(traceback.format_exc())
@@ -185,101 +755,374 @@ class ElasticDriver:
             return None
 
     def block_from_evm_num(self, num: int):
+        key = ('block', num)
+        cached = self.lookup_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # deltas live in the index of their suffix, only fall back to
+        # searching all of them if it's not there
+        routed_index = (
+            f'{self.chain_name}-delta-{self.index_version}-'
+            f'{get_suffix(num, self.docs_per_index)}'
+        )
         try:
-            result = self.elastic.search(
-                index=f'{self.chain_name}-delta-*',
-                size=1,
-                query={
-                    'match': {
-                        '@global.block_num': num
-                    }
-                }
-            )
-
-            logging.info(f'block_from_evm_num: {num}')
-            logging.info(result)
-
-            if 'hits' not in result:
-                return None
-
-            if 'hits' not in result['hits']:
-                return None
+            for index in (routed_index, f'{self.chain_name}-delta-*'):
+                result = self.elastic.search(
+                    index=index,
+                    size=1,
+                    query={'term': {'@global.block_num': num}},
+                    source=DELTA_SOURCE_FIELDS,
+                    ignore_unavailable=True
+                )
+                logging.debug(
+                    f'block_from_evm_num: {num} on {index}, '
+                    f'took {result.get("took")}ms')
 
-            if len(result['hits']['hits']) == 0:
-                return None
+                hits = result.get('hits', {}).get('hits', [])
+                if len(hits) > 0:
+                    delta = StorageEosioDelta.from_source(hits[0]['_source'])
+                    self.lookup_cache.put(key, delta)
+                    return delta
 
-            return StorageEosioDelta(result['hits']['hits'][0]['_source'])
+            return None
 
         except BaseException as error:
             logging.error(traceback.format_exc())
             logging.error(error)
             return None
 
-    def get_ordered_delta_indices(self):
-        index_pattern = f'{self.chain_name}-delta-*'
-        delta_indices = self.elastic.indices.get(index=index_pattern)
-        delta_indices = list(delta_indices.keys())
-        delta_indices.sort(key=lambda x: index_to_suffix_num(x))
+    def _msearch_first_hits(
+        self,
+        searches: List[Tuple[str, dict]],
+        source: List[str]
+    ) -> List[Optional[dict]]:
+        '''Run ``(index, query)`` searches through ``_msearch`` and return
+        the ``_source`` of the first hit of each, None for no hit.
+
+        Searches are grouped by index and sent in chunks of
+        ``msearch_chunk_size`` on ``lookup_workers`` threads.
+        '''
+        results = [None] * len(searches)
+        order = sorted(range(len(searches)), key=lambda i: searches[i][0])
+        chunks = [
+            order[i:i + self.msearch_chunk_size]
+            for i in range(0, len(order), self.msearch_chunk_size)
+        ]
+
+        def run(chunk: List[int]):
+            body = []
+            for i in chunk:
+                index, query = searches[i]
+                body.append({'index': index, 'ignore_unavailable': True})
+                body.append({'query': query, 'size': 1, '_source': source})
+
+            response = self.elastic.msearch(searches=body)
+            with self._stats_lock:
+                self.request_count += 1
+
+            for i, result in zip(chunk, response['responses']):
+                if 'error' in result:
+                    logging.warning(
+                        f'lookup on {searches[i][0]} failed: {result["error"]}')
+                    continue
+
+                hits = result.get('hits', {}).get('hits', [])
+                if len(hits) > 0:
+                    results[i] = hits[0]['_source']
 
-        return delta_indices
+        if len(chunks) == 1:
+            run(chunks[0])
 
-    def get_first_indexed_block(self):
-        indices = self.get_ordered_delta_indices()
+        elif chunks:
+            with ThreadPoolExecutor(
+                max_workers=self.lookup_workers, thread_name_prefix='lookup'
+            ) as pool:
+                list(pool.map(run, chunks))
 
-        if len(indices) == 0:
-            return None
+        return results
+
+    def txs_from_hashes(self, hashes: List[str]) -> List[Optional[StorageEosioAction]]:
+        '''Bulk ``tx_from_hash``, results follow the order of ``hashes``.'''
+        found = {}
+        missing = []
+        for h in set(hashes):
+            cached = self.lookup_cache.get(('tx', h))
+            if cached is not None:
+                found[h] = cached
+
+            else:
+                missing.append(h)
+
+        sources = self._msearch_first_hits(
+            [
+                (f'{self.chain_name}-action-*', {'term': {'@raw.hash': h}})
+                for h in missing
+            ],
+            ACTION_SOURCE_FIELDS
+        )
+        for h, source in zip(missing, sources):
+            if source is not None:
+                found[h] = StorageEosioAction.from_source(source)
+                self.lookup_cache.put(('tx', h), found[h])
+
+        return [found.get(h, None) for h in hashes]
+
+    def blocks_from_evm_nums(self, nums: List[int]) -> List[Optional[StorageEosioDelta]]:
+        '''Bulk ``block_from_evm_num``, results follow the order of ``nums``.
+        Each block is looked up in its suffix index first, misses are then
+        retried against all delta indices.
+        '''
+        found = {}
+        missing = []
+        for num in set(nums):
+            cached = self.lookup_cache.get(('block', num))
+            if cached is not None:
+                found[num] = cached
+
+            else:
+                missing.append(num)
+
+        routes = [
+            lambda num: (
+                f'{self.chain_name}-delta-{self.index_version}-'
+                f'{get_suffix(num, self.docs_per_index)}'
+            ),
+            lambda num: f'{self.chain_name}-delta-*'
+        ]
+        for route in routes:
+            if not missing:
+                break
+
+            sources = self._msearch_first_hits(
+                [
+                    (route(num), {'term': {'@global.block_num': num}})
+                    for num in missing
+                ],
+                DELTA_SOURCE_FIELDS
+            )
+            still_missing = []
+            for num, source in zip(missing, sources):
+                if source is None:
+                    still_missing.append(num)
+                    continue
+
+                found[num] = StorageEosioDelta.from_source(source)
+                self.lookup_cache.put(('block', num), found[num])
+
+            missing = still_missing
+
+        return [found.get(num, None) for num in nums]
+
+    def _iter_pit(
+        self,
+        index: str,
+        sort_field: str,
+        lower: Optional[int],
+        upper: Optional[int],
+        fields: Optional[List[str]],
+        query: Optional[dict],
+        page_size: Optional[int],
+        slice: Optional[Tuple[int, int]] = None
+    ) -> Iterator[tuple]:
+        '''Scan ``index`` in ``sort_field`` order through a point in time
+        with ``search_after``, the next page is fetched on a background
+        thread while the current one is consumed.
+
+        ``slice`` as ``(id, max)`` only scans that slice of the docs, so
+        ``max`` scans can run in parallel. Order only holds within a slice.
+
+        With ``fields`` set to None the whole ``_source`` dicts are yielded
+        instead of tuples.
+        '''
+        page_size = page_size or self.scan_page_size
+
+        extra = {}
+        if slice and slice[1] > 1:
+            extra['slice'] = {'id': slice[0], 'max': slice[1]}
+
+        bounds = {}
+        if lower is not None:
+            bounds['gte'] = lower
+
+        if upper is not None:
+            bounds['lte'] = upper
+
+        filters = []
+        if bounds:
+            filters.append({'range': {sort_field: bounds}})
+
+        if query:
+            filters.append(query)
+
+        pit_id = self.elastic.open_point_in_time(
+            index=index, keep_alive=self.pit_keep_alive)['id']
+
+        pages = queue.Queue(maxsize=self.scan_prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+
+                except queue.Full:
+                    ...
+
+        def fetch():
+            nonlocal pit_id
+            search_after = None
+            try:
+                while not stop.is_set():
+                    result = self.elastic.search(
+                        pit={'id': pit_id, 'keep_alive': self.pit_keep_alive},
+                        size=page_size,
+                        sort=[{sort_field: 'asc'}, {'_shard_doc': 'asc'}],
+                        query={'bool': {'filter': filters}},
+                        source=fields,
+                        search_after=search_after,
+                        track_total_hits=False,
+                        **extra
+                    )
+                    pit_id = result.get('pit_id', pit_id)
+
+                    hits = result['hits']['hits']
+                    if hits:
+                        put(hits)
+
+                    if len(hits) < page_size:
+                        break
+
+                    search_after = hits[-1]['sort']
+
+            except BaseException as error:
+                put(error)
+
+            finally:
+                put(None)
+
+        fetcher = threading.Thread(
+            target=fetch, name=f'scan-{index}', daemon=True)
+        fetcher.start()
+
+        try:
+            while (page := pages.get()) is not None:
+                if isinstance(page, BaseException):
+                    raise page
+
+                for hit in page:
+                    source = hit['_source']
+                    if fields is None:
+                        yield source
+                        continue
+
+                    yield tuple(source_field(source, field) for field in fields)
+
+        finally:
+            stop.set()
+            fetcher.join()
+            try:
+                self.elastic.close_point_in_time(id=pit_id)
+
+            except NotFoundError:
+                ...
+
+    def iter_deltas(
+        self,
+        lower: Optional[int] = None,
+        upper: Optional[int] = None,
+        fields: Optional[List[str]] = DELTA_SOURCE_FIELDS,
+        query: Optional[dict] = None,
+        page_size: Optional[int] = None,
+        index: Optional[str] = None,
+        slice: Optional[Tuple[int, int]] = None
+    ) -> Iterator[tuple]:
+        '''Stream deltas with ``@global.block_num`` in ``[lower, upper]`` in
+        block order, each as a tuple of its ``fields`` values or as the
+        whole ``_source`` if ``fields`` is None. ``query`` further filters
+        the docs, ``index`` narrows the scan to a single
+        index and ``slice`` to one of several parallel scans.
+
+        Runs on a point in time, so docs indexed while scanning are not
+        seen and memory stays bounded to a couple of pages.
+        '''
+        yield from self._iter_pit(
+            index or f'{self.chain_name}-delta-*', '@global.block_num',
+            lower, upper, fields, query, page_size, slice=slice)
+
+    def iter_actions(
+        self,
+        lower: Optional[int] = None,
+        upper: Optional[int] = None,
+        fields: Optional[List[str]] = ACTION_SOURCE_FIELDS,
+        query: Optional[dict] = None,
+        page_size: Optional[int] = None,
+        index: Optional[str] = None,
+        slice: Optional[Tuple[int, int]] = None
+    ) -> Iterator[tuple]:
+        '''Stream actions with ``@raw.block`` in ``[lower, upper]``, see
+        ``iter_deltas``.
+        '''
+        yield from self._iter_pit(
+            index or f'{self.chain_name}-action-*', '@raw.block',
+            lower, upper, fields, query, page_size, slice=slice)
+
+    def get_ordered_delta_indices(self):
+        return [index.name for index in self.catalog.indices('delta')]
 
-        first_index = indices.pop(0)
+    def get_ordered_action_indices(self):
+        return [index.name for index in self.catalog.indices('action')]
+
+    def _get_edge_indexed_block(self, order: str):
         try:
             result = self.elastic.search(
-                index=first_index,
+                index=f'{self.chain_name}-delta-*',
                 size=1,
                 sort=[
-                    {'block_num': {'order': 'asc'}}
-                ]
+                    {'block_num': {'order': order, 'unmapped_type': 'long'}}
+                ],
+                source=DELTA_SOURCE_FIELDS,
+                ignore_unavailable=True
             )
 
-            if result.get('hits', {}).get('hits') and len(result.get('hits', {}).get('hits')) == 0:
+            hits = result.get('hits', {}).get('hits', [])
+            if len(hits) == 0:
                 return None
 
-            return StorageEosioDelta(result.get('hits', {}).get('hits', [])[0].get('_source'))
+            return StorageEosioDelta.from_source(hits[0]['_source'])
 
         except BaseException as error:
             logging.error(traceback.format_exc())
             logging.error(error)
             return None
 
+    def get_first_indexed_block(self):
+        return self._get_edge_indexed_block('asc')
+
     def get_last_indexed_block(self):
-        indices = self.get_ordered_delta_indices()
-        if len(indices) == 0:
+        return self._get_edge_indexed_block('desc')
+
+    def get_indexed_range(self) -> Optional[Tuple[int, int]]:
+        '''Lowest and highest ``@global.block_num`` across all delta
+        indices in a single aggregation, None if there are no deltas.
+        '''
+        result = self.elastic.search(
+            index=f'{self.chain_name}-delta-*',
+            size=0,
+            aggs={
+                'min_block': {'min': {'field': '@global.block_num'}},
+                'max_block': {'max': {'field': '@global.block_num'}}
+            },
+            ignore_unavailable=True
+        )
+        aggs = result.get('aggregations', {})
+        lower = aggs.get('min_block', {}).get('value')
+        upper = aggs.get('max_block', {}).get('value')
+        if lower is None or upper is None:
             return None
 
-        for i in range(len(indices) - 1, -1, -1):
-            last_index = indices[i]
-            try:
-                result = self.elastic.search(
-                    index=last_index,
-                    size=1,
-                    sort=[
-                        {'block_num': {'order': 'desc'}}
-                    ]
-                )
-
-                hits = result.get('hits', {}).get('hits', [])
-                if not hits or len(hits) == 0:
-                    continue
-
-                block_doc = hits[0].get('_source')
-                logging.debug(f'getLastIndexedBlock:\n{json.dumps(block_doc, indent=4)}')
-
-                return StorageEosioDelta(block_doc)
-
-            except BaseException as error:
-                logging.error(traceback.format_exc())
-                logging.error(error)
-                return None
-
-        return None
+        return int(lower), int(upper)
 
     def find_gap_in_indices(self):
         delta_indices = self.get_ordered_delta_indices()
@@ -340,132 +1183,279 @@ class ElasticDriver:
 
         return buckets
 
-    def find_duplicate_deltas(self, lower: int, upper: int):
-        index_name = f'{self.chain_name}-delta-*'
-        body = {
-            'query': {
-                'range': {
-                    '@global.block_num': {
-                        'gte': lower,
-                        'lte': upper
-                    }
-                }
-            },
-            'aggs': {
-                'duplicate_blocks': {
-                    'terms': {
-                        'field': '@global.block_num',
-                        'min_doc_count': 2,
-                        'size': 100
-                    }
-                }
-            }
+    def iter_duplicate_deltas(
+        self,
+        lower: int,
+        upper: int,
+        index: Optional[str] = None
+    ) -> Iterator[int]:
+        '''Stream every ``@global.block_num`` indexed more than once in
+        ``[lower, upper]``, paging through all block keys.
+        '''
+        buckets = self._iter_composite(
+            index or f'{self.chain_name}-delta-*',
+            [{'block': {'terms': {'field': '@global.block_num'}}}],
+            query={'range': {'@global.block_num': {'gte': lower, 'lte': upper}}}
+        )
+        for bucket in buckets:
+            if bucket['doc_count'] > 1:
+                yield int(bucket['key']['block'])
+
+    def iter_duplicate_actions(
+        self,
+        lower: int,
+        upper: int,
+        index: Optional[str] = None
+    ) -> Iterator[str]:
+        '''Stream every ``@raw.hash`` indexed more than once for txs with
+        ``@raw.block`` in ``[lower, upper]``, paging through all hashes.
+        '''
+        buckets = self._iter_composite(
+            index or f'{self.chain_name}-action-*',
+            [{'hash': {'terms': {'field': '@raw.hash'}}}],
+            query={'range': {'@raw.block': {'gte': lower, 'lte': upper}}}
+        )
+        for bucket in buckets:
+            if bucket['doc_count'] > 1:
+                yield bucket['key']['hash']
+
+    def find_duplicate_deltas(self, lower: int, upper: int, index: Optional[str] = None):
+        logging.debug(f'findDuplicateDeltas: {lower}-{upper}')
+        return list(self.iter_duplicate_deltas(lower, upper, index=index))
+
+    def find_duplicate_actions(self, lower: int, upper: int, index: Optional[str] = None):
+        logging.debug(f'findDuplicateActions: {lower}-{upper}')
+        return list(self.iter_duplicate_actions(lower, upper, index=index))
+
+    def find_duplicates(self, lower: int, upper: int) -> Tuple[List[int], List[str]]:
+        '''Run the delta and action duplicate scans concurrently, returns
+        ``(delta_duplicates, action_duplicates)``.
+        '''
+        start = time.monotonic()
+        start_requests = self.request_count
+
+        with ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix='duplicates'
+        ) as pool:
+            deltas = pool.submit(self.find_duplicate_deltas, lower, upper)
+            actions = pool.submit(self.find_duplicate_actions, lower, upper)
+
+            delta_duplicates = deltas.result()
+            action_duplicates = actions.result()
+
+        logging.info(
+            f'duplicate scan {lower}-{upper}: '
+            f'{len(delta_duplicates)} blocks, {len(action_duplicates)} txs, '
+            f'{self.request_count - start_requests} requests in '
+            f'{time.monotonic() - start:.2f}s')
+
+        return delta_duplicates, action_duplicates
+
+    def _iter_composite(
+        self,
+        index: str,
+        sources: list[dict],
+        query: Optional[dict] = None,
+        aggs: Optional[dict] = None
+    ) -> Iterator[dict]:
+        '''Page through every bucket of a composite aggregation.'''
+        composite = {
+            'sources': sources,
+            'size': self.composite_page_size
         }
-        results = self.elastic.search(index=index_name, size=0, **body)
+        agg = {'composite': composite}
+        if aggs:
+            agg['aggs'] = aggs
 
-        if 'aggregations' in results:
-            buckets = results['aggregations']['duplicate_blocks']['buckets']
-            logging.debug(f'findDuplicateDeltas: {lower}-{upper}')
-            return [bucket['key'] for bucket in buckets]
-        else:
-            return []
+        while True:
+            result = self.elastic.search(
+                index=index,
+                size=0,
+                query=query,
+                aggs={'pages': agg},
+                ignore_unavailable=True
+            )
+            with self._stats_lock:
+                self.request_count += 1
 
-    def find_duplicate_actions(self, lower: int, upper: int):
-        index_name = f'{self.chain_name}-action-*'
-        body = {
-            'query': {
-                'range': {
-                    '@raw.block': {
-                        'gte': lower,
-                        'lte': upper
-                    }
-                }
-            },
-            'aggs': {
-                'duplicate_txs': {
-                    'terms': {
-                        'field': '@raw.hash',
-                        'min_doc_count': 2,
-                        'size': 100
-                    }
-                }
+            page = result.get('aggregations', {}).get('pages')
+            if not page or not page['buckets']:
+                return
+
+            yield from page['buckets']
+
+            if 'after_key' not in page:
+                return
+
+            composite['after'] = page['after_key']
+
+    def _iter_block_runs(
+        self,
+        index: str,
+        lower: int,
+        upper: int
+    ) -> Iterator[Tuple[int, int]]:
+        '''Yield the ranges of ``@global.block_num`` present in ``index``
+        between ``lower`` and ``upper``, in order and possibly adjacent.
+
+        Histogram buckets with as many distinct blocks as they span are
+        taken as is, the rest are scanned one block at a time, so requests
+        stay bounded by the index span over ``gap_scan_interval *
+        composite_page_size`` plus one per partially filled bucket. Distinct
+        blocks are counted rather than docs so a duplicate can't hide a
+        missing block.
+        '''
+        interval = self.gap_scan_interval
+        range_query = lambda lo, hi: {
+            'range': {'@global.block_num': {'gte': lo, 'lte': hi}}}
+
+        buckets = self._iter_composite(
+            index,
+            [{'bucket': {'histogram': {
+                'field': '@global.block_num', 'interval': interval}}}],
+            query=range_query(lower, upper),
+            aggs={
+                'min_block': {'min': {'field': '@global.block_num'}},
+                'max_block': {'max': {'field': '@global.block_num'}},
+                # exact below the threshold, 40000 is the max elastic takes
+                'unique_blocks': {'cardinality': {
+                    'field': '@global.block_num',
+                    'precision_threshold': min(interval, 40_000)}}
             }
-        }
-        results = self.elastic.search(index=index_name, size=0, **body)
+        )
+        for bucket in buckets:
+            start = max(int(bucket['key']['bucket']), lower)
+            end = min(int(bucket['key']['bucket']) + interval - 1, upper)
+            min_block = int(bucket['min_block']['value'])
+            max_block = int(bucket['max_block']['value'])
+
+            if (bucket['unique_blocks']['value'] == end - start + 1 and
+                min_block == start and max_block == end):
+                yield start, end
+                continue
+
+            blocks = self._iter_composite(
+                index,
+                [{'block': {'terms': {'field': '@global.block_num'}}}],
+                query=range_query(min_block, max_block)
+            )
+            run_start = run_end = None
+            for block in blocks:
+                block_num = int(block['key']['block'])
+                if run_end is not None and block_num == run_end + 1:
+                    run_end = block_num
+                    continue
 
-        if 'aggregations' in results:
-            buckets = results['aggregations']['duplicate_txs']['buckets']
-            logging.debug(f'findDuplicateActions: {lower}-{upper}')
-            return [bucket['key'] for bucket in buckets]
-        else:
-            return []
-
-    def check_gaps(self, lower_bound: int, upper_bound: int, interval: int) -> Optional[int]:
-
-        interval = math.ceil(interval)
-
-        # Base case
-        if interval == 1:
-            return lower_bound
-
-        middle = (upper_bound + lower_bound) // 2
-
-        logging.debug(f'calculated middle {middle}')
-
-        logging.debug('first half')
-        # Recurse on the first half
-        lower_buckets = self.run_histogram_gap_check(lower_bound, middle, interval // 2)
-        if len(lower_buckets) == 0:
-            return middle  # Gap detected
-        elif lower_buckets[-1]['max_block']['value'] < middle:
-            lower_gap = self.check_gaps(lower_bound, middle, interval // 2)
-            if lower_gap:
-                return lower_gap
-
-        logging.debug('second half')
-        # Recurse on the second half
-        upper_buckets = self.run_histogram_gap_check(middle + 1, upper_bound, interval // 2)
-        if len(upper_buckets) == 0:
-            return middle + 1  # Gap detected
-        elif upper_buckets[0]['min_block']['value'] > middle + 1:
-            upper_gap = self.check_gaps(middle + 1, upper_bound, interval // 2)
-            if upper_gap:
-                return upper_gap
-
-        # Check for gap between the halves
-        if (lower_buckets[-1]['max_block']['value'] + 1) < upper_buckets[0]['min_block']['value']:
-            return lower_buckets[-1]['max_block']['value']
-
-        # Find gaps inside bucket by doc_count
-        buckets = lower_buckets + upper_buckets
-        for i in range(len(buckets)):
-            if buckets[i]['doc_count'] != (buckets[i]['max_block']['value'] - buckets[i]['min_block']['value']) + 1:
-                inside_gap = self.check_gaps(buckets[i]['min_block']['value'], buckets[i]['max_block']['value'], interval // 2)
-                if inside_gap:
-                    return inside_gap
-
-        # No gap found
-        return None
+                if run_start is not None:
+                    yield run_start, run_end
 
-    def full_integrity_check(self):
-        lower_bound_doc = self.get_first_indexed_block()
-        upper_bound_doc = self.get_last_indexed_block()
+                run_start = run_end = block_num
 
-        if not lower_bound_doc or not upper_bound_doc:
-            return None
+            if run_start is not None:
+                yield run_start, run_end
+
+    def find_gaps(
+        self,
+        lower: Optional[int] = None,
+        upper: Optional[int] = None
+    ) -> Iterator[Tuple[int, int]]:
+        '''Stream every missing ``@global.block_num`` range as inclusive
+        ``(start, end)`` tuples, in one ordered pass over the delta indices.
+
+        Without bounds the scan goes from the first to the last indexed
+        block.
+        '''
+        if lower is None or upper is None:
+            bounds = self.get_indexed_range()
+            if not bounds:
+                return
+
+            lower = bounds[0] if lower is None else lower
+            upper = bounds[1] if upper is None else upper
+
+        runs = (
+            run
+            for index in self.get_ordered_delta_indices()
+            for run in self._iter_block_runs(index, lower, upper)
+        )
+        for kind, start, end in self._stitch_block_runs(runs, lower, upper):
+            if kind == 'gap':
+                yield start, end
+
+    @staticmethod
+    def _stitch_block_runs(
+        runs: Iterator[Tuple[int, int]],
+        lower: int,
+        upper: int
+    ) -> Iterator[Tuple[str, int, int]]:
+        '''Merge present block ranges, ordered by start within each index and
+        indices in suffix order, into ``('gap', start, end)`` for missing
+        blocks and ``('overlap', start, end)`` for blocks present in more
+        than one index.
+        '''
+        expected = lower
+        for start, end in runs:
+            if start > expected:
+                yield 'gap', expected, start - 1
+
+            elif start < expected:
+                yield 'overlap', start, min(end, expected - 1)
+
+            expected = max(expected, end + 1)
+
+        if expected <= upper:
+            yield 'gap', expected, upper
+
+    def _list_block_runs(self, index: str, lower: int, upper: int):
+        return list(self._iter_block_runs(index, lower, upper))
+
+    def verify_range(
+        self,
+        lower_bound: int,
+        upper_bound: int,
+        workers: Optional[int] = None
+    ):
+        '''Check ``[lower_bound, upper_bound]`` for duplicates and gaps,
+        raises ESDuplicatesFound or ESGapFound.
+
+        The block ranges of every delta index are scanned on a pool of
+        ``workers`` threads (``integrity_workers`` by default) while
+        ``find_duplicates`` runs over the whole range, ranges are then
+        stitched together in suffix order to find gaps and blocks present
+        in more than one index.
+        '''
+        if workers is None:
+            workers = self.integrity_workers
+
+        delta_indices = self.get_ordered_delta_indices()
 
-        lower_bound = lower_bound_doc.global_block_num
-        upper_bound = upper_bound_doc.global_block_num
-        step = 10_000_000
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='integrity'
+        ) as pool:
+            run_futs = [
+                pool.submit(
+                    self._list_block_runs, index, lower_bound, upper_bound)
+                for index in delta_indices
+            ]
 
-        delta_duplicates = []
-        action_duplicates = []
+            # composite aggregations over every delta and action index, so
+            # duplicates across indices are found at any height
+            delta_duplicates, action_duplicates = self.find_duplicates(
+                lower_bound, upper_bound)
 
-        for current_lower in range(lower_bound, upper_bound, step):
-            current_upper = min(current_lower + step, upper_bound)
+            runs = [run for fut in run_futs for run in fut.result()]
 
-            delta_duplicates += self.find_duplicate_deltas(current_lower, current_upper)
-            action_duplicates += self.find_duplicate_actions(current_lower, current_upper)
+        gaps = []
+        for kind, start, end in self._stitch_block_runs(
+            runs, lower_bound, upper_bound):
+            if kind == 'gap':
+                gaps.append((start, end))
+
+            else:
+                delta_duplicates += list(range(start, end + 1))
+
+        delta_duplicates = sorted(set(delta_duplicates))
+        action_duplicates = sorted(set(action_duplicates))
 
         if len(delta_duplicates) > 0:
             logging.error(f'block duplicates found: {json.dumps(delta_duplicates)}')
@@ -482,43 +1472,522 @@ class ElasticDriver:
         if upper_bound - lower_bound < 2:
             return
 
-        # First just check if whole indices are missing
-        gap = self.find_gap_in_indices()
-        if gap:
-            logging.debug('whole index seems to be missing')
-            lower = gap['gapStart'] * self.docs_per_index
-            upper = (gap['gapStart'] + 1) * self.docs_per_index
-            agg = self.run_histogram_gap_check(
-                lower, upper, self.docs_per_index)
-            gap = agg[0]['max_block']['value'] + 1
-            raise ESGapFound(f'Gap found! {int(gap)}', int(gap))
+        if gaps:
+            logging.error(f'gaps found: {json.dumps(gaps)}')
+            start = gaps[0][0]
+            raise ESGapFound(f'Gap found! {start}', start, gaps)
 
-        initial_interval = upper_bound - lower_bound
+    def _hash_chain_links(
+        self,
+        index: str,
+        lower: Optional[int],
+        upper: Optional[int]
+    ) -> Tuple[Optional[tuple], Optional[tuple], List[BrokenLink]]:
+        '''Scan a delta index in chunks of ``hash_chain_chunk_size`` blocks,
+        returns its first and last rows and the broken links inside it.
+
+        Every chunk becomes NumPy arrays, a link is broken when two
+        consecutive blocks don't chain: the ``@evmPrevBlockHash`` of block N
+        differs from the ``@evmBlockHash`` of N - 1 or either is missing.
+        Rows are ``(global_block_num, block_num, evm_hash, evm_prev_hash)``.
+        '''
+        records = self.iter_deltas(
+            lower=lower, upper=upper,
+            fields=[
+                '@global.block_num', 'block_num',
+                '@evmBlockHash', '@evmPrevBlockHash'
+            ],
+            index=index
+        )
 
-        logging.info(f'starting full gap check from {lower_bound} to {upper_bound}')
+        first = None
+        links = []
 
-        gap = self.check_gaps(lower_bound, upper_bound, initial_interval)
-        if gap:
-            raise ESGapFound(f'Gap found! {int(gap)}', int(gap))
+        def check(chunk: list):
+            global_nums = np.fromiter(
+                (row[0] for row in chunk), dtype=np.int64, count=len(chunk))
+            hashes, missing_hash = _hash_words([row[2] for row in chunk])
+            prevs, missing_prev = _hash_words([row[3] for row in chunk])
 
-    def _purge_blocks_newer_than(self, block_num, evm_block_num):
-        target_suffix = get_suffix(block_num, self.docs_per_index)
-        delta_index = f'{self.chain_name}-delta-v1.5-{target_suffix}'
-        action_index = f'{self.chain_name}-action-v1.5-{target_suffix}'
+            consecutive = global_nums[1:] == global_nums[:-1] + 1
+            mismatch = (
+                (prevs[1:] != hashes[:-1]).any(axis=1) |
+                missing_prev[1:] | missing_hash[:-1]
+            )
+            for i in np.flatnonzero(consecutive & mismatch) + 1:
+                links.append(BrokenLink(
+                    chunk[i][0], chunk[i][1], chunk[i][3], chunk[i - 1][2]))
 
+        chunk = []
         try:
-            self._delete_by_query(delta_index, 'block_num', block_num)
+            for row in records:
+                if first is None:
+                    first = row
 
-        except NotFoundError:
-            ...
+                chunk.append(row)
+                if len(chunk) >= self.hash_chain_chunk_size:
+                    check(chunk)
+                    # carried over so the link across chunks is checked
+                    chunk = chunk[-1:]
+
+            if len(chunk) > 1:
+                check(chunk)
+
+        finally:
+            records.close()
+
+        last = chunk[-1] if chunk else None
+        return first, last, links
 
+    def verify_hash_chain(
+        self,
+        lower_bound: Optional[int] = None,
+        upper_bound: Optional[int] = None,
+        workers: Optional[int] = None
+    ):
+        '''Check the EVM hash chain of the deltas with ``@global.block_num``
+        in ``[lower_bound, upper_bound]``, raises ESHashChainBroken with
+        every broken link found.
+
+        Delta indices are scanned in parallel on ``workers`` threads
+        (``integrity_workers`` by default) and the links between the last
+        block of an index and the first one of the next are checked after.
+        Gaps are not reported here, blocks missing their predecessor are
+        skipped.
+        '''
+        if np is None:
+            raise ImportError(
+                'hash chain checks need numpy, install it with '
+                '`pip install numpy` or the `check` extra')
+
+        if workers is None:
+            workers = self.integrity_workers
+
+        delta_indices = self.get_ordered_delta_indices()
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='hash-chain'
+        ) as pool:
+            results = list(pool.map(
+                lambda index: self._hash_chain_links(
+                    index, lower_bound, upper_bound),
+                delta_indices
+            ))
+
+        links = []
+        prev_last = None
+        for first, last, index_links in results:
+            if first is None:
+                continue
+
+            if (prev_last is not None and
+                first[0] == prev_last[0] + 1 and
+                not _same_hash(first[3], prev_last[2])):
+                links.append(BrokenLink(first[0], first[1], first[3], prev_last[2]))
+
+            links += index_links
+            prev_last = last
+
+        links.sort()
+        if links:
+            logging.error(
+                f'hash chain broken at blocks: '
+                f'{json.dumps([link.global_block_num for link in links])}')
+            raise ESHashChainBroken(
+                f'Hash chain broken! {links[0].global_block_num}', links)
+
+    @property
+    def coverage_path(self) -> Optional[Path]:
+        if not self.node_dir:
+            return None
+
+        return self.node_dir / 'coverage' / f'{self._checkpoint_id()}.cov'
+
+    def _scan_coverage(self, coverage: BlockCoverage, lower: Optional[int] = None):
+        for num, in self.iter_deltas(
+            lower=lower, fields=['@global.block_num'], page_size=10_000):
+            if num is not None:
+                coverage.add(num)
+
+    def update_coverage(self) -> BlockCoverage:
+        '''Bring the coverage map of indexed ``@global.block_num`` values up
+        to date and persist it in the node directory.
+
+        The map is built with a full streaming scan the first time, after
+        that only the tail from ``coverage_overlap`` blocks before the last
+        covered one is scanned. If blocks were removed from the tail it is
+        trimmed to match, if the first indexed block moved it is rebuilt.
+
+        Scans fill a new map, the current one stays readable through
+        ``cached_coverage`` until it's swapped in.
+        '''
+        with self._coverage_update_lock:
+            with self._coverage_lock:
+                coverage = self._coverage
+                generation = self._coverage_generation
+
+            path = self.coverage_path
+            if coverage is None and path:
+                coverage = BlockCoverage.load(path)
+
+            bounds = self.get_indexed_range()
+            if not bounds:
+                coverage = BlockCoverage()
+
+            elif coverage is None or coverage.lower != bounds[0]:
+                logging.info('building block coverage map...')
+                start = time.monotonic()
+                coverage = BlockCoverage()
+                self._scan_coverage(coverage)
+                logging.info(
+                    f'block coverage map built, {len(coverage)} blocks in '
+                    f'{len(coverage.runs)} runs, took '
+                    f'{time.monotonic() - start:.2f}s')
+
+            else:
+                coverage = BlockCoverage(coverage.runs)
+                if bounds[1] < coverage.upper:
+                    coverage.discard_from(bounds[1] + 1)
+
+                self._scan_coverage(
+                    coverage,
+                    lower=max(coverage.lower, coverage.upper - self.coverage_overlap))
+
+            with self._coverage_lock:
+                if generation != self._coverage_generation:
+                    # may hold purged blocks, next update starts over
+                    logging.info('indices purged while updating coverage, discarded')
+                    return coverage
+
+                if path:
+                    coverage.save(path)
+
+                self._coverage = coverage
+
+            return coverage
+
+    def cached_coverage(self) -> Optional[BlockCoverage]:
+        '''Coverage map as of the last ``update_coverage``, from memory or
+        the persisted file, without querying elastic or waiting on a running
+        update. None if it was never built.
+        '''
+        with self._coverage_lock:
+            if self._coverage is None and self.coverage_path:
+                self._coverage = BlockCoverage.load(self.coverage_path)
+
+            return self._coverage
+
+    def get_coverage(self) -> BlockCoverage:
+        '''In memory coverage map, built or loaded on first use, see
+        ``update_coverage``.
+        '''
+        coverage = self._coverage
+        if coverage is None:
+            coverage = self.update_coverage()
+
+        return coverage
+
+    def is_indexed(self, block_num: int) -> bool:
+        return block_num in self.get_coverage()
+
+    def missing_ranges(self, lower: int, upper: int) -> List[Tuple[int, int]]:
+        return self.get_coverage().missing(lower, upper)
+
+    def coverage_percent(self, lower: int, upper: int) -> float:
+        return self.get_coverage().percent(lower, upper)
+
+    def _checkpoint_id(self) -> str:
+        return f'{self.chain_name}-{self.index_version}'
+
+    def get_integrity_checkpoint(self) -> Optional[dict]:
+        '''Last range verified as gap and duplicate free, as a dict with
+        ``lower`` and ``upper`` keys, or None.
+        '''
         try:
-            self._delete_by_query(action_index, '@raw.block', evm_block_num)
+            result = self.elastic.get(
+                index=self.checkpoint_index, id=self._checkpoint_id())
+            return result['_source']
 
         except NotFoundError:
-            ...
+            return None
+
+    def save_integrity_checkpoint(self, lower: int, upper: int):
+        self.elastic.index(
+            index=self.checkpoint_index,
+            id=self._checkpoint_id(),
+            document={
+                'chain': self.chain_name,
+                'index_version': self.index_version,
+                'lower': lower,
+                'upper': upper,
+                '@timestamp': datetime.now(timezone.utc).isoformat()
+            },
+            refresh=True
+        )
+
+    def rewind_integrity_checkpoint(self, block_num: int):
+        '''Forget verification of anything past ``block_num``.'''
+        checkpoint = self.get_integrity_checkpoint()
+        if not checkpoint or checkpoint['upper'] <= block_num:
+            return
+
+        if block_num < checkpoint['lower']:
+            self.elastic.delete(
+                index=self.checkpoint_index,
+                id=self._checkpoint_id(),
+                refresh=True
+            )
+
+        else:
+            self.save_integrity_checkpoint(checkpoint['lower'], block_num)
+
+    def full_integrity_check(self, hashes: bool = False):
+        self.catalog.invalidate()
+        bounds = self.get_indexed_range()
+        if not bounds:
+            return None
+
+        lower_bound, upper_bound = bounds
+
+        self.verify_range(lower_bound, upper_bound)
+        if hashes:
+            self.verify_hash_chain(lower_bound, upper_bound)
+
+        self.save_integrity_checkpoint(lower_bound, upper_bound)
+
+    def integrity_check(
+        self,
+        overlap: Optional[int] = None,
+        full: bool = False,
+        hashes: bool = False
+    ):
+        '''Verify only what was indexed since the last successful check,
+        plus ``overlap`` blocks before it (``integrity_overlap`` by default).
+        With ``hashes`` the EVM hash chain of the same range is verified
+        too.
+
+        Falls back to a full check when ``full`` is set, there is no
+        checkpoint or the checkpointed range no longer starts at the first
+        indexed block.
+        '''
+        if overlap is None:
+            overlap = self.integrity_overlap
+
+        checkpoint = None if full else self.get_integrity_checkpoint()
+        self.catalog.invalidate()
+        bounds = self.get_indexed_range()
+
+        if (not checkpoint or
+            not bounds or
+            bounds[0] != checkpoint['lower']):
+            return self.full_integrity_check(hashes=hashes)
+
+        upper_bound = bounds[1]
+        if upper_bound < checkpoint['upper']:
+            # data was removed from the tail without rewinding
+            return self.full_integrity_check(hashes=hashes)
+
+        if upper_bound == checkpoint['upper']:
+            logging.debug(f'nothing new since last check at {upper_bound}')
+            return
+
+        lower = max(checkpoint['lower'], checkpoint['upper'] - overlap)
+        logging.info(
+            f'verifying new blocks {checkpoint["upper"] + 1} to {upper_bound} '
+            f'with {checkpoint["upper"] + 1 - lower} blocks overlap')
+
+        self.verify_range(lower, upper_bound)
+        if hashes:
+            self.verify_hash_chain(lower, upper_bound)
 
-    def _delete_by_query(self, index, field, value):
+        self.save_integrity_checkpoint(checkpoint['lower'], upper_bound)
+
+    def _purge_blocks_newer_than(self, block_num, evm_block_num, mode: str = 'auto'):
+        target_suffix = get_suffix(block_num, self.docs_per_index)
+        delta_index = f'{self.chain_name}-delta-{self.index_version}-{target_suffix}'
+        action_index = f'{self.chain_name}-action-{self.index_version}-{target_suffix}'
+
+        tasks = []
+        for index, field, value in (
+            (delta_index, 'block_num', block_num),
+            (action_index, '@raw.block', evm_block_num)
+        ):
+            if self._should_rewind_by_reindex(index, field, value, mode):
+                self._rewind_by_reindex(index, field, value)
+                continue
+
+            try:
+                tasks.append(self._delete_by_query(index, field, value))
+
+            except NotFoundError:
+                ...
+
+        tasks = [task for task in tasks if task]
+        self._save_purge_state(block_num, evm_block_num, tasks)
+
+        for task_id in tasks:
+            self.wait_for_task(task_id)
+
+        # deletes ran without refreshing, make them visible once
+        self.elastic.indices.refresh(
+            index=[delta_index, action_index], ignore_unavailable=True)
+
+    def _should_rewind_by_reindex(self, index, field, value, mode: str) -> bool:
+        '''Reindex when forced to, or in auto mode when at least
+        ``reindex_threshold`` of the docs in ``index`` would be deleted.
+        '''
+        if mode == 'delete':
+            return False
+
+        if (self.elastic.indices.exists_alias(name=index) or
+            not self.elastic.indices.exists(index=index)):
+            # may be half way through a swap, let the rewind finish it
+            return self.elastic.indices.exists(
+                index=self._rewind_index_name(index))
+
+        if mode == 'reindex':
+            return True
+
+        total = self.elastic.count(index=index)['count']
+        if total == 0:
+            return False
+
+        removed = self.elastic.count(
+            index=index,
+            query={'range': {field: {'gte': value}}}
+        )['count']
+        fraction = removed / total
+        logging.info(
+            f'{index}: purging {removed}/{total} docs ({fraction:.1%})')
+
+        return fraction >= self.reindex_threshold
+
+    def _rewind_index_name(self, index: str) -> str:
+        # outside of the chain's index patterns so searches don't see it
+        return f'tevmc-rewind-{index}'
+
+    def _rewind_settings(self, index: str) -> Tuple[dict, dict]:
+        '''Flat settings of ``index`` split in the ones its rewound copy is
+        created with and the ones only restored once it's swapped in.
+        '''
+        settings = self.elastic.indices.get_settings(
+            index=index, flat_settings=True)[index]['settings']
+
+        create = {}
+        restore = dict(REWIND_DEFAULT_SETTINGS)
+        for key, value in settings.items():
+            if key.startswith(REWIND_SKIP_SETTINGS):
+                continue
+
+            if key.startswith(REWIND_DEFERRED_SETTINGS):
+                restore[key] = value
+
+            else:
+                create[key] = value
+
+        return create, restore
+
+    def _save_rewind_settings(self, index: str, restore: dict):
+        '''Record the settings to restore on ``index`` in the purge state,
+        so a resumed swap doesn't lose its replicas.
+        '''
+        state = self.get_pending_purge() or {}
+        rewinds = json.loads(state.get('rewinds') or '{}')
+        rewinds[index] = restore
+        self.elastic.update(
+            index=self.checkpoint_index,
+            id=self._purge_state_id(),
+            doc={'rewinds': json.dumps(rewinds)},
+            refresh=True
+        )
+
+    def _load_rewind_settings(self, index: str) -> dict:
+        state = self.get_pending_purge() or {}
+        restore = json.loads(state.get('rewinds') or '{}').get(index, None)
+        if restore is None:
+            logging.warning(
+                f'no saved settings for {index}, swapping in with defaults')
+            restore = dict(REWIND_DEFAULT_SETTINGS)
+
+        return restore
+
+    def _rewind_by_reindex(self, index, field, value):
+        '''Drop the docs with ``field >= value`` from ``index`` by copying
+        the rest into a fresh index with a sliced reindex and swapping it in
+        under the original name, which leaves no tombstones behind.
+
+        The copy is created with all the original settings, the original is
+        then atomically replaced by an alias to the write blocked copy, so
+        readers never lose the name, and the copy is cloned back under it.
+        Settings held back while copying are saved in the purge state, an
+        interrupted rewind resumes the swap from the copy.
+        '''
+        tmp_index = self._rewind_index_name(index)
+
+        swapping = self.elastic.indices.exists_alias(name=index)
+        if not swapping and self.elastic.indices.exists(index=index):
+            create, restore = self._rewind_settings(index)
+            mappings = self.elastic.indices.get_mapping(
+                index=index)[index]['mappings']
+            self._save_rewind_settings(index, restore)
+
+            self.elastic.indices.delete(index=tmp_index, ignore_unavailable=True)
+            self.elastic.indices.create(
+                index=tmp_index,
+                mappings=mappings,
+                settings={
+                    **create,
+                    'index.number_of_replicas': 0,
+                    'index.refresh_interval': -1
+                }
+            )
+
+            logging.info(f'reindexing {index} below {field} {value}...')
+            result = self.elastic.reindex(
+                source={
+                    'index': index,
+                    'query': {'range': {field: {'lt': value}}}
+                },
+                dest={'index': tmp_index},
+                conflicts='proceed',
+                slices='auto',
+                wait_for_completion=False,
+                refresh=False
+            )
+            self.wait_for_task(result['task'])
+
+            self.elastic.indices.refresh(index=tmp_index)
+            self.elastic.indices.add_block(index=tmp_index, block='write')
+            self.elastic.indices.update_aliases(actions=[
+                {'remove_index': {'index': index}},
+                {'add': {'index': tmp_index, 'alias': index}}
+            ])
+            swapping = True
+
+        else:
+            logging.info(f'resuming swap of {tmp_index} into {index}...')
+            restore = self._load_rewind_settings(index)
+
+        # the clone needs the name free, it's only missing until it exists
+        if swapping:
+            self.elastic.indices.delete_alias(index=tmp_index, name=index)
+
+        self.elastic.indices.clone(
+            index=tmp_index,
+            target=index,
+            settings={
+                **restore,
+                'index.blocks.write': False
+            },
+            wait_for_active_shards=1
+        )
+        self.elastic.indices.delete(index=tmp_index)
+        logging.info(f'swapped rewound copy into {index}')
+
+    def _delete_by_query(self, index, field, value) -> Optional[str]:
+        '''Start a sliced delete of the docs with ``field >= value`` as a
+        background task, returns its task id.
+        '''
         try:
             result = self.elastic.delete_by_query(
                 index=index,
@@ -530,41 +1999,161 @@ class ElasticDriver:
                     }
                 },
                 conflicts='proceed',
-                refresh=True,
+                slices='auto',
+                wait_for_completion=False,
+                refresh=False,
                 error_trace=True
             )
-            logging.debug(f'delete result: {result}')
+            logging.debug(f'delete task: {result}')
+            return result['task']
+
         except Exception as e:
             if e.__class__.__name__ != 'ResponseError' or e.info['error']['type'] != 'index_not_found_exception':
                 raise e
 
+        return None
+
+    def wait_for_task(self, task_id: str) -> Optional[dict]:
+        '''Poll a background task every ``task_poll_interval`` seconds,
+        logging progress and throughput, until it completes. Returns the
+        task response or None if the task is unknown.
+        '''
+        start = time.monotonic()
+        while True:
+            try:
+                result = self.elastic.tasks.get(task_id=task_id)
+
+            except NotFoundError:
+                logging.warning(f'task {task_id} not found')
+                return None
+
+            status = result['task'].get('status', {})
+            done = (
+                status.get('deleted', 0) +
+                status.get('created', 0) +
+                status.get('updated', 0)
+            )
+            total = status.get('total', 0)
+            elapsed = time.monotonic() - start
+            rate = done / elapsed if elapsed > 0 else 0
+
+            if result.get('completed', False):
+                if 'error' in result:
+                    raise ElasticDataIntegrityError(
+                        f'task {task_id} failed: {result["error"]}')
+
+                response = result.get('response', {})
+                failures = response.get('failures', [])
+                if failures:
+                    raise ElasticDataIntegrityError(
+                        f'task {task_id} had failures: {failures[:3]}')
+
+                logging.info(
+                    f'task {task_id} done: {done}/{total} docs in {elapsed:.1f}s')
+                return response
+
+            logging.info(
+                f'task {task_id}: {done}/{total} docs, {rate:.0f} docs/s')
+            time.sleep(self.task_poll_interval)
+
+    def _purge_state_id(self) -> str:
+        return f'{self._checkpoint_id()}-purge'
+
+    def _save_purge_state(self, block_num: int, evm_block_num: int, tasks: List[str]):
+        self.elastic.index(
+            index=self.checkpoint_index,
+            id=self._purge_state_id(),
+            document={
+                'chain': self.chain_name,
+                'index_version': self.index_version,
+                'block_num': block_num,
+                'evm_block_num': evm_block_num,
+                'tasks': tasks,
+                '@timestamp': datetime.now(timezone.utc).isoformat()
+            },
+            refresh=True
+        )
+
+    def get_pending_purge(self) -> Optional[dict]:
+        try:
+            result = self.elastic.get(
+                index=self.checkpoint_index, id=self._purge_state_id())
+            return result['_source']
+
+        except NotFoundError:
+            return None
+
+    def resume_purge(self) -> bool:
+        '''Finish a purge interrupted by a restart, waits on the delete tasks
+        it left running and then purges again, which is idempotent.
+        Returns False if there was nothing to resume.
+        '''
+        state = self.get_pending_purge()
+        if not state:
+            return False
+
+        logging.info(
+            f'resuming purge of blocks newer than {state["block_num"]}...')
+        for task_id in state['tasks']:
+            self.wait_for_task(task_id)
+
+        self.purge_newer_than(state['block_num'], state['evm_block_num'])
+        return True
+
     def _purge_indices_newer_than(self, block_num):
         logging.info(f'purging indices in db from block {block_num}...')
         target_suffix = get_suffix(block_num, self.docs_per_index)
         target_num = int(target_suffix)
         delete_list = []
 
-        delete_list += self._collect_indices_to_delete('delta-v1.5', target_num)
-        delete_list += self._collect_indices_to_delete('action-v1.5', target_num)
+        delete_list += self._collect_indices_to_delete(f'delta-{self.index_version}', target_num)
+        delete_list += self._collect_indices_to_delete(f'action-{self.index_version}', target_num)
 
         if delete_list:
             delete_result = self.elastic.indices.delete(index=delete_list)
             logging.info(f'deleted indices result: {delete_result}')
+            self.catalog.invalidate()
 
         return delete_list
 
     def _collect_indices_to_delete(self, subfix, target_num):
-        indices = self.elastic.cat.indices(
-            index=f'{self.chain_name}-{subfix}-*',
-            format='json'
-        )
-        return [index['index'] for index in indices if index_to_suffix_num(index['index']) > target_num]
+        kind, _, version = subfix.partition('-')
+        return [
+            index.name
+            for index in self.catalog.indices(kind, version=version or None)
+            if index.suffix > target_num
+        ]
+
+    def purge_newer_than(self, block_num, evm_block_num, mode: str = 'auto'):
+        '''Remove everything indexed from ``block_num`` / ``evm_block_num``
+        on. Later indices are dropped whole, the one holding the cut point is
+        rewound according to ``mode``: 'delete' runs a delete by query,
+        'reindex' copies the docs to keep into a fresh index and swaps it
+        in, 'auto' picks reindex when at least ``reindex_threshold`` of the
+        docs go away.
+        '''
+        # recorded first so an interrupted purge can be resumed
+        self._save_purge_state(block_num, evm_block_num, [])
 
-    def purge_newer_than(self, block_num, evm_block_num):
         self._purge_indices_newer_than(block_num)
-        self._purge_blocks_newer_than(block_num, evm_block_num)
+        self._purge_blocks_newer_than(block_num, evm_block_num, mode=mode)
+        self.rewind_integrity_checkpoint(evm_block_num - 1)
+        self.lookup_cache.clear()
+        self.catalog.invalidate()
+        # reloaded and trimmed to the new tail on next use
+        with self._coverage_lock:
+            self._coverage = None
+            self._coverage_generation += 1
+
+        self.elastic.delete(
+            index=self.checkpoint_index,
+            id=self._purge_state_id(),
+            refresh=True
+        )
+
+    def repair_data(self, purge_mode: str = 'auto'):
+        self.resume_purge()
 
-    def repair_data(self):
         try:
             self.full_integrity_check()
             doc = self.get_last_indexed_block()
@@ -577,16 +2166,16 @@ class ElasticDriver:
         except ESGapFound as err:
             logging.info(err)
 
-            bnum = err.start
-            doc = self.block_from_evm_num(bnum)
-            backstep = 10
-            exp = 1
-            while not doc and exp < 6:
-                logging.info(f'block #{bnum} query returned None, trying older block...')
-                bnum -= backstep ** exp
-                exp += 1
-                time.sleep(1)
-                doc = self.block_from_evm_num(bnum)
+            # look for the last indexed block before the gap, further and
+            # further back, all candidates in one bulk lookup
+            candidates = [err.start]
+            for exp in range(1, 6):
+                candidates.append(candidates[-1] - 10 ** exp)
+
+            doc = next(
+                (doc for doc in self.blocks_from_evm_nums(candidates) if doc),
+                None
+            )
 
             if not doc:
                 raise ElasticDataIntegrityError('Gap found but couldn\'t find last valid block!')
@@ -600,22 +2189,22 @@ class ElasticDriver:
 
             act_block = None
             if len(err.action_dups) > 0:
-                act_evm_block = es.tx_from_hash(err.action_dups[0]).raw.block
-                act_block = es.block_from_evm_num(act_evm_block)
+                act_evm_block = self.tx_from_hash(err.action_dups[0]).raw.block
+                act_block = self.block_from_evm_num(act_evm_block)
                 min_block = act_block
 
             delta_block = None
             if len(err.delta_dups) > 0:
-                delta_block = es.block_from_evm_num(err.delta_dups[0])
+                delta_block = self.block_from_evm_num(err.delta_dups[0])
 
-                if min_block and min_block.block_num > delta_block.block_num:
+                if not min_block or min_block.block_num > delta_block.block_num:
                     min_block = delta_block
 
             assert min_block  # Min block must be non null
 
             doc = min_block
 
-        self.purge_newer_than(doc.block_num, doc.global_block_num)
+        self.purge_newer_than(doc.block_num, doc.global_block_num, mode=purge_mode)
 
         # return last valid block nums
         return doc.block_num - 1, doc.global_block_num - 1
@@ -6,10 +6,11 @@ import sys
 import time
 import signal
 import logging
-import subprocess
+import threading
 
 from copy import deepcopy
-from hashlib import sha1
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from websocket import create_connection
 from contextlib import contextmanager, ExitStack
@@ -25,11 +26,25 @@ from docker.errors import NotFound, APIError
 from requests.auth import HTTPBasicAuth
 from leap.cleos import CLEOS
 from leap.sugar import download_latest_snapshot
-from tevmc.cmdline.build import build_service, perform_config_build, service_alias_to_fullname
+from tevmc.cmdline.build import (
+    PrefixedLogger,
+    build_service,
+    config_hashes,
+    hash_build_context,
+    perform_config_build,
+    service_alias_to_fullname
+)
 
 from tevmc.routes import add_routes
+from tevmc.testing.database import ElasticDataIntegrityError, ElasticDriver
 
 from .config import *
+from .logs import LogFollower, LogHub
+from .progress import (
+    TRANSLATOR_PROGRESS_PATTERN,
+    SyncProgressTracker,
+    parse_translator_progress
+)
 from .utils import *
 from .cleos_evm import CLEOSEVM
 
@@ -38,8 +53,42 @@ class TEVMCException(BaseException):
     ...
 
 
+# services that log to files in the main logs dir instead of docker
+MAIN_DIR_LOG_SERVICES = ['nodeos', 'telosevm-translator', 'telos-evm-rpc']
+
+MAIN_DIR_LOG_EXCLUDE = re.compile(r'clear_expired_input_')
+
+READINESS_PATTERNS = {
+    'redis': re.compile(r'Ready to accept connections'),
+    'elasticsearch': re.compile(r' indices into cluster_state'),
+    'telosevm-translator': re.compile(r'drained'),
+    'telos-evm-rpc': re.compile(r'Telos EVM RPC started!!!')
+}
+
+# startup order, services only wait on the ones they depend on, the rest
+# are started concurrently
+SERVICE_DEPENDENCIES = {
+    'redis': [],
+    'elastic': [],
+    'kibana': [],
+    'nodeos': [],
+    'indexer': ['nodeos', 'elastic'],
+    'rpc': ['redis', 'elastic', 'indexer'],
+    'beats': ['elastic', 'kibana']
+}
+
+NODEOS_PRODUCED_PATTERN = re.compile(r'Produced')
+NODEOS_RECEIVED_PATTERN = re.compile(r'Received')
+NODEOS_FRESH_STATE_PATTERN = re.compile(
+    r'No existing chain state or fork database\. '
+    r'Initializing fresh blockchain state and resetting fork database\.')
+
+
 class TEVMController:
 
+    # seconds between background block coverage map refreshes
+    coverage_refresh_interval = 60.0
+
     def __init__(
         self,
         config: dict[str, dict],
@@ -64,12 +113,29 @@ class TEVMController:
         self.pid = os.getpid()
         self.config = config
         self.client = docker.from_env()
+        self.images = DockerImageIndex(self.client)
         self.exit_stack = ExitStack()
+        self._exit_stack_lock = threading.Lock()
         self.wait = wait
         self.services = services
         self.testing = testing
         self.nodeos_logfile = None
         self.nodeos_logproc = None
+        self._log_followers: dict[str, LogFollower] = {}
+        self._log_hubs: dict[str, LogHub] = {}
+        self.sync_progress = SyncProgressTracker()
+        self._elastic_driver: ElasticDriver | None = None
+        self._coverage_thread: threading.Thread | None = None
+        self._coverage_refresh = threading.Event()
+        self._coverage_stop = threading.Event()
+        # set when startup fails or is interrupted, starters bail out on it
+        self._cancel_start = threading.Event()
+        # config reloads run one at a time on a background thread
+        self._reload_lock = threading.Lock()
+        self.reload_status: dict = {'state': 'idle'}
+        # integrity checks on the shared elastic driver, one at a time
+        self._check_lock = threading.Lock()
+        self.check_status: dict = {'state': 'idle'}
         self.additional_nodeos_params = additional_nodeos_params
 
         if not root_pwd:
@@ -206,35 +272,13 @@ class TEVMController:
                 raise TEVMCException(
                     f'Container from image \'{image}\' is already running.')
 
-            # check if image is present
-            local_images = []
-            for img in self.client.images.list(all=True):
-                local_images += img.tags
-
-            if image not in local_images:
-                """Attempt to pull from remote
-                """
-                splt_image = image.split(':')
-                if len(splt_image) == 2:
-                    repo, tag = splt_image
-                else:
-                    raise ValueError(
-                        f'Expected \'{image}\' to have \'repo:tag\' format.')
+            # check if image is present, image could have been built after
+            # the index was loaded so re-sync before pulling
+            if image not in self.images:
+                self.images.refresh()
 
-                try:
-                    updates = {}
-                    for update in self.client.api.pull(
-                        repo, tag=tag, stream=True, decode=True
-                    ):
-                        if 'id' in update:
-                            _id = update['id']
-                        if _id not in updates or (updates[_id] != update['status']):
-                            updates[_id] = update['status']
-                            self.logger.info(f'{_id}: {update["status"]}')
-
-                except docker.errors.ImageNotFound:
-                   raise TEVMCException(f'Image \'{image}\' not found on either local or'
-                        ' remote repos. Maybe consider running \'tevmc build\'')
+            if image not in self.images:
+                self.pull_image(image)
 
             # darwin arch doesn't support host networking mode...
             if sys.platform == 'darwin':
@@ -290,24 +334,194 @@ class TEVMController:
             # self.logger.info('removed.')
 
 
+    def pull_image(self, image: str, on_update=None):
+        """Pull an image from remote, ``on_update(layer_id, status)`` is called
+        on each layer status change, by default changes are logged.
+        """
+        splt_image = image.split(':')
+        if len(splt_image) == 2:
+            repo, tag = splt_image
+        else:
+            raise ValueError(
+                f'Expected \'{image}\' to have \'repo:tag\' format.')
+
+        if on_update is None:
+            on_update = lambda _id, status: self.logger.info(f'{_id}: {status}')
+
+        try:
+            updates = {}
+            for update in self.client.api.pull(
+                repo, tag=tag, stream=True, decode=True
+            ):
+                _id = update.get('id', image)
+                status = update.get('status', '')
+                if updates.get(_id, None) != status:
+                    updates[_id] = status
+                    on_update(_id, status)
+
+        except docker.errors.ImageNotFound:
+            raise TEVMCException(
+                f'Image \'{image}\' not found on either local or'
+                ' remote repos. Maybe consider running \'tevmc build\'')
+
+        self.images.add(image)
+
+    def service_images(self) -> list[str]:
+        """Image tags needed to launch the selected services."""
+        images = []
+        for service in self.services:
+            conf = self.config[service_alias_to_fullname(service)]
+            images.append(f'{conf["tag"]}-{self.chain_name}')
+
+        return images
+
+    def pull_images(self, images: list[str], report_interval: float = 5.0):
+        """Pre-flight pull of every missing image concurrently, logging
+        aggregated layer progress every ``report_interval`` seconds.
+        """
+        missing = [image for image in images if image not in self.images]
+        if not missing:
+            return
+
+        self.logger.info(f'pulling missing images: {missing}')
+
+        done_statuses = ('Pull complete', 'Already exists')
+        progress = {image: {} for image in missing}
+        last_report = time.monotonic()
+        lock = threading.Lock()
+
+        def report():
+            parts = []
+            for image, layers in progress.items():
+                done = sum(
+                    1 for status in layers.values() if status in done_statuses)
+                parts.append(f'{image} {done}/{len(layers)}')
+
+            self.logger.info(f'pull progress: {", ".join(parts)} layers')
+
+        def pull(image):
+            def on_update(_id, status):
+                nonlocal last_report
+                with lock:
+                    if _id != image:
+                        progress[image][_id] = status
+
+                    now = time.monotonic()
+                    if now - last_report >= report_interval:
+                        last_report = now
+                        report()
+
+            self.pull_image(image, on_update=on_update)
+
+        with ThreadPoolExecutor(
+            max_workers=len(missing), thread_name_prefix='image-pull'
+        ) as pool:
+            futures = [pool.submit(pull, image) for image in missing]
+
+        report()
+
+        for future in futures:
+            future.result()
+
+    def _retry_sleep(self, seconds: float):
+        """Sleep between startup retries, raises if startup got cancelled
+        meanwhile.
+        """
+        if self._cancel_start.wait(timeout=seconds):
+            raise TEVMCException('startup cancelled')
+
+    def _enter_context(self, cm):
+        """Enter ``cm`` and register its exit on the controller's exit stack.
+
+        Services start concurrently so ``cm`` is entered outside the lock and
+        only registered under it. If startup got cancelled meanwhile the
+        stack may already be closed, ``cm`` is exited right away instead.
+        """
+        if self._cancel_start.is_set():
+            raise TEVMCException('startup cancelled')
+
+        with ExitStack() as stack:
+            result = stack.enter_context(cm)
+            with self._exit_stack_lock:
+                if not self._cancel_start.is_set():
+                    self.exit_stack.enter_context(stack.pop_all())
+                    return result
+
+        raise TEVMCException('startup cancelled')
+
+    def log_hub(self, service: str) -> LogHub:
+        """Get the running log hub for a service, (re)starting it if needed.
+
+        Main dir services are followed from their log file, the rest are
+        followed through the docker api and get a new hub if their
+        container changed.
+        """
+        hub = self._log_hubs.get(service, None)
+
+        if service in MAIN_DIR_LOG_SERVICES:
+            if hub is None or not hub.running:
+                follower = self._log_followers.get(service, None)
+                if follower is None:
+                    follower = LogFollower(
+                        self.main_logs_dir / f'{service}.log',
+                        logger=self.logger)
+                    self._log_followers[service] = follower
+
+                hub = LogHub.for_file(
+                    service, follower,
+                    exclude=MAIN_DIR_LOG_EXCLUDE,
+                    logger=self.logger)
+                hub.start()
+
+        else:
+            container = self.containers[service]
+            if hub is not None and (
+                hub.source_id != container.id or not hub.running):
+                hub.stop(timeout=0)
+                hub = None
+
+            if hub is None:
+                hub = LogHub.for_container(
+                    service, container, logger=self.logger)
+                hub.start()
+
+        self._log_hubs[service] = hub
+        return hub
+
+    def wait_for_log(
+        self,
+        service: str,
+        pattern: re.Pattern | None = None,
+        timeout: float = 60.0,
+        replay: int | None = 100
+    ) -> str:
+        """Block until a line matching ``pattern`` (by default the service's
+        readiness pattern) shows up on the service logs, echoing logs while
+        waiting. Returns the matching line.
+        """
+        if pattern is None:
+            pattern = READINESS_PATTERNS[service]
+
+        with self.log_hub(service).subscribe(
+            pattern=pattern, replay=replay, echo=True
+        ) as sub:
+            return sub.wait(timeout=timeout)
+
     def stream_logs(self, container, timeout=30.0, num=100, from_latest=False):
         if container is None:
             self.logger.critical("container is None")
             raise StopIteration
 
-        elif container in ['nodeos', 'telosevm-translator', 'telos-evm-rpc']:
+        elif container in MAIN_DIR_LOG_SERVICES:
             for line in self._stream_logs_from_main_dir(
-                container, num, timeout=int(timeout)):
+                container, num, timeout=timeout):
                 yield line
 
         else:
-            for chunk in docker_stream_logs(
-                self.containers[container],
-                lines=num,
-                timeout=timeout,
-                from_latest=from_latest
-            ):
-                yield chunk
+            with self.log_hub(container).subscribe(
+                replay=num if from_latest else None
+            ) as sub:
+                yield from sub.lines(timeout=timeout)
 
     @contextmanager
     def must_keep_running(self, container: str):
@@ -347,7 +561,7 @@ class TEVMController:
             if sys.platform == 'darwin':
                 more_params['ports'] = {f'{redis_port}/tcp': redis_port}
 
-            self.containers['redis'] = self.exit_stack.enter_context(
+            self.containers['redis'] = self._enter_context(
                 self.open_container(
                     f'{config["name"]}-{self.pid}-{self.chain_name}',
                     f'{config["tag"]}-{self.chain_name}',
@@ -362,10 +576,7 @@ class TEVMController:
                     ipv4_address=config['virtual_ip']
                 )
 
-            for msg in self.stream_logs('redis'):
-                self.logger.info(msg.rstrip())
-                if 'Ready to accept connections' in msg:
-                    break
+            self.wait_for_log('redis', replay=None)
 
     def start_elasticsearch(self):
         with self.must_keep_running('elasticsearch'):
@@ -385,7 +596,7 @@ class TEVMController:
             if sys.platform == 'darwin':
                 more_params['ports'] = {f'{es_port}/tcp': es_port}
 
-            self.containers['elasticsearch'] = self.exit_stack.enter_context(
+            self.containers['elasticsearch'] = self._enter_context(
                 self.open_container(
                     f'{config["name"]}-{self.pid}-{self.chain_name}',
                     f'{config["tag"]}-{self.chain_name}',
@@ -410,10 +621,7 @@ class TEVMController:
                     ipv4_address=config['virtual_ip']
                 )
 
-            for msg in self.stream_logs('elasticsearch'):
-                self.logger.info(msg.rstrip())
-                if ' indices into cluster_state' in msg:
-                    break
+            self.wait_for_log('elasticsearch', timeout=60*5, replay=None)
 
     def stop_elasticsearch(self):
         self.containers['elasticsearch'].kill(signal.SIGTERM)
@@ -439,7 +647,7 @@ class TEVMController:
             if sys.platform == 'darwin':
                 more_params['ports'] = {f'{kibana_port}/tcp': kibana_port}
 
-            self.containers['kibana'] = self.exit_stack.enter_context(
+            self.containers['kibana'] = self._enter_context(
                 self.open_container(
                     f'{config["name"]}-{self.pid}-{self.chain_name}',
                     f'{config["tag"]}-{self.chain_name}',
@@ -593,7 +801,7 @@ class TEVMController:
         self.logger.info(' '.join(cmd))
 
         # open container
-        self.containers['nodeos'] = self.exit_stack.enter_context(
+        self.containers['nodeos'] = self._enter_context(
             self.open_container(
                 f'{config["name"]}-{self.pid}-{self.chain_name}',
                 f'{config["tag"]}-{self.chain_name}',
@@ -642,20 +850,26 @@ class TEVMController:
                 if self.skip_init:
                     return
 
-                output = ''
-                for msg in self.stream_logs('nodeos', timeout=60*10, from_latest=True):
-                    output += msg
-                    if 'Produced' in msg:
-                        break
+                self.is_fresh = False
+                with self.log_hub('nodeos').subscribe(
+                    predicate=lambda line: bool(
+                        NODEOS_PRODUCED_PATTERN.search(line) or
+                        NODEOS_FRESH_STATE_PATTERN.search(line)),
+                    replay=100, echo=True
+                ) as sub:
+                    deadline = time.monotonic() + 60*10
+                    while True:
+                        msg = sub.wait(
+                            timeout=max(0, deadline - time.monotonic()))
+                        if NODEOS_FRESH_STATE_PATTERN.search(msg):
+                            self.is_fresh = True
+
+                        else:
+                            break
 
                 # await for nodeos to produce a block
                 self.cleos.wait_blocks(4)
 
-                self.is_fresh = (
-                    'No existing chain state or fork database. '
-                    'Initializing fresh blockchain state and resetting fork database.' in output
-                )
-
                 if self.is_fresh:
                     self.cleos.import_key('eosio', self.producer_key)
 
@@ -676,9 +890,8 @@ class TEVMController:
             else:
                 if ('--replay-blockchain' not in self.additional_nodeos_params and
                     len(config['ini']['peers']) > 0):
-                    for msg in self.stream_logs('nodeos', timeout=60*10, from_latest=True):
-                        if 'Received' in msg:
-                            break
+                    self.wait_for_log(
+                        'nodeos', NODEOS_RECEIVED_PATTERN, timeout=60*10)
 
             if not self.skip_init:
                 # wait until nodeos apis are up
@@ -702,7 +915,7 @@ class TEVMController:
 
                     except requests.exceptions.ConnectionError:
                         self.logger.warning('connection error trying to get chain info...')
-                        time.sleep(1)
+                        self._retry_sleep(1)
 
                 translator_start_block = int(self.config['telosevm-translator']['start_block']) - 1
                 self.logger.info(
@@ -727,37 +940,10 @@ class TEVMController:
         lines: int = 100,
         timeout: int = 60
     ):
-        log_path = self.main_logs_dir
-        log_path /= f'{service}.log'
-        log_path = log_path.resolve()
-
-        for _ in range(3):
-            if not log_path.is_file():
-                time.sleep(1)
-
-            else:
-                break
-
-        process = subprocess.Popen(
-            ['bash', '-c',
-                f'timeout {timeout}s tail -n {lines} -f {log_path}'],
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-
-        for line in iter(process.stdout.readline, b''):
-            msg = line.decode('utf-8')
-            if 'clear_expired_input_' in msg:
-                continue
-            yield msg
-            self.logger.info(msg.rstrip())
-
-        process.stdout.close()
-        process.wait()
-
-        if process.returncode != 0:
-            raise ValueError(
-                f'tail returned {process.returncode}\n'
-                f'{process.stderr.read().decode("utf-8")}')
+        with self.log_hub(service).subscribe(
+            replay=lines, echo=True
+        ) as sub:
+            yield from sub.lines(timeout=timeout)
 
     def _get_head_block(self):
         if 'testnet' in self.chain_name:
@@ -768,29 +954,67 @@ class TEVMController:
         resp = requests.get(f'{endpoint}/v1/chain/get_info').json()
         return resp['head_block_num']
 
-    def await_full_index(self):
-        last_indexed_block = 0
+    def await_full_index(
+        self,
+        report_interval: float = 30.0,
+        stall_limit: float = 1800.0
+    ):
+        """Block until the translator is less than 100 blocks behind the
+        remote head, raises TEVMCException if it doesn't push a new block
+        for ``stall_limit`` seconds.
+        """
         remote_head_block = self._get_head_block()
         last_update_time = time.time()
         delta = remote_head_block - self.cleos.get_info()['head_block_num']
 
-        for line in self.stream_logs('telosevm-translator'):
-            if '] pushed, at ' in line:
-                m = re.findall(r'(?<=: \[)(.*?)(?=\|)', line)
-                if len(m) == 1 and m[0] != 'NaN':
-                    last_indexed_block = int(m[0].replace(',', ''))
+        self.sync_progress = SyncProgressTracker()
+        last_report = time.monotonic()
 
-                    delta = remote_head_block - last_indexed_block
+        hub = self.log_hub('telosevm-translator')
+        with hub.subscribe(pattern=TRANSLATOR_PROGRESS_PATTERN) as sub:
+            # seed with the latest line only, replayed lines would all get
+            # the same seen_at and skew the rate and eta
+            last_line = hub.last_match(TRANSLATOR_PROGRESS_PATTERN)
+            progress = None
+            if last_line:
+                progress = parse_translator_progress(last_line)
 
-            self.logger.info(f'waiting on indexer... delta: {delta}')
+            if progress:
+                self.sync_progress.update(progress)
+                delta = remote_head_block - progress.block_num
 
-            if delta < 100:
-                break
+            while delta >= 100:
+                try:
+                    progress = parse_translator_progress(
+                        sub.get(timeout=report_interval))
+                    if progress:
+                        self.sync_progress.update(progress)
+                        delta = remote_head_block - progress.block_num
+
+                except TimeoutError:
+                    ...
+
+                now = time.monotonic()
+                if now - last_report >= report_interval:
+                    last_report = now
+                    summary = self.sync_progress.summary(remote_head_block)
+                    if self.sync_progress.stalled(now):
+                        self.logger.warning(f'indexer stalled! {summary}')
+
+                    else:
+                        self.logger.info(f'waiting on indexer... {summary}')
+
+                if self.sync_progress.stalled_for(now) > stall_limit:
+                    raise TEVMCException(
+                        f'indexer made no progress in {stall_limit:.0f}s, '
+                        f'{self.sync_progress.summary(remote_head_block)}')
+
+                if time.time() - last_update_time > 3600:
+                    remote_head_block = self._get_head_block()
+                    last_update_time = time.time()
 
-            now = time.time()
-            if now - last_update_time > 3600:
-                remote_head_block = self._get_head_block()
-                last_update_time = now
+        self.logger.info(
+            f'indexer caught up, {self.sync_progress.summary(remote_head_block)}')
 
     def setup_index_patterns(self, patterns: list[str]):
         kibana_port = self.config['kibana']['port']
@@ -828,7 +1052,7 @@ class TEVMController:
                 else:
                     break
 
-                time.sleep(3)
+                self._retry_sleep(3)
             self.logger.info('registered.')
 
     def start_beats(self):
@@ -849,7 +1073,7 @@ class TEVMController:
                 Mount('/root/logs', str(data_dir.resolve()), 'bind')
             ]
 
-            self.containers['beats'] = self.exit_stack.enter_context(
+            self.containers['beats'] = self._enter_context(
                 self.open_container(
                     f'{config["name"]}-{self.pid}-{self.chain_name}',
                     f'{config["tag"]}-{self.chain_name}',
@@ -891,7 +1115,7 @@ class TEVMController:
                 self.containers['beats'],
                 ['filebeat', '-e'])
 
-            time.sleep(3)
+            self._retry_sleep(3)
 
             exec_id, exec_stream = docker_open_process(
                 self.client,
@@ -920,7 +1144,7 @@ class TEVMController:
             if sys.platform == 'darwin':
                 more_params['ports'] = {f'{bc_port}/tcp': bc_port}
 
-            self.containers['telosevm-translator'] = self.exit_stack.enter_context(
+            self.containers['telosevm-translator'] = self._enter_context(
                 self.open_container(
                     f'{config["name"]}-{self.pid}-{self.chain_name}',
                     f'{config["tag"]}-{self.chain_name}',
@@ -935,13 +1159,11 @@ class TEVMController:
                     ipv4_address=config['virtual_ip']
                 )
 
-            for msg in self.stream_logs('telosevm-translator', timeout=60*10):
-                if 'drained' in msg:
-                    break
+            self.wait_for_log('telosevm-translator', timeout=60*10)
 
-    def restart_translator(self):
-        if 'telosevm-translator' in self.containers:
-            container = self.containers['telosevm-translator']
+    def _remove_container(self, name: str):
+        if name in self.containers:
+            container = self.containers[name]
             try:
                 container.reload()
 
@@ -952,6 +1174,8 @@ class TEVMController:
             except docker.errors.NotFound:
                 ...
 
+    def restart_translator(self):
+        self._remove_container('telosevm-translator')
         self.start_telosevm_translator()
 
 
@@ -975,7 +1199,7 @@ class TEVMController:
                     f'{rpc_port}/tcp': rpc_port
                 }
 
-            self.containers['telos-evm-rpc'] = self.exit_stack.enter_context(
+            self.containers['telos-evm-rpc'] = self._enter_context(
                 self.open_container(
                     f'{config["name"]}-{self.pid}-{self.chain_name}',
                     f'{config["tag"]}-{self.chain_name}',
@@ -990,25 +1214,27 @@ class TEVMController:
                     ipv4_address=config['virtual_ip']
                 )
 
-            for msg in self.stream_logs('telos-evm-rpc'):
-                self.logger.info(msg.rstrip())
-                if 'Telos EVM RPC started!!!' in msg:
-                    break
+            self.wait_for_log('telos-evm-rpc')
 
     def restart_rpc(self):
-        if 'telos-evm-rpc' in self.containers:
-            container = self.containers['telos-evm-rpc']
-            try:
-                container.reload()
-
-                if container.status == 'running':
-                    container.stop()
-                    container.remove()
+        self._remove_container('telos-evm-rpc')
+        self.start_evm_rpc()
 
-            except docker.errors.NotFound:
-                ...
+    def restart_service(self, service: str):
+        if service == 'nodeos':
+            self.restart_nodeos()
+            return
 
-        self.start_evm_rpc()
+        restarters = {
+            'redis': self.start_redis,
+            'elastic': self.start_elasticsearch,
+            'kibana': self.start_kibana,
+            'indexer': self.start_telosevm_translator,
+            'rpc': self.start_evm_rpc,
+            'beats': self.start_beats
+        }
+        self._remove_container(service_alias_to_fullname(service))
+        restarters[service]()
 
     def open_rpc_websocket(self):
         rpc_ws_host = '127.0.0.1'  # self.config['telos-evm-rpc']['rpc_websocket_host']
@@ -1054,91 +1280,248 @@ class TEVMController:
         use_cache: bool = True
     ):
         self.logger.info('starting build...')
-        rebuild_conf = False
-        prev_hash = None
-        cfg = deepcopy(self.config.copy())
-        if 'metadata' in cfg:
-            cfg.pop('metadata', None)
-            prev_hash = self.config['metadata']['phash']
-            self.logger.info(f'previous hash: {prev_hash}')
-
-        hasher = sha1(json.dumps(cfg, sort_keys=True).encode('utf-8'))
-        curr_hash = hasher.hexdigest()
-
-        self.logger.info(f'current hash: {curr_hash}')
-
-        rebuild_conf = (prev_hash != curr_hash) or force_conf_rebuild
-
-        if rebuild_conf:
-            cfg['metadata'] = {}
-            cfg['metadata']['phash'] = curr_hash
-
-            with open(self.root_pwd / 'tevmc.json', 'w+') as uni_conf:
-                uni_conf.write(json.dumps(cfg, indent=4))
+        cfg = deepcopy(self.config)
+        metadata = cfg.pop('metadata', {})
+        metadata.pop('phash', None)
+
+        # only regenerate the files of services whose config subtrees changed
+        prev_hashes = metadata.get('config_hashes', {})
+        curr_hashes = config_hashes(cfg)
+        changed = [
+            service
+            for service, curr_hash in curr_hashes.items()
+            if force_conf_rebuild or prev_hashes.get(service, None) != curr_hash
+        ]
 
-            self.logger.info('Rebuilding config files...')
-            perform_config_build(self.root_pwd, cfg)
+        if changed:
+            self.logger.info(f'Rebuilding config files for {changed}...')
+            perform_config_build(
+                self.root_pwd, cfg, services=changed, logger=self.logger)
             self.logger.info('done.')
 
+            metadata['config_hashes'] = curr_hashes
+            cfg['metadata'] = metadata
             self.config = cfg
+            self._dump_config()
+
+        else:
+            self.logger.info('config unchanged')
+
+        affected = set(changed)
 
         if templates_only:
-            return
+            return affected
 
-        # docker build
+        # docker build, skip services whose build context didn't change
+        # since their image was last built
+        build_hashes = self.config.get('metadata', {}).get('build_hashes', {})
+        to_build = {}
         for service in self.services:
             name = service_alias_to_fullname(service)
             conf = self.config[name]
-            if 'docker_path' in conf:
-                build_service(
+            if 'docker_path' not in conf:
+                continue
+
+            ctx_hash = hash_build_context(self.root_pwd, name, self.config)
+            image = f'{conf["tag"]}-{self.chain_name}'
+            if (use_cache and
+                build_hashes.get(name, None) == ctx_hash and
+                image in self.images):
+                self.logger.info(f'{name} build context unchanged, skipping build')
+                continue
+
+            to_build[name] = ctx_hash
+            affected.add(service)
+
+        if not to_build:
+            return affected
+
+        self.logger.info(f'building images for {list(to_build.keys())}...')
+        with ThreadPoolExecutor(
+            max_workers=len(to_build), thread_name_prefix='image-build'
+        ) as pool:
+            futures = {
+                name: pool.submit(
+                    build_service,
                     self.root_pwd, name,
-                    self.config, self.logger,
+                    self.config,
+                    PrefixedLogger(self.logger, name),
                     nocache=not use_cache)
+                for name in to_build
+            }
 
-    def start(self):
+        error = None
+        for name, future in futures.items():
+            try:
+                future.result()
+                build_hashes[name] = to_build[name]
+                self.images.add(
+                    f'{self.config[name]["tag"]}-{self.chain_name}')
 
-        self.build()
+            except Exception as e:
+                self.logger.error(f'{name} build failed: {e}')
+                build_hashes.pop(name, None)
+                error = error or e
 
-        if sys.platform == 'darwin':
-            self.darwin_network_setup()
+        self.config.setdefault('metadata', {})['build_hashes'] = build_hashes
+        self._dump_config()
 
-        if 'redis' in self.services:
-            self.start_redis()
+        if error:
+            raise error
 
-        if 'elastic' in self.services:
-            self.start_elasticsearch()
+        return affected
 
-        if 'kibana' in self.services:
-            self.start_kibana()
+    def reload_config(self, config: dict | None = None) -> list[str]:
+        """Apply a config change to a running node.
 
-        if 'nodeos' in self.services:
-            self.start_nodeos()
+        - Reload tevmc.json from disk unless ``config`` is passed.
+        - Regenerate config files and rebuild images only for the services
+          whose config subtrees changed (see ``SERVICE_CONFIG_KEYS``).
+        - Restart just those containers, the rest keep running.
+
+        Raises if another reload is in progress. Returns the restarted
+        services.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise TEVMCException('a config reload is already in progress')
+
+        try:
+            return self._reload_config(config)
 
-        if 'indexer' in self.services:
-            self.start_telosevm_translator()
+        finally:
+            self._reload_lock.release()
 
-            if not self.is_local and self.wait:
-                self.await_full_index()
+    def start_reload(self, config: dict | None = None) -> bool:
+        """Run ``reload_config`` on a background thread, progress and
+        result are kept in ``reload_status``. Returns False without doing
+        anything if a reload is already in progress.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
 
+        self.reload_status = {'state': 'running', 'started_at': time.time()}
 
-        if 'kibana' in self.services:
-            idx_version = self.config['telos-evm-rpc']['elasitc_index_version']
-            self.setup_index_patterns([
-                f'{self.chain_name}-action-{idx_version}-*',
-                f'{self.chain_name}-delta-{idx_version}-*',
-                'filebeat-*'
-            ])
+        def _run():
+            try:
+                restarted = self._reload_config(config)
+                self.reload_status = {
+                    **self.reload_status,
+                    'state': 'done',
+                    'restarted': restarted,
+                    'finished_at': time.time()
+                }
 
+            except BaseException as e:
+                self.logger.error(f'config reload failed: {e}')
+                self.reload_status = {
+                    **self.reload_status,
+                    'state': 'failed',
+                    'error': str(e),
+                    'finished_at': time.time()
+                }
 
-        if 'rpc' in self.services:
-            self.start_evm_rpc()
+            finally:
+                self._reload_lock.release()
 
-        else:
-            if self.wait:
-                self.logger.warning('--wait passed but no indexer launched, ignoring...')
+        threading.Thread(
+            target=_run, name='config-reload', daemon=True).start()
+        return True
+
+    def _reload_config(self, config: dict | None = None) -> list[str]:
+        if config is None:
+            config = load_config(str(self.root_pwd), 'tevmc.json')
+
+        if any(
+            config.get(key) != self.config.get(key)
+            for key in ('elasticsearch', 'telos-evm-rpc')
+        ):
+            # shared driver points at the old cluster or index prefix
+            self._elastic_driver = None
+
+        self.config = config
+        affected = self.build()
+
+        to_restart = [
+            service for service in self.services if service in affected]
+
+        if not to_restart:
+            self.logger.info('nothing to restart')
+            return []
+
+        self.logger.info(f'restarting {to_restart}...')
+        run_task_graph(
+            {
+                service: partial(self.restart_service, service)
+                for service in to_restart
+            },
+            SERVICE_DEPENDENCIES
+        )
+
+        return to_restart
+
+    def _start_kibana(self):
+        self.start_kibana()
+
+        idx_version = self.config['telos-evm-rpc']['elasitc_index_version']
+        self.setup_index_patterns([
+            f'{self.chain_name}-action-{idx_version}-*',
+            f'{self.chain_name}-delta-{idx_version}-*',
+            'filebeat-*'
+        ])
+
+    def _start_indexer(self):
+        self.start_telosevm_translator()
+
+        if not self.is_local and self.wait:
+            self.await_full_index()
+
+    def start(self):
+
+        self.build()
+
+        self.pull_images(self.service_images())
+
+        if sys.platform == 'darwin':
+            self.darwin_network_setup()
+
+        starters = {
+            'redis': self.start_redis,
+            'elastic': self.start_elasticsearch,
+            'kibana': self._start_kibana,
+            'nodeos': self.start_nodeos,
+            'indexer': self._start_indexer,
+            'rpc': self.start_evm_rpc,
+            'beats': self.start_beats
+        }
+
+        if self.wait and 'rpc' not in self.services:
+            self.logger.warning('--wait passed but no indexer launched, ignoring...')
+
+        self._cancel_start.clear()
+        try:
+            run_task_graph(
+                {
+                    service: starter
+                    for service, starter in starters.items()
+                    if service in self.services
+                },
+                SERVICE_DEPENDENCIES,
+                cancel=self._cancel_start
+            )
 
-        if 'beats' in self.services:
-            self.start_beats()
+        except BaseException:
+            self.logger.critical('startup failed, stopping launched containers...')
+            # starters still running are waiting on logs, wake them up
+            for hub in self._log_hubs.values():
+                hub.stop(timeout=0)
+
+            # starters that register after this close their own containers
+            self._cancel_start.set()
+            with self._exit_stack_lock:
+                launched = self.exit_stack.pop_all()
+
+            launched.close()
+            raise
 
         if (self.is_local and
             self.is_fresh and
@@ -1146,11 +1529,135 @@ class TEVMController:
             'nodeos' in self.services):
             self.cleos.create_test_evm_account()
 
+    @property
+    def elastic_driver(self) -> ElasticDriver:
+        """Elastic driver shared by the api routes, keeps the block coverage
+        map in memory between requests.
+        """
+        if self._elastic_driver is None:
+            self._elastic_driver = ElasticDriver(
+                self.config, node_dir=self.root_pwd)
+
+        return self._elastic_driver
+
+    def _integrity_check(self, full: bool, hashes: bool) -> str:
+        try:
+            self.elastic_driver.integrity_check(full=full, hashes=hashes)
+            return 'healthy'
+
+        except ElasticDataIntegrityError as e:
+            return f'unhealthy: {e}'
+
+    def check_integrity(
+        self,
+        full: bool = False,
+        hashes: bool = False
+    ) -> str | None:
+        """Run an integrity check on the shared elastic driver right away,
+        returns None without doing anything if one is already running.
+        """
+        if not self._check_lock.acquire(blocking=False):
+            return None
+
+        try:
+            return self._integrity_check(full, hashes)
+
+        finally:
+            self._check_lock.release()
+
+    def start_integrity_check(
+        self,
+        full: bool = False,
+        hashes: bool = False
+    ) -> bool:
+        """Run ``check_integrity`` on a background thread, progress and
+        result are kept in ``check_status``. Returns False without doing
+        anything if a check is already running.
+        """
+        if not self._check_lock.acquire(blocking=False):
+            return False
+
+        self.check_status = {
+            'state': 'running',
+            'full': full,
+            'hashes': hashes,
+            'started_at': time.time()
+        }
+
+        def _run():
+            try:
+                status = self._integrity_check(full, hashes)
+                self.check_status = {
+                    **self.check_status,
+                    'state': 'done',
+                    'status': status,
+                    'finished_at': time.time()
+                }
+
+            except BaseException as e:
+                self.logger.error(f'integrity check failed: {e}')
+                self.check_status = {
+                    **self.check_status,
+                    'state': 'failed',
+                    'error': str(e),
+                    'finished_at': time.time()
+                }
+
+            finally:
+                self._check_lock.release()
+
+        threading.Thread(
+            target=_run, name='integrity-check', daemon=True).start()
+        return True
+
+    def _refresh_coverage_loop(self):
+        while not self._coverage_stop.is_set():
+            self._coverage_refresh.clear()
+            try:
+                self.elastic_driver.update_coverage()
+
+            except Exception as e:
+                self.logger.warning(f'block coverage refresh failed: {e}')
+
+            self._coverage_refresh.wait(timeout=self.coverage_refresh_interval)
+
+    def start_coverage_refresher(self):
+        """Keep the block coverage map up to date on a background thread,
+        api requests only read the last built map.
+        """
+        if self._coverage_thread and self._coverage_thread.is_alive():
+            return
+
+        self._coverage_stop.clear()
+        self._coverage_thread = threading.Thread(
+            target=self._refresh_coverage_loop,
+            name='coverage-refresher',
+            daemon=True)
+        self._coverage_thread.start()
+
+    def request_coverage_refresh(self):
+        """Wake the refresher up ahead of its next scheduled refresh."""
+        self._coverage_refresh.set()
+
+    def stop_coverage_refresher(self):
+        if not self._coverage_thread:
+            return
+
+        self._coverage_stop.set()
+        self._coverage_refresh.set()
+        self._coverage_thread.join(timeout=5)
+        self._coverage_thread = None
+
     def serve_api(self):
         add_routes(self)
+        if 'elastic' in self.services:
+            self.start_coverage_refresher()
+
         self.api.run(port=self.config['daemon']['port'])
 
     def stop(self):
+        self.stop_coverage_refresher()
+
         if 'nodeos' in self.services:
             self._stop_nodeos()
             self.is_nodeos_relaunch = True
@@ -1163,6 +1670,14 @@ class TEVMController:
             self.nodeos_logproc.kill()
             self.nodeos_logfile.close()
 
+        for hub in self._log_hubs.values():
+            hub.stop()
+        self._log_hubs = {}
+
+        for follower in self._log_followers.values():
+            follower.close()
+        self._log_followers = {}
+
         self.exit_stack.pop_all().close()
 
         pid_path = self.root_pwd / 'tevmc.pid'
@@ -1,22 +1,26 @@
 
 from decimal import localcontext
+from datetime import datetime, timezone
 from pathlib import Path
 
 import re
 import decimal
 import numbers
 import binascii
+import threading
 import collections.abc
 
 from typing import (
     Any,
     List,
     AnyStr,
+    Callable,
     NewType,
     Union,
     Tuple,
     Iterator
 )
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 from docker.errors import DockerException
 
@@ -291,6 +295,7 @@ def is_hex(value: Any) -> bool:
 
 import struct
 import logging
+import threading
 
 import requests_unixsocket
 
@@ -299,12 +304,101 @@ from requests.exceptions import Timeout
 from docker.models.containers import Container
 
 
+DOCKER_LOG_HEADER = struct.Struct('>BxxxL')
+
+
+class DockerLogDemuxer:
+    '''Incremental demuxer for Docker's multiplexed log protocol.
+
+    Docker prefixes each log frame with an 8-byte header:
+    - 1 byte: Stream type (STDIN, STDOUT, STDERR)
+    - 3 bytes: Padding
+    - 4 bytes: Size of the message that follows
+
+    Chunks fed from the HTTP response can split both headers and payloads,
+    so unconsumed bytes are kept in a single ``bytearray`` and only complete
+    frames are parsed, through a ``memoryview`` to avoid re-slicing the
+    buffer.  Payloads are further split into lines, partial lines are carried
+    per stream until their newline arrives.
+    '''
+
+    def __init__(self, encoding: str = 'utf-8'):
+        self.encoding = encoding
+        self._buffer = bytearray()
+        self._partial: dict[int, bytearray] = {}
+
+    def _split_lines(self, stream: int, start: int, end: int, lines: list[str]):
+        buf = self._buffer
+        view = memoryview(buf)
+        try:
+            while start < end:
+                nl = buf.find(b'\n', start, end)
+                if nl == -1:
+                    self._partial.setdefault(stream, bytearray()).extend(
+                        view[start:end])
+                    break
+
+                partial = self._partial.get(stream)
+                if partial:
+                    partial.extend(view[start:nl + 1])
+                    lines.append(str(partial, self.encoding, 'replace'))
+                    partial.clear()
+
+                else:
+                    lines.append(
+                        str(view[start:nl + 1], self.encoding, 'replace'))
+
+                start = nl + 1
+
+        finally:
+            view.release()
+
+    def feed(self, chunk: bytes) -> list[str]:
+        '''Consume a chunk of raw log data.
+
+        Args:
+            chunk (bytes): Raw bytes as read from the docker socket.
+
+        Returns:
+            list[str]: Complete lines (newline included) found so far.
+        '''
+        buf = self._buffer
+        buf.extend(chunk)
+
+        lines = []
+        pos = 0
+        total = len(buf)
+        while total - pos >= DOCKER_LOG_HEADER.size:
+            stream, length = DOCKER_LOG_HEADER.unpack_from(buf, pos)
+            start = pos + DOCKER_LOG_HEADER.size
+            end = start + length
+            if end > total:
+                break
+
+            self._split_lines(stream, start, end, lines)
+            pos = end
+
+        if pos:
+            del buf[:pos]
+
+        return lines
+
+    def flush(self) -> list[str]:
+        '''Return any trailing partial lines, used once the stream ends.'''
+        lines = [
+            str(partial, self.encoding, 'replace')
+            for partial in self._partial.values()
+            if partial
+        ]
+        self._partial.clear()
+        return lines
+
+
 def _parse_docker_log(data):
     '''Parses Docker logs by handling Docker's log protocol.
 
-    Docker prefixes each log entry with an 8-byte header:
-    - 1 byte: Stream type (STDIN, STDOUT, STDERR)
-    - 7 bytes: Size of the message that follows
+    Kept for callers that already hold a complete buffer of frames, streaming
+    consumers should use ``DockerLogDemuxer`` instead.
 
     Args:
         data (bytes): The raw logs data with Docker's headers.
@@ -312,34 +406,63 @@ def _parse_docker_log(data):
     Yields:
         str: The parsed log messages.
     '''
-    while data:
-        # Extract header from data
-        header = data[:8]
-        _, length = struct.unpack('>BxxxL', header)
+    view = memoryview(data)
+    pos = 0
+    while len(view) - pos >= DOCKER_LOG_HEADER.size:
+        _, length = DOCKER_LOG_HEADER.unpack_from(view, pos)
+        start = pos + DOCKER_LOG_HEADER.size
+        pos = start + length
 
-        # Extract the actual log message based on the length from the header
-        message = data[8:8+length].decode('utf-8', errors='replace')
+        yield str(view[start:pos], 'utf-8', 'replace')
 
-        # Advance the buffer to next log entry
-        data = data[8+length:]
 
-        yield message
+def split_docker_timestamp(line: str) -> tuple[tuple[int, int] | None, str]:
+    '''Split off the RFC3339Nano timestamp docker prefixes log lines with
+    when asked for ``timestamps``.
 
+    Returns:
+        ((seconds, nanoseconds), line) or (None, line) if it had none.
+    '''
+    stamp, sep, rest = line.partition(' ')
+    if not sep or not stamp.endswith('Z'):
+        return None, line
+
+    base, _, fraction = stamp[:-1].partition('.')
+    try:
+        seconds = datetime.strptime(
+            base, '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
 
-def docker_stream_logs(container, timeout=30.0, lines=0, from_latest=False):
+    except ValueError:
+        return None, line
+
+    nanos = int(fraction[:9].ljust(9, '0')) if fraction.isdigit() else 0
+    return (int(seconds.timestamp()), nanos), rest
+
+
+def docker_stream_logs(
+    container,
+    timeout=30.0,
+    lines=0,
+    from_latest=False,
+    since: tuple[int, int] | None = None,
+    timestamps: bool = False
+):
     '''Streams logs from a running Docker container.
 
     Args:
         container (container): Docker container object.
         timeout (float, optional): Time to wait between log messages. Default to 30.0 seconds.
         from_latest (bool, optional): Only fetch logs since the last log. Default to False.
+        since (tuple, optional): Only fetch logs from this (seconds, nanoseconds) on, inclusive.
+        timestamps (bool, optional): Prefix lines with their timestamp, see ``split_docker_timestamp``.
 
     Yields:
-        str: The log messages.
+        str: The log lines.
 
     Raises:
         DockerException: If the container is not running.
-        StopIteration: If no logs are received within the timeout period.
+
+    The stream ends if no logs are received within the timeout period.
     '''
     container.reload()
 
@@ -363,21 +486,58 @@ def docker_stream_logs(container, timeout=30.0, lines=0, from_latest=False):
     if from_latest:
         params['tail'] = str(lines)
 
+    if since is not None:
+        params['since'] = f'{since[0]}.{since[1]:09d}'
+
+    if timestamps:
+        params['timestamps'] = '1'
+
     response = session.get(
         url, params=params, stream=True, timeout=timeout)
 
+    demuxer = DockerLogDemuxer()
     try:
-        data_buffer = b''
         for chunk in response.iter_content(chunk_size=1024):
             if chunk:
-                data_buffer += chunk
-                for message in _parse_docker_log(data_buffer):
-                    yield message
-                    # Adjust the buffer after reading the message
-                    data_buffer = data_buffer[len(message)+8:]
+                yield from demuxer.feed(chunk)
+
+        yield from demuxer.flush()
 
     except Timeout:
-        raise StopIteration(f'No logs received for {timeout} seconds.')
+        # raising StopIteration in a generator is a RuntimeError, just end
+        return
+
+
+class DockerImageIndex:
+    '''Set of tags present on the local docker host.
+
+    Listing images is slow on hosts with many of them, so the listing is done
+    once and kept as a set, call ``refresh`` to re-sync it with the daemon.
+    '''
+
+    def __init__(self, client):
+        self.client = client
+        self._tags: set[str] | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        tags = set()
+        for img in self.client.images.list():
+            tags.update(img.tags)
+
+        with self._lock:
+            self._tags = tags
+
+    def add(self, image: str):
+        with self._lock:
+            if self._tags is not None:
+                self._tags.add(image)
+
+    def __contains__(self, image: str) -> bool:
+        if self._tags is None:
+            self.refresh()
+
+        return image in self._tags
 
 
 def docker_open_process(
@@ -503,3 +663,61 @@ def deep_dict_equal(dict1, dict2):
         elif value1 != value2:
             return False
     return True
+
+
+def run_task_graph(
+    tasks: dict[str, Callable],
+    dependencies: dict[str, list[str]],
+    max_workers: int | None = None,
+    cancel: threading.Event | None = None
+):
+    '''Run callables as soon as all their dependencies finished, independent
+    tasks run concurrently on a thread pool.
+
+    Dependencies on names not present in ``tasks`` are ignored. On the first
+    failure, or if interrupted, no new tasks are scheduled, ``cancel`` is
+    set so in flight ones can bail out and the exception is raised right
+    away without waiting on them.
+    '''
+    pending = {
+        name: {dep for dep in dependencies.get(name, []) if dep in tasks}
+        for name in tasks
+    }
+    done = set()
+    running = {}
+
+    pool = ThreadPoolExecutor(
+        max_workers=max_workers or max(len(tasks), 1),
+        thread_name_prefix='task-graph'
+    )
+    try:
+        while True:
+            for name, deps in list(pending.items()):
+                if deps <= done:
+                    running[pool.submit(tasks[name])] = name
+                    del pending[name]
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    raise exc
+
+                done.add(name)
+
+    except BaseException:
+        if cancel is not None:
+            cancel.set()
+
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    pool.shutdown()
+
+    if pending:
+        raise ValueError(
+            f'unresolvable task dependencies: {sorted(pending)}')